@@ -0,0 +1,62 @@
+# bench_aggregation.py
+# This file measures how much duplicate operating-point aggregation shrinks the training set and
+# the epoch time, and what it does to the test R^2.
+#
+# Run from the project root:
+#     python -m benchmarks.bench_aggregation --points 2000 --repeats 50
+#     python -m benchmarks.bench_aggregation --file "utils/Original_DataSet.xlsx"
+
+import argparse
+import time
+from sklearn.model_selection import train_test_split
+from sklearn.preprocessing import StandardScaler
+from data.dataset import CompactDataset, load_compact_dataset
+from data.preprocessing import clean_data, engineer_features
+from data.synthetic import generate_dataset
+
+
+def make_repeated_dataset(points, repeats, seed=0):
+    """Synthetic dataset where every operating point is measured 'repeats' times with different ttf."""
+    frame, _ = clean_data(generate_dataset(points * repeats, operating_points=points, seed=seed))
+    X = engineer_features(frame)
+    scaler = StandardScaler()
+    X_train, X_test, y_train, y_test = train_test_split(scaler.fit_transform(X), frame['reliability'].values,
+                                                        test_size=0.05, random_state=250)
+    return CompactDataset.from_arrays(X_train, X_test, y_train, y_test, scaler)
+
+
+def train_and_time(dataset, epochs, batch_size):
+    from model.neural_network import NeuralNetworkModel
+
+    model = NeuralNetworkModel(input_shape=(dataset.n_features,))
+    start = time.perf_counter()
+    history = model.train_on_dataset(dataset, epochs=epochs, batch_size=batch_size, patience=epochs)
+    seconds = time.perf_counter() - start
+    r2, mse = model.evaluate_on_dataset(dataset)
+    return seconds / len(history.history['loss']), r2, mse
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark duplicate operating-point aggregation.')
+    parser.add_argument('--file', help='Workbook to benchmark instead of the synthetic data')
+    parser.add_argument('--points', type=int, default=2000, help='Distinct synthetic operating points')
+    parser.add_argument('--repeats', type=int, default=50, help='Measurements per synthetic operating point')
+    parser.add_argument('--epochs', type=int, default=5)
+    parser.add_argument('--batch-size', type=int, default=77)
+    args = parser.parse_args()
+
+    dataset = load_compact_dataset(args.file) if args.file else make_repeated_dataset(args.points, args.repeats)
+    start = time.perf_counter()
+    aggregated = dataset.aggregate_training_rows()
+    aggregation_seconds = time.perf_counter() - start
+
+    print(f"Training rows: {dataset.n_train:,} -> {aggregated.n_train:,} "
+          f"({aggregated.n_train / dataset.n_train:.1%}), aggregation took {aggregation_seconds:.3f} s")
+    print(f"{'dataset':<12}{'epoch time [s]':>16}{'test R^2':>12}{'test MSE':>14}")
+    for name, data in (('raw', dataset), ('aggregated', aggregated)):
+        epoch_seconds, r2, mse = train_and_time(data, args.epochs, args.batch_size)
+        print(f"{name:<12}{epoch_seconds:>16.3f}{r2:>12.4f}{mse:>14.4f}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,42 @@
+# bench_inference_latency.py
+# This file benchmarks per-call inference latency: keras.Model.predict vs. the predict_fast path.
+#
+# Run from the project root:
+#     python -m benchmarks.bench_inference_latency --calls 1000
+
+import argparse
+import numpy as np
+from benchmarks.common import latency_percentiles
+from model.neural_network import NeuralNetworkModel
+
+BATCH_SIZES = (1, 8, 64, 4096)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark single-sample and small-batch inference latency.')
+    parser.add_argument('--calls', type=int, default=1000, help='Timed calls per batch size and method')
+    parser.add_argument('--features', type=int, default=5)
+    parser.add_argument('--batch-sizes', type=int, nargs='+', default=list(BATCH_SIZES))
+    args = parser.parse_args()
+
+    model = NeuralNetworkModel(input_shape=(args.features,), compile=False)
+    rng = np.random.default_rng(0)
+    methods = {
+        'keras.Model.predict': lambda X: model.model.predict(X, verbose=0),
+        'predict_fast': model.predict_fast,
+    }
+
+    print(f"{'batch':>6}  {'method':<20}{'p50 [us]':>12}{'p99 [us]':>12}{'rows/s':>14}")
+    for batch_size in args.batch_sizes:
+        X = rng.standard_normal((batch_size, args.features)).astype(np.float32)
+        np.testing.assert_allclose(model.predict_fast(X), model.model.predict(X, verbose=0).ravel(), rtol=1e-5, atol=1e-6)
+        for name, predict in methods.items():
+            # keras.Model.predict costs milliseconds per call; fewer calls keep the run short
+            calls = args.calls if name == 'predict_fast' else max(args.calls // 10, 20)
+            latency = latency_percentiles(lambda: predict(X), calls)
+            print(f"{batch_size:>6}  {name:<20}{latency['p50'] * 1e6:>12.1f}{latency['p99'] * 1e6:>12.1f}"
+                  f"{batch_size / latency['p50']:>14,.0f}")
+
+
+if __name__ == '__main__':
+    main()
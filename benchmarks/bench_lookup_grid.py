@@ -0,0 +1,52 @@
+# bench_lookup_grid.py
+# This file benchmarks single-point query latency of a baked reliability grid against the
+# live model (predict_fast) and the NumPy runtime, plus batched grid query throughput.
+#
+# Run from the project root:
+#     python -m benchmarks.bench_lookup_grid --calls 10000
+
+import argparse
+import os
+import tempfile
+import numpy as np
+from benchmarks.bench_numpy_runtime import make_artifact
+from benchmarks.common import latency_percentiles, time_call
+from model.lookup_grid import ReliabilityGrid, bake_lookup_grid
+from model.numpy_runtime import NumpyModel
+from model.operating_point import DEFAULT_BOUNDS, sample_candidates
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark reliability grid queries against live model inference.')
+    parser.add_argument('--calls', type=int, default=10_000, help='Timed single-point queries per method')
+    parser.add_argument('--batch', type=int, default=100_000, help='Rows of the batched query')
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        artifact_path = os.path.join(tmp, 'model.npz')
+        model = make_artifact(artifact_path)
+        numpy_model = NumpyModel.load(artifact_path)
+        bake_seconds, _ = time_call(lambda: bake_lookup_grid(numpy_model, os.path.join(tmp, 'grid')))
+        grid = ReliabilityGrid.load(os.path.join(tmp, 'grid'))
+
+        point = {'V': 1.0, 'f': 7e8, 'T': 60.0, 'N': 5.0}
+        columns = {name: np.array([value]) for name, value in point.items()}
+        X = model.transform(columns)
+        methods = {
+            'grid query_point': lambda: grid.query_point(*(point[name] for name in grid.columns)),
+            'NumpyModel.predict': lambda: numpy_model.predict(X),
+            'predict_fast': lambda: model.predict_fast(X),
+        }
+        print(f"grid {'x'.join(map(str, grid.shape))} baked in {bake_seconds:.2f} s")
+        print(f"{'method':<22}{'p50 [us]':>12}{'p99 [us]':>12}")
+        for name, query in methods.items():
+            latency = latency_percentiles(query, args.calls)
+            print(f"{name:<22}{latency['p50'] * 1e6:>12.1f}{latency['p99'] * 1e6:>12.1f}")
+
+        batch = sample_candidates(DEFAULT_BOUNDS, args.batch, np.random.default_rng(0))
+        seconds, _ = time_call(lambda: grid.query(batch), repeat=5)
+        print(f"batched grid query: {args.batch / seconds:,.0f} points/s")
+
+
+if __name__ == '__main__':
+    main()
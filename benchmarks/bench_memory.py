@@ -0,0 +1,68 @@
+# bench_memory.py
+# This file compares the peak memory of preprocess_data (float64 tuple) and load_compact_dataset
+# (float32 CompactDataset). Each pipeline runs in fresh processes so the peaks do not mix: one run
+# reports wall time and peak RSS, a second one the tracemalloc peak of the pipeline alone.
+#
+# Run from the project root:
+#     python -m benchmarks.bench_memory --rows 200000
+#     python -m benchmarks.bench_memory --file "utils/Original_DataSet.xlsx"
+
+import argparse
+import multiprocessing
+import os
+import tempfile
+from benchmarks.common import format_megabytes, make_frame, time_call, peak_rss_bytes
+
+
+def _run_pipeline(name, file_path, traced, queue):
+    import tracemalloc
+    from data.preprocessing import preprocess_data
+    from data.dataset import load_compact_dataset
+
+    pipelines = {
+        'preprocess_data': lambda: preprocess_data(file_path),
+        'load_compact_dataset': lambda: load_compact_dataset(file_path),
+    }
+    if traced:
+        tracemalloc.start()
+    seconds, result = time_call(pipelines[name])
+    traced_peak = tracemalloc.get_traced_memory()[1] if traced else None
+    if name == 'preprocess_data':
+        held = sum(array.nbytes for array in result[:4])
+    else:
+        held = result.nbytes
+    queue.put((seconds, peak_rss_bytes(), traced_peak, held))
+
+
+def measure(name, file_path, traced):
+    context = multiprocessing.get_context('spawn')
+    queue = context.Queue()
+    process = context.Process(target=_run_pipeline, args=(name, file_path, traced, queue))
+    process.start()
+    result = queue.get()
+    process.join()
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Peak-memory benchmark of the preprocessing pipelines.')
+    parser.add_argument('--rows', type=int, default=200_000, help='Rows of the synthetic workbook')
+    parser.add_argument('--file', help='Benchmark an existing workbook instead of a synthetic one')
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        file_path = args.file
+        if file_path is None:
+            file_path = os.path.join(tmp, 'synthetic.xlsx')
+            make_frame(args.rows).to_excel(file_path, index=False)
+            print(f"Synthetic workbook: {args.rows:,} rows")
+
+        print(f"{'pipeline':<22}{'time [s]':>10}{'peak RSS [MB]':>16}{'traced peak [MB]':>18}{'arrays held [MB]':>18}")
+        for name in ('preprocess_data', 'load_compact_dataset'):
+            seconds, peak_rss, _, held = measure(name, file_path, traced=False)
+            _, _, traced_peak, _ = measure(name, file_path, traced=True)
+            print(f"{name:<22}{seconds:>10.2f}{format_megabytes(peak_rss, 16)}{traced_peak / 2 ** 20:>18.1f}{held / 2 ** 20:>18.1f}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,111 @@
+# bench_numpy_runtime.py
+# This file compares the TensorFlow-free NumPy runtime with the Keras model: import + load time
+# and peak RSS of a fresh process that scores one batch, and per-batch throughput of both paths.
+# Start-up runs in spawned processes, so this module must not import TensorFlow at the top.
+#
+# Run from the project root:
+#     python -m benchmarks.bench_numpy_runtime
+#     python -m benchmarks.bench_numpy_runtime --artifact "saved files/model.npz"
+
+import argparse
+import multiprocessing
+import os
+import sys
+import tempfile
+import time
+import numpy as np
+from benchmarks.common import format_megabytes, latency_percentiles, peak_rss_bytes
+
+BATCH_SIZES = (1, 64, 4096, 65536)
+
+
+def _startup(runtime, artifact_path, queue):
+    start = time.perf_counter()
+    if runtime == 'numpy':
+        from model.numpy_runtime import NumpyModel
+        imported = time.perf_counter()
+        model = NumpyModel.load(artifact_path)
+    else:
+        from model.neural_network import NeuralNetworkModel
+        imported = time.perf_counter()
+        model = NeuralNetworkModel.load_model(artifact_path)
+    loaded = time.perf_counter()
+    model.predict(np.zeros((1, len(model.feature_spec.names)), dtype=np.float32))
+    queue.put({
+        'import': imported - start,
+        'load': loaded - imported,
+        'first_predict': time.perf_counter() - loaded,
+        'peak_rss': peak_rss_bytes(),
+        'tensorflow_loaded': 'tensorflow' in sys.modules,
+    })
+
+
+def measure_startup(runtime, artifact_path):
+    context = multiprocessing.get_context('spawn')
+    queue = context.Queue()
+    process = context.Process(target=_startup, args=(runtime, artifact_path, queue))
+    process.start()
+    result = queue.get()
+    process.join()
+    return result
+
+
+def make_artifact(file_path, rows=20_000):
+    """Save an (untrained) model with a scaler fitted on synthetic data; enough for timing."""
+    from sklearn.preprocessing import StandardScaler
+    from benchmarks.common import make_frame
+    from data.features import DEFAULT_FEATURE_SPEC
+    from data.preprocessing import engineer_features
+    from model.neural_network import NeuralNetworkModel
+
+    model = NeuralNetworkModel(input_shape=(len(DEFAULT_FEATURE_SPEC.names),), compile=False)
+    model.scaler = StandardScaler().fit(engineer_features(make_frame(rows)))
+    model.feature_spec = DEFAULT_FEATURE_SPEC
+    model.save_model(file_path)
+    return model
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark the NumPy inference runtime against the Keras model.')
+    parser.add_argument('--artifact', help='Model artifact to use (default: a freshly built model)')
+    parser.add_argument('--calls', type=int, default=200, help='Timed calls per batch size and runtime')
+    parser.add_argument('--batch-sizes', type=int, nargs='+', default=list(BATCH_SIZES))
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        artifact_path = args.artifact
+        if artifact_path is None:
+            artifact_path = os.path.join(tmp, 'model.npz')
+            # Built in a child process so the parent has not imported TensorFlow before the start-up runs
+            context = multiprocessing.get_context('spawn')
+            process = context.Process(target=make_artifact, args=(artifact_path,))
+            process.start()
+            process.join()
+
+        print(f"{'runtime':<8}{'import [s]':>12}{'load [s]':>10}{'1st call [s]':>14}{'peak RSS [MB]':>15}  TF loaded")
+        for runtime in ('numpy', 'keras'):
+            result = measure_startup(runtime, artifact_path)
+            print(f"{runtime:<8}{result['import']:>12.3f}{result['load']:>10.3f}{result['first_predict']:>14.3f}"
+                  f"{format_megabytes(result['peak_rss'], 15)}  {result['tensorflow_loaded']}")
+
+        from model.neural_network import NeuralNetworkModel
+        from model.numpy_runtime import NumpyModel
+
+        keras_model = NeuralNetworkModel.load_model(artifact_path)
+        numpy_model = NumpyModel.load(artifact_path)
+
+    rng = np.random.default_rng(0)
+    n_features = len(numpy_model.feature_names)
+    print(f"\n{'batch':>6}  {'runtime':<8}{'p50 [us]':>12}{'p99 [us]':>12}{'rows/s':>14}  max |diff|")
+    for batch_size in args.batch_sizes:
+        X = rng.standard_normal((batch_size, n_features)).astype(np.float32)
+        difference = np.abs(numpy_model.predict(X) - keras_model.predict(X, verbose=0)).max()
+        calls = max(args.calls * 64 // max(batch_size, 64), 5)
+        for name, predict in (('numpy', numpy_model.predict), ('keras', lambda X: keras_model.predict(X, verbose=0))):
+            latency = latency_percentiles(lambda: predict(X), calls, warmup=3)
+            print(f"{batch_size:>6}  {name:<8}{latency['p50'] * 1e6:>12.1f}{latency['p99'] * 1e6:>12.1f}"
+                  f"{batch_size / latency['p50']:>14,.0f}  {difference:.2e}")
+
+
+if __name__ == '__main__':
+    main()
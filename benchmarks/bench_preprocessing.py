@@ -0,0 +1,160 @@
+# bench_preprocessing.py
+# This file times every stage of preprocess_data separately on synthetic datasets of growing size
+# and stores throughput and peak memory as JSON, so versions can be compared.
+#
+# Run from the project root:
+#     python -m benchmarks.bench_preprocessing --sizes 1e3 1e4 1e5 1e6
+#     python -m benchmarks.bench_preprocessing --sizes 1e7 --format csv --compare old_results.json
+
+import argparse
+import json
+import multiprocessing
+import os
+import platform
+import subprocess
+import tempfile
+import time
+import tracemalloc
+from datetime import datetime
+import numpy as np
+import pandas as pd
+import sklearn
+from sklearn.model_selection import train_test_split
+from sklearn.preprocessing import StandardScaler
+from benchmarks.common import format_megabytes, peak_rss_bytes
+from data.parallel_ingest import load_table
+from data.preprocessing import coerce_numeric, drop_incomplete_rows, add_reliability_column, engineer_features
+from data.synthetic import write_dataset
+
+STAGES = ('load', 'coercion', 'dropna', 'target', 'features', 'scaling', 'split')
+
+RESULTS_DIR = os.path.join(os.path.dirname(os.path.realpath(__file__)), 'results')
+
+
+def run_stages(file_path, trace=False):
+    """Run the preprocess_data stages one by one; returns {stage: {'seconds', 'peak_bytes'}}."""
+    results = {}
+
+    def stage(name, func):
+        if trace:
+            tracemalloc.reset_peak()
+            baseline = tracemalloc.get_traced_memory()[0]
+        start = time.perf_counter()
+        output = func()
+        seconds = time.perf_counter() - start
+        results[name] = {'seconds': seconds,
+                         'peak_bytes': tracemalloc.get_traced_memory()[1] - baseline if trace else None}
+        return output
+
+    data = stage('load', lambda: load_table(file_path))
+    data = stage('coercion', lambda: coerce_numeric(data))
+    data, _ = stage('dropna', lambda: drop_incomplete_rows(data))
+    data = stage('target', lambda: add_reliability_column(data))
+    X = stage('features', lambda: engineer_features(data))
+    y = data['reliability'].values
+    del data
+    X_scaled = stage('scaling', lambda: StandardScaler().fit_transform(X))
+    del X
+    stage('split', lambda: train_test_split(X_scaled, y, test_size=0.05, random_state=250))
+    return results
+
+
+def _bench_size(file_path, rows, repeat, queue):
+    timings = [run_stages(file_path) for _ in range(repeat)]
+    tracemalloc.start()
+    memory = run_stages(file_path, trace=True)
+    tracemalloc.stop()
+
+    stages = {}
+    for name in STAGES:
+        seconds = min(run[name]['seconds'] for run in timings)
+        stages[name] = {'seconds': seconds, 'rows_per_second': rows / seconds if seconds > 0 else None,
+                        'peak_bytes': memory[name]['peak_bytes']}
+    total = sum(stage['seconds'] for stage in stages.values())
+    queue.put({'rows': rows, 'stages': stages, 'total_seconds': total, 'peak_rss_bytes': peak_rss_bytes()})
+
+
+def bench_size(file_path, rows, repeat):
+    # A fresh process per size keeps the peak RSS of one size from leaking into the next
+    context = multiprocessing.get_context('spawn')
+    queue = context.Queue()
+    process = context.Process(target=_bench_size, args=(file_path, rows, repeat, queue))
+    process.start()
+    result = queue.get()
+    process.join()
+    return result
+
+
+def project_version():
+    try:
+        return subprocess.run(['git', 'describe', '--always', '--dirty'], capture_output=True, text=True,
+                              cwd=os.path.dirname(RESULTS_DIR), check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return 'unknown'
+
+
+def print_results(report, baseline=None):
+    baseline_runs = {run['rows']: run for run in baseline['runs']} if baseline else {}
+    header = f"{'rows':>10} {'stage':<10}{'time [s]':>10}{'rows/s':>14}{'peak [MB]':>11}"
+    print(header + ('   vs baseline' if baseline else ''))
+    for run in report['runs']:
+        for name in STAGES + ('total',):
+            if name == 'total':
+                seconds, throughput, peak = run['total_seconds'], run['rows'] / run['total_seconds'], run['peak_rss_bytes']
+                old = baseline_runs.get(run['rows'], {}).get('total_seconds')
+            else:
+                stage = run['stages'][name]
+                seconds, throughput, peak = stage['seconds'], stage['rows_per_second'] or 0.0, stage['peak_bytes']
+                old = baseline_runs.get(run['rows'], {}).get('stages', {}).get(name, {}).get('seconds')
+            line = f"{run['rows']:>10,} {name:<10}{seconds:>10.4f}{throughput:>14,.0f}{format_megabytes(peak, 11)}"
+            if old:
+                line += f"   x{old / seconds:.2f}"
+            print(line)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Per-stage benchmark of the preprocessing pipeline.')
+    parser.add_argument('--sizes', nargs='+', type=float, default=[1e3, 1e4, 1e5, 1e6])
+    parser.add_argument('--format', choices=('csv', 'xlsx'), default='csv', help='Input file format for the load stage')
+    parser.add_argument('--nan-rate', type=float, default=0.001)
+    parser.add_argument('--non-numeric-rate', type=float, default=0.001)
+    parser.add_argument('--repeat', type=int, default=3)
+    parser.add_argument('--output', help='JSON results path (default: benchmarks/results/preprocessing_<time>.json)')
+    parser.add_argument('--compare', help='Earlier JSON results to compare against')
+    args = parser.parse_args()
+
+    report = {
+        'benchmark': 'preprocessing',
+        'version': project_version(),
+        'timestamp': datetime.now().isoformat(timespec='seconds'),
+        'platform': platform.platform(),
+        'python': platform.python_version(),
+        'libraries': {'numpy': np.__version__, 'pandas': pd.__version__, 'scikit-learn': sklearn.__version__},
+        'config': {'format': args.format, 'nan_rate': args.nan_rate, 'non_numeric_rate': args.non_numeric_rate,
+                   'repeat': args.repeat},
+        'runs': [],
+    }
+
+    with tempfile.TemporaryDirectory() as tmp:
+        for size in args.sizes:
+            rows = int(size)
+            file_path = os.path.join(tmp, f'synthetic_{rows}.{args.format}')
+            write_dataset(file_path, rows, nan_rate=args.nan_rate, non_numeric_rate=args.non_numeric_rate)
+            report['runs'].append(bench_size(file_path, rows, args.repeat))
+            os.remove(file_path)
+
+    output = args.output or os.path.join(RESULTS_DIR, f"preprocessing_{datetime.now():%Y%m%d_%H%M%S}.json")
+    os.makedirs(os.path.dirname(os.path.abspath(output)), exist_ok=True)
+    with open(output, 'w', encoding='utf-8') as f:
+        json.dump(report, f, indent=2)
+
+    baseline = None
+    if args.compare:
+        with open(args.compare, encoding='utf-8') as f:
+            baseline = json.load(f)
+    print_results(report, baseline)
+    print(f"Results written to {output}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,37 @@
+# bench_reliability.py
+# This file benchmarks the reliability target computation: row-wise apply vs. vectorized engine.
+#
+# Run from the project root:
+#     python -m benchmarks.bench_reliability --rows 1000000
+
+import argparse
+import numpy as np
+from benchmarks.common import make_frame, time_call
+from data.preprocessing import calculate_reliability, compute_reliability_targets, DEFAULT_MISSION_TIME
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark reliability target computation.')
+    parser.add_argument('--rows', type=int, default=1_000_000)
+    parser.add_argument('--horizons', type=int, default=16, help='Number of mission horizons for the multi-horizon run')
+    parser.add_argument('--repeat', type=int, default=3)
+    args = parser.parse_args()
+
+    data = make_frame(args.rows)
+    print(f"Rows: {args.rows:,}")
+
+    apply_time, apply_result = time_call(lambda: data.apply(calculate_reliability, axis=1))
+    print(f"DataFrame.apply (1 horizon):         {apply_time:10.4f} s")
+
+    vector_time, vector_result = time_call(lambda: compute_reliability_targets(data, DEFAULT_MISSION_TIME), args.repeat)
+    print(f"Vectorized exponential (1 horizon): {vector_time:10.4f} s   speed-up x{apply_time / vector_time:,.0f}")
+    np.testing.assert_allclose(vector_result[:, 0], apply_result.values, rtol=1e-12)
+
+    horizons = np.geomspace(DEFAULT_MISSION_TIME / 100, DEFAULT_MISSION_TIME * 10, args.horizons)
+    for model in ('exponential', 'weibull', 'arrhenius'):
+        model_time, targets = time_call(lambda: compute_reliability_targets(data, horizons, model=model), args.repeat)
+        print(f"Vectorized {model:<12} ({args.horizons} horizons): {model_time:8.4f} s   shape={targets.shape}")
+
+
+if __name__ == '__main__':
+    main()
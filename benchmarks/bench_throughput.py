@@ -0,0 +1,85 @@
+# bench_throughput.py
+# This file benchmarks training throughput: the default configuration (batch 77, eager-compiled
+# steps) vs. throughput mode (XLA, steps_per_execution, large batches with a scaled and warmed-up
+# learning rate), optionally with mixed precision. It reports samples/s and the time to reach a
+# target test R^2.
+#
+# Run from the project root:
+#     python -m benchmarks.bench_throughput --rows 200000 --target-r2 0.95
+
+import argparse
+import time
+import numpy as np
+from keras.callbacks import Callback
+from sklearn.metrics import r2_score
+from sklearn.model_selection import train_test_split
+from sklearn.preprocessing import StandardScaler
+from benchmarks.common import make_frame
+from data.preprocessing import clean_data, engineer_features
+from model.neural_network import NeuralNetworkModel
+
+CONFIGURATIONS = {
+    'default': {},
+    'throughput': {'throughput_mode': True},
+    'throughput_bf16': {'throughput_mode': True, 'mixed_precision': 'mixed_bfloat16'},
+}
+
+
+class ThroughputRecorder(Callback):
+    """Per-epoch wall time, plus the first time the test R^2 reaches 'target_r2'."""
+
+    def __init__(self, X_test, y_test, target_r2):
+        super().__init__()
+        self.X_test = X_test
+        self.y_test = y_test
+        self.target_r2 = target_r2
+        self.epoch_seconds = []
+        self.time_to_target = None
+        self.best_r2 = -np.inf
+
+    def on_epoch_begin(self, epoch, logs=None):
+        self.epoch_start = time.perf_counter()
+
+    def on_epoch_end(self, epoch, logs=None):
+        self.epoch_seconds.append(time.perf_counter() - self.epoch_start)
+        # Time to target counts training epochs only, not these R^2 checks
+        r2 = r2_score(self.y_test, self.model(self.X_test, training=False).numpy().ravel())
+        self.best_r2 = max(self.best_r2, r2)
+        if self.time_to_target is None and r2 >= self.target_r2:
+            self.time_to_target = sum(self.epoch_seconds)
+            self.model.stop_training = True
+
+
+def make_data(rows, seed):
+    data, _ = clean_data(make_frame(rows, seed))
+    X = StandardScaler().fit_transform(engineer_features(data)).astype(np.float32)
+    y = data['reliability'].to_numpy(np.float32)
+    return train_test_split(X, y, test_size=0.05, random_state=seed)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark training throughput and time to target R^2.')
+    parser.add_argument('--rows', type=int, default=200_000)
+    parser.add_argument('--epochs', type=int, default=100, help='Upper bound of epochs per configuration')
+    parser.add_argument('--target-r2', type=float, default=0.95)
+    parser.add_argument('--configurations', nargs='+', default=list(CONFIGURATIONS), choices=list(CONFIGURATIONS))
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+
+    X_train, X_test, y_train, y_test = make_data(args.rows, args.seed)
+    print(f"{args.rows:,} rows, target R^2 {args.target_r2}")
+    print(f"{'configuration':<18}{'samples/s':>14}{'epochs':>8}{'best R^2':>10}{'time to target [s]':>20}")
+    for name in args.configurations:
+        model = NeuralNetworkModel(input_shape=(X_train.shape[1],), **CONFIGURATIONS[name])
+        recorder = ThroughputRecorder(X_test, y_test, args.target_r2)
+        model.train(X_train, y_train, epochs=args.epochs, callbacks=[recorder], verbose=0)
+        # The first epoch includes tracing and XLA compilation
+        steady = recorder.epoch_seconds[1:] or recorder.epoch_seconds
+        samples_per_second = len(y_train) * (1 - 0.07) / np.median(steady)
+        time_to_target = f"{recorder.time_to_target:.1f}" if recorder.time_to_target is not None else 'not reached'
+        print(f"{name:<18}{samples_per_second:>14,.0f}{len(recorder.epoch_seconds):>8}"
+              f"{recorder.best_r2:>10.4f}{time_to_target:>20}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,59 @@
+# common.py
+# This file contains helpers shared by the benchmark scripts.
+
+import sys
+import time
+import numpy as np
+
+
+def make_frame(rows, seed=0):
+    """Return a clean synthetic V/f/T/N/ttf table with the value ranges of our measurement sheets."""
+    # Imported here so start-up benchmarks can use this module without loading pandas
+    from data.synthetic import generate_dataset
+
+    return generate_dataset(rows, seed=seed)
+
+
+def time_call(func, repeat=1):
+    """Return (best wall time in seconds, result of the last call)."""
+    best = float('inf')
+    result = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = func()
+        best = min(best, time.perf_counter() - start)
+    return best, result
+
+
+def latency_percentiles(func, calls=1000, warmup=20, percentiles=(50, 99)):
+    """Call 'func' repeatedly and return {'p50': seconds, 'p99': seconds, ...} of the per-call latency."""
+    for _ in range(warmup):
+        func()
+    samples = np.empty(calls)
+    for i in range(calls):
+        start = time.perf_counter()
+        func()
+        samples[i] = time.perf_counter() - start
+    return {f'p{p}': float(np.percentile(samples, p)) for p in percentiles}
+
+
+def peak_rss_bytes():
+    """Peak resident set size of the current process in bytes, or None where it cannot be measured."""
+    try:
+        import resource
+    except ImportError:
+        # Windows: psutil exposes the peak working set; it is optional, like the benchmarks
+        try:
+            import psutil
+        except ImportError:
+            print("Peak RSS not measured: install psutil to measure it on Windows.")
+            return None
+        return psutil.Process().memory_info().peak_wset
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is in bytes on macOS and in kilobytes on Linux
+    return peak if sys.platform == 'darwin' else peak * 1024
+
+
+def format_megabytes(n_bytes, width):
+    """Right-aligned size in MB for the result tables, 'n/a' when it was not measured."""
+    return f"{'n/a':>{width}}" if n_bytes is None else f"{n_bytes / 2 ** 20:>{width}.1f}"
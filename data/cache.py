@@ -0,0 +1,160 @@
+# cache.py
+# This file contains a content-addressed cache for preprocessed datasets.
+# Entries are keyed by the SHA-256 of the input file plus the preprocessing parameters and are
+# stored with the same .npy/.npz layout as the streaming pipeline, so they load memory-mapped.
+
+import hashlib
+import json
+import os
+import shutil
+import tempfile
+import time
+import numpy as np
+from app_logging import logger
+from data.features import DEFAULT_FEATURE_SPEC
+from data.preprocessing import preprocess_data, scaler_state, DEFAULT_MISSION_TIME, TEST_SIZE, RANDOM_STATE
+from data.streaming import load_partitions, PARTITIONS, SCALER_FILE
+from data.dataset import CompactDataset, load_compact_dataset
+
+# Bump when the cached layout or the preprocessing semantics change
+CACHE_FORMAT_VERSION = 2
+
+DEFAULT_CACHE_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.realpath(__file__))),
+                                 'temp', 'preprocessing_cache')
+DEFAULT_MAX_BYTES = 2 * 1024 ** 3
+
+
+def file_digest(file_path, block_size=4 * 1024 * 1024):
+    """Return the SHA-256 hex digest of a file's content, read in blocks."""
+    digest = hashlib.sha256()
+    with open(file_path, 'rb') as f:
+        for block in iter(lambda: f.read(block_size), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+class PreprocessingCache:
+    """Size-bounded LRU cache of preprocess_data results on disk."""
+
+    def __init__(self, cache_dir=DEFAULT_CACHE_DIR, max_bytes=DEFAULT_MAX_BYTES):
+        self.cache_dir = cache_dir
+        self.max_bytes = max_bytes
+        os.makedirs(cache_dir, exist_ok=True)
+
+    def make_key(self, file_path, feature_spec=DEFAULT_FEATURE_SPEC, **params):
+        params = dict(params, features=feature_spec.to_dict(), version=CACHE_FORMAT_VERSION)
+        payload = file_digest(file_path) + json.dumps(params, sort_keys=True, default=str)
+        return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+    def _entry_dir(self, key):
+        return os.path.join(self.cache_dir, key)
+
+    def get(self, key):
+        """Return the cached tuple for 'key', or None on a miss."""
+        entry = self._entry_dir(key)
+        if not os.path.isdir(entry):
+            return None
+        try:
+            result = load_partitions(entry)
+        except Exception as e:
+            logger.warning("⚠️ Discarding unreadable cache entry {}: {}".format(key, e))
+            shutil.rmtree(entry, ignore_errors=True)
+            return None
+        # The entry's mtime is the LRU clock
+        os.utime(entry)
+        return result
+
+    def put(self, key, result):
+        """Store a (X_train, X_test, y_train, y_test, scaler) tuple under 'key'."""
+        entry = self._entry_dir(key)
+        staging = tempfile.mkdtemp(dir=self.cache_dir, prefix='.staging_')
+        try:
+            for name, array in zip(PARTITIONS, result[:4]):
+                np.save(os.path.join(staging, name + '.npy'), np.ascontiguousarray(array))
+            np.savez(os.path.join(staging, SCALER_FILE), **scaler_state(result[4]))
+            if os.path.isdir(entry):
+                shutil.rmtree(entry)
+            os.replace(staging, entry)
+        except Exception:
+            shutil.rmtree(staging, ignore_errors=True)
+            raise
+        self.evict()
+
+    def entries(self):
+        """Return (key, size_in_bytes, last_used) for every entry, least recently used first."""
+        entries = []
+        for key in os.listdir(self.cache_dir):
+            entry = self._entry_dir(key)
+            if key.startswith('.') or not os.path.isdir(entry):
+                continue
+            size = sum(os.path.getsize(os.path.join(entry, name)) for name in os.listdir(entry))
+            entries.append((key, size, os.path.getmtime(entry)))
+        entries.sort(key=lambda item: item[2])
+        return entries
+
+    def evict(self):
+        """Drop least recently used entries until the cache fits in max_bytes."""
+        entries = self.entries()
+        total = sum(size for _, size, _ in entries)
+        for key, size, _ in entries:
+            if total <= self.max_bytes:
+                break
+            shutil.rmtree(self._entry_dir(key), ignore_errors=True)
+            total -= size
+            logger.info("ℹ️ Evicted preprocessing cache entry {} ({} bytes).".format(key, size))
+
+    def clear(self):
+        for key, _, _ in self.entries():
+            shutil.rmtree(self._entry_dir(key), ignore_errors=True)
+
+
+def _cached(file_path, cache, layout, compute, **params):
+    """Return (result, key, hit); on a miss 'result' is computed with compute(file_path, **params)."""
+    start = time.perf_counter()
+    key = cache.make_key(file_path, layout=layout, **params)
+
+    result = cache.get(key)
+    if result is not None:
+        logger.info("ℹ️ Preprocessing cache hit for {} ({:.1f} ms).".format(
+            file_path, (time.perf_counter() - start) * 1000))
+        return result, key, True
+
+    logger.info("ℹ️ Preprocessing cache miss for {}.".format(file_path))
+    return compute(file_path, **params), key, False
+
+
+def _store(cache, key, result):
+    try:
+        cache.put(key, result)
+    except Exception as e:
+        # A failed cache write must never break loading the data
+        logger.warning("⚠️ Could not write preprocessing cache entry: {}".format(e))
+
+
+def cached_preprocess_data(file_path, cache=None, mission_time=DEFAULT_MISSION_TIME, reliability_model='exponential',
+                           test_size=TEST_SIZE, random_state=RANDOM_STATE, feature_spec=DEFAULT_FEATURE_SPEC):
+    """
+    Drop-in replacement for preprocess_data that reuses earlier results for unchanged files.
+    Returns the same (X_train, X_test, y_train, y_test, scaler) tuple; on a hit the arrays
+    are memory-mapped from the cache.
+    """
+    cache = cache or PreprocessingCache()
+    result, key, hit = _cached(file_path, cache, 'tuple', preprocess_data, mission_time=mission_time,
+                               reliability_model=reliability_model, test_size=test_size, random_state=random_state,
+                               feature_spec=feature_spec)
+    if not hit:
+        _store(cache, key, result)
+    return result
+
+
+def cached_compact_dataset(file_path, cache=None, mission_time=DEFAULT_MISSION_TIME, reliability_model='exponential',
+                           test_size=TEST_SIZE, random_state=RANDOM_STATE, feature_spec=DEFAULT_FEATURE_SPEC):
+    """Like cached_preprocess_data, but builds and returns a float32 CompactDataset."""
+    cache = cache or PreprocessingCache()
+    result, key, hit = _cached(file_path, cache, 'compact', load_compact_dataset, mission_time=mission_time,
+                               reliability_model=reliability_model, test_size=test_size, random_state=random_state,
+                               feature_spec=feature_spec)
+    if hit:
+        return CompactDataset.from_arrays(*result, feature_spec=feature_spec)
+    _store(cache, key, result.as_tuple())
+    return result
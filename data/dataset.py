@@ -0,0 +1,167 @@
+# dataset.py
+# This file defines CompactDataset, the float32 columnar representation of a preprocessed dataset.
+# The scaled features live in one column-major float32 block (every feature column is contiguous)
+# with the training rows stored first, so the train/test splits are views rather than copies.
+
+import numpy as np
+import pandas as pd
+from sklearn.model_selection import train_test_split
+from app_logging import logger
+from data.features import DEFAULT_FEATURE_SPEC
+from data.preprocessing import (clean_data, engineer_features, restore_scaler, aggregate_operating_points,
+                                DEFAULT_MISSION_TIME, TEST_SIZE, RANDOM_STATE)
+
+FEATURE_DTYPE = np.float32
+
+
+class CompactDataset:
+    """
+    Scaled float32 features and targets with the train/test split expressed as row ranges.
+    'weights' holds optional per-row sample weights (e.g. group sizes after aggregation).
+    """
+
+    def __init__(self, features, targets, n_train, scaler, feature_spec=DEFAULT_FEATURE_SPEC, weights=None):
+        if features.dtype != FEATURE_DTYPE or not features.flags['F_CONTIGUOUS']:
+            raise ValueError("features must be a column-major {} array".format(np.dtype(FEATURE_DTYPE).name))
+        if features.shape[1] != len(feature_spec.names):
+            raise ValueError("features have {} columns but the spec names {}".format(features.shape[1], feature_spec.names))
+        self.features = features
+        self.targets = targets
+        self.n_train = n_train
+        self.scaler = scaler
+        self.feature_spec = feature_spec
+        self.weights = weights
+
+    @classmethod
+    def from_arrays(cls, X_train, X_test, y_train, y_test, scaler, feature_spec=DEFAULT_FEATURE_SPEC):
+        """Build a dataset from the (X_train, X_test, y_train, y_test, scaler) tuple of preprocess_data."""
+        n_train = len(X_train)
+        features = np.empty((n_train + len(X_test), X_train.shape[1]), dtype=FEATURE_DTYPE, order='F')
+        features[:n_train] = X_train
+        features[n_train:] = X_test
+        targets = np.concatenate([np.asarray(y_train, dtype=FEATURE_DTYPE), np.asarray(y_test, dtype=FEATURE_DTYPE)])
+        return cls(features, targets, n_train, scaler, feature_spec)
+
+    @property
+    def feature_names(self):
+        return self.feature_spec.names
+
+    @property
+    def n_rows(self):
+        return self.features.shape[0]
+
+    @property
+    def n_features(self):
+        return self.features.shape[1]
+
+    @property
+    def nbytes(self):
+        return self.features.nbytes + self.targets.nbytes + (self.weights.nbytes if self.weights is not None else 0)
+
+    @property
+    def X_train(self):
+        return self.features[:self.n_train]
+
+    @property
+    def X_test(self):
+        return self.features[self.n_train:]
+
+    @property
+    def y_train(self):
+        return self.targets[:self.n_train]
+
+    @property
+    def y_test(self):
+        return self.targets[self.n_train:]
+
+    @property
+    def w_train(self):
+        return self.weights[:self.n_train] if self.weights is not None else None
+
+    @property
+    def w_test(self):
+        return self.weights[self.n_train:] if self.weights is not None else None
+
+    def column(self, name, split=None):
+        """Return one scaled feature column (a contiguous view) for 'train', 'test' or all rows."""
+        values = self.features[:, self.feature_names.index(name)]
+        if split == 'train':
+            return values[:self.n_train]
+        if split == 'test':
+            return values[self.n_train:]
+        return values
+
+    def aggregate_training_rows(self, quantize=None, reduce='mean'):
+        """
+        Return a new dataset whose training rows are collapsed into one weighted row per
+        (quantized) operating point; the test rows are kept as they are so evaluation is
+        unchanged. 'quantize' maps feature names to step sizes in original units.
+        """
+        steps = None
+        if quantize:
+            # Convert the steps from original units into the scaled units of the features
+            steps = np.array([quantize.get(name, 0.0) for name in self.feature_names], dtype=np.float64)
+            steps /= self.scaler.scale_
+        X_train, y_train, counts = aggregate_operating_points(self.X_train, self.y_train, steps, reduce, self.w_train)
+
+        n_train = len(X_train)
+        features = np.empty((n_train + len(self.X_test), self.n_features), dtype=FEATURE_DTYPE, order='F')
+        features[:n_train] = X_train
+        features[n_train:] = self.X_test
+        targets = np.concatenate([y_train.astype(FEATURE_DTYPE), self.y_test])
+        w_test = self.w_test if self.weights is not None else np.ones(len(self.y_test))
+        weights = np.concatenate([counts, w_test]).astype(FEATURE_DTYPE)
+        return CompactDataset(features, targets, n_train, self.scaler, self.feature_spec, weights)
+
+    def as_tuple(self):
+        """Return the preprocess_data-style tuple; the arrays are views into this dataset."""
+        return self.X_train, self.X_test, self.y_train, self.y_test, self.scaler
+
+
+def load_compact_dataset(file_path, mission_time=DEFAULT_MISSION_TIME, reliability_model='exponential',
+                         test_size=TEST_SIZE, random_state=RANDOM_STATE, feature_spec=DEFAULT_FEATURE_SPEC):
+    """
+    Low-memory counterpart of preprocess_data returning a CompactDataset.
+
+    The feature spec is evaluated straight into the float32 block in split order and
+    then scaled column by column in place, so no full float64 copy of the feature matrix
+    is ever built. The split uses the same train_test_split indices as preprocess_data.
+    """
+    logger.info("ℹ️ Starting compact preprocessing of data.")
+    try:
+        data = pd.read_excel(file_path)
+        logger.info("ℹ️ Data loaded successfully from {}".format(file_path))
+    except Exception as e:
+        logger.critical("⛔ Critical error in loading data: {}".format(e))
+        raise e
+
+    data, _ = clean_data(data, mission_time, reliability_model)
+
+    train_index, test_index = train_test_split(np.arange(len(data)), test_size=test_size, random_state=random_state)
+    order = np.concatenate([train_index, test_index])
+    n_train = len(train_index)
+    del train_index, test_index
+
+    features = engineer_features(data, feature_spec, rows=order, dtype=FEATURE_DTYPE, order='F')
+    targets = data['reliability'].to_numpy(dtype=np.float64)[order].astype(FEATURE_DTYPE)
+    del data
+
+    try:
+        state = {'mean': [], 'var': [], 'scale': [], 'n_samples_seen': len(order)}
+        for j in range(features.shape[1]):
+            # Statistics are accumulated in float64, the column is scaled in place in float32
+            column = features[:, j]
+            mean = column.mean(dtype=np.float64)
+            var = column.var(dtype=np.float64)
+            scale = np.sqrt(var) if var > 0 else 1.0
+            column -= mean
+            column /= scale
+            state['mean'].append(mean)
+            state['var'].append(var)
+            state['scale'].append(scale)
+        logger.info("ℹ️ Input data normalized successfully.")
+    except Exception as e:
+        logger.critical("⛔ Critical error in compact normalization: {}".format(e))
+        raise e
+
+    return CompactDataset(features, targets, n_train, restore_scaler(state), feature_spec)
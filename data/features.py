@@ -0,0 +1,139 @@
+# features.py
+# This file contains the declarative feature specification used by every preprocessing path.
+# A FeatureSpec lists the base measurement columns plus derived expressions (powers, products,
+# logs, Arrhenius 1/T terms). It is compiled once into an evaluation plan that fills the feature
+# matrix in a single pass, computing every derived term once even when several features share it.
+
+from collections import namedtuple
+import numpy as np
+
+KELVIN_OFFSET = 273.15
+
+
+def _power(inputs, exponent):
+    return inputs[0] ** exponent
+
+
+def _product(inputs):
+    result = inputs[0] * inputs[1]
+    for values in inputs[2:]:
+        result *= values
+    return result
+
+
+def _log(inputs, offset=0.0):
+    return np.log(inputs[0] + offset) if offset else np.log(inputs[0])
+
+
+def _inverse(inputs, offset=0.0):
+    return 1.0 / (inputs[0] + offset) if offset else 1.0 / inputs[0]
+
+
+# Operations available to derived features: name -> function(list_of_input_arrays, **params)
+OPERATIONS = {
+    'power': _power,
+    'product': _product,
+    'log': _log,
+    'inverse': _inverse,
+}
+
+
+DerivedFeature = namedtuple('DerivedFeature', ['name', 'op', 'inputs', 'params'])
+
+
+def derived(name, op, *inputs, **params):
+    """Shorthand for DerivedFeature, e.g. derived('N_squared', 'power', 'N', exponent=2)."""
+    if op not in OPERATIONS:
+        raise ValueError("Unknown feature operation '{}', expected one of {}".format(op, sorted(OPERATIONS)))
+    return DerivedFeature(name, op, tuple(inputs), dict(params))
+
+
+class FeatureSpec:
+    """Ordered model features: base columns first, then derived expressions."""
+
+    def __init__(self, base, derived_features=()):
+        self.base = list(base)
+        self.derived = list(derived_features)
+        names = self.names
+        if len(set(names)) != len(names):
+            raise ValueError("Duplicate feature names in {}".format(names))
+        self._plan = self._compile()
+
+    @property
+    def names(self):
+        return self.base + [feature.name for feature in self.derived]
+
+    def _compile(self):
+        # Resolve every derived feature to a canonical signature so identical expressions
+        # (under different names, or nested inside other features) are evaluated only once.
+        known = set(self.base)
+        signatures = {}
+        plan = []
+        for feature in self.derived:
+            missing = [name for name in feature.inputs if name not in known]
+            if missing:
+                raise ValueError("Feature '{}' depends on unknown columns {}".format(feature.name, missing))
+            inputs = tuple(signatures.get(name, name) for name in feature.inputs)
+            signature = (feature.op, inputs, tuple(sorted(feature.params.items())))
+            plan.append((feature.name, signature))
+            signatures[feature.name] = signature
+            known.add(feature.name)
+        return plan
+
+    def to_dict(self):
+        return {
+            'base': list(self.base),
+            'derived': [{'name': f.name, 'op': f.op, 'inputs': list(f.inputs), 'params': dict(f.params)}
+                        for f in self.derived],
+        }
+
+    @classmethod
+    def from_dict(cls, spec):
+        return cls(spec['base'], [derived(f['name'], f['op'], *f['inputs'], **f['params']) for f in spec['derived']])
+
+    def __eq__(self, other):
+        return isinstance(other, FeatureSpec) and self.to_dict() == other.to_dict()
+
+    def __repr__(self):
+        return "FeatureSpec({})".format(self.names)
+
+    def evaluate(self, columns, rows=None, dtype=np.float64, order='C'):
+        """
+        Build the (n_rows, n_features) feature matrix from 'columns' (a DataFrame or any
+        mapping of column arrays) in one pass. 'rows' optionally selects and reorders rows;
+        each base column is gathered once and each derived expression is computed once.
+        """
+        cache = {}
+
+        def resolve(key):
+            if key in cache:
+                return cache[key]
+            if isinstance(key, str):
+                values = np.asarray(columns[key], dtype=np.float64)
+                if rows is not None:
+                    values = values[rows]
+            else:
+                op, inputs, params = key
+                values = OPERATIONS[op]([resolve(name) for name in inputs], **dict(params))
+            cache[key] = values
+            return values
+
+        n_rows = len(rows) if rows is not None else len(columns[self.base[0]])
+        out = np.empty((n_rows, len(self.base) + len(self._plan)), dtype=dtype, order=order)
+        for j, name in enumerate(self.base):
+            out[:, j] = resolve(name)
+        for j, (_, signature) in enumerate(self._plan, start=len(self.base)):
+            out[:, j] = resolve(signature)
+        return out
+
+
+# The feature set the model has always been trained on
+DEFAULT_FEATURE_SPEC = FeatureSpec(['V', 'f', 'T', 'N'], [derived('N_squared', 'power', 'N', exponent=2)])
+
+# Example of a richer spec with Arrhenius terms, e.g. for FeatureSpec experiments
+ARRHENIUS_FEATURE_SPEC = FeatureSpec(['V', 'f', 'T', 'N'], [
+    derived('N_squared', 'power', 'N', exponent=2),
+    derived('V_f', 'product', 'V', 'f'),
+    derived('log_T', 'log', 'T', offset=KELVIN_OFFSET),
+    derived('inv_T', 'inverse', 'T', offset=KELVIN_OFFSET),
+])
@@ -0,0 +1,112 @@
+# parallel_ingest.py
+# This file contains the multi-file ingestion path: every workbook of a test campaign is parsed,
+# validated and cleaned in its own worker process, then the results are merged and scaled once.
+
+import glob
+import multiprocessing
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+import numpy as np
+import pandas as pd
+from sklearn.model_selection import train_test_split
+from sklearn.preprocessing import StandardScaler
+from app_logging import logger
+from data.features import DEFAULT_FEATURE_SPEC
+from data.preprocessing import clean_data, engineer_features, RAW_COLUMNS, DEFAULT_MISSION_TIME, TEST_SIZE, RANDOM_STATE
+
+SUPPORTED_EXTENSIONS = ('.xlsx', '.xls', '.csv')
+
+
+def expand_inputs(inputs):
+    """Turn a directory, a single path or a list of paths into a sorted list of data files."""
+    if isinstance(inputs, str):
+        inputs = [inputs]
+    files = []
+    for path in inputs:
+        if os.path.isdir(path):
+            for extension in SUPPORTED_EXTENSIONS:
+                files.extend(glob.glob(os.path.join(path, '*' + extension)))
+        else:
+            files.append(path)
+    # Skip Excel lock files such as '~$DataSet.xlsx'
+    return sorted(f for f in set(files) if not os.path.basename(f).startswith('~$'))
+
+
+def load_table(file_path):
+    if os.path.splitext(file_path)[1].lower() == '.csv':
+        return pd.read_csv(file_path)
+    return pd.read_excel(file_path)
+
+
+def _ingest_one(file_path, mission_time, reliability_model, feature_spec):
+    """Worker: load, validate and clean one file. Returns its features, targets and statistics."""
+    start = time.perf_counter()
+    data = load_table(file_path)
+    missing = [col for col in RAW_COLUMNS if col not in data.columns]
+    if missing:
+        raise ValueError("{} is missing columns {}".format(file_path, missing))
+
+    rows = len(data)
+    data, dropped = clean_data(data, mission_time, reliability_model)
+    X = engineer_features(data, feature_spec)
+    y = data['reliability'].to_numpy(dtype=np.float64)
+    stats = {'file': file_path, 'rows': rows, 'dropped': dropped, 'kept': len(X),
+             'seconds': time.perf_counter() - start}
+    return X, y, stats
+
+
+def ingest_unscaled(inputs, max_workers=None, mission_time=DEFAULT_MISSION_TIME, reliability_model='exponential',
+                    feature_spec=DEFAULT_FEATURE_SPEC):
+    """
+    Clean several files (or every data file in a directory) in a process pool and return
+    (X, y, report): the merged, unscaled feature matrix, the targets and the per-file
+    report (dicts with rows, dropped, kept and seconds).
+    """
+    files = expand_inputs(inputs)
+    if not files:
+        raise ValueError("No data files found in {}".format(inputs))
+    max_workers = min(max_workers or os.cpu_count() or 1, len(files))
+    logger.info("ℹ️ Ingesting {} files with {} worker processes.".format(len(files), max_workers))
+
+    try:
+        # Spawned, not forked: the GUI ingests from a worker thread of a process that has loaded TensorFlow
+        with ProcessPoolExecutor(max_workers=max_workers, mp_context=multiprocessing.get_context('spawn')) as executor:
+            results = list(executor.map(_ingest_one, files, [mission_time] * len(files),
+                                        [reliability_model] * len(files), [feature_spec] * len(files)))
+    except Exception as e:
+        logger.critical("⛔ Critical error in parallel ingestion: {}".format(e))
+        raise e
+
+    report = [stats for _, _, stats in results]
+    for stats in report:
+        logger.info("ℹ️ {file}: {rows} rows, {dropped} dropped, {kept} kept ({seconds:.2f} s)".format(**stats))
+
+    X = np.concatenate([X for X, _, _ in results])
+    y = np.concatenate([y for _, y, _ in results])
+    return X, y, report
+
+
+def ingest_files(inputs, max_workers=None, mission_time=DEFAULT_MISSION_TIME, reliability_model='exponential',
+                 test_size=TEST_SIZE, random_state=RANDOM_STATE, feature_spec=DEFAULT_FEATURE_SPEC):
+    """
+    Preprocess several files (or every data file in a directory) in a process pool.
+
+    Each worker cleans one file; the merged matrix gets a single global scaler fit and
+    the usual train/test split. Returns ((X_train, X_test, y_train, y_test, scaler), report)
+    where 'report' is a list of per-file dicts with rows, dropped, kept and seconds.
+    """
+    start = time.perf_counter()
+    X, y, report = ingest_unscaled(inputs, max_workers, mission_time, reliability_model, feature_spec)
+
+    try:
+        scaler = StandardScaler()
+        X_scaled = scaler.fit_transform(X)
+        logger.info("ℹ️ Input data normalized successfully.")
+    except Exception as e:
+        logger.critical("⛔ Critical error in input normalization: {}".format(e))
+        raise e
+
+    X_train, X_test, y_train, y_test = train_test_split(X_scaled, y, test_size=test_size, random_state=random_state)
+    logger.info("ℹ️ Ingested {} rows from {} files in {:.2f} s.".format(len(X), len(report), time.perf_counter() - start))
+    return (X_train, X_test, y_train, y_test, scaler), report
@@ -1,35 +1,106 @@
 # preprocessing.py
 # This file contains functions for data cleaning, scaling, and splitting.
 
+import math
 import pandas as pd
 from sklearn.model_selection import train_test_split
 from sklearn.preprocessing import StandardScaler
 import numpy as np
 from app_logging import logger
+from data.features import DEFAULT_FEATURE_SPEC
 
 
-def calculate_reliability(row, t=87660 * 10):
+# Default mission time used for the reliability target (same units as 'ttf')
+DEFAULT_MISSION_TIME = 87660 * 10
+
+# Boltzmann constant in eV/K, used by the Arrhenius acceleration model
+BOLTZMANN_EV = 8.617333262e-5
+
+# Lifetime models supported by compute_reliability_targets
+RELIABILITY_MODELS = ('exponential', 'weibull', 'arrhenius')
+
+# Raw measurement columns and the model feature order
+RAW_COLUMNS = ['V', 'f', 'T', 'N', 'ttf']
+FEATURE_COLUMNS = DEFAULT_FEATURE_SPEC.names
+
+# Default train/test split
+TEST_SIZE = 0.05
+RANDOM_STATE = 250
+
+
+def calculate_reliability(row, t=DEFAULT_MISSION_TIME):
     lambda_ = 1 / row['ttf']
     return np.exp(-lambda_ * t) * 100
 
-def preprocess_data(file_path):
-    logger.info("ℹ️ Starting preprocessing of data.")
 
-    try:
-        # Load the data
-        data = pd.read_excel(file_path)
-        logger.info("ℹ️ Data loaded successfully from {}".format(file_path))
-    except Exception as e:
-        logger.critical("⛔ Critical error in loading data: {}".format(e))
-        raise e
+def _characteristic_life(data, model, shape, activation_energy, voltage_exponent,
+                         reference_temperature, reference_voltage):
+    """Return the characteristic life (eta) of every row as a float64 column."""
+    ttf = np.asarray(data['ttf'], dtype=np.float64)
+
+    if model == 'exponential':
+        return ttf
 
+    if model == 'weibull':
+        # Interpret 'ttf' as the mean life, so eta = MTTF / Gamma(1 + 1/beta)
+        return ttf / math.gamma(1.0 + 1.0 / shape)
+
+    if model == 'arrhenius':
+        # Arrhenius/Black acceleration: 'ttf' was observed at the row's (T, V) stress,
+        # scale it back to the reference operating point (T in Celsius).
+        temperature_k = np.asarray(data['T'], dtype=np.float64) + 273.15
+        reference_k = reference_temperature + 273.15
+        voltage = np.asarray(data['V'], dtype=np.float64)
+        exponent = (activation_energy / BOLTZMANN_EV) * (1.0 / reference_k - 1.0 / temperature_k)
+        acceleration = np.exp(exponent) * (voltage / reference_voltage) ** voltage_exponent
+        eta = ttf * acceleration
+        if shape != 1.0:
+            eta /= math.gamma(1.0 + 1.0 / shape)
+        return eta
+
+    raise ValueError("Unknown reliability model '{}', expected one of {}".format(model, RELIABILITY_MODELS))
+
+
+def compute_reliability_targets(data, horizons=DEFAULT_MISSION_TIME, model='exponential', shape=None,
+                                activation_energy=0.7, voltage_exponent=2.0,
+                                reference_temperature=25.0, reference_voltage=1.0):
+    """
+    Compute reliability targets (in percent) for every row at every mission horizon.
+
+    The whole computation is done on NumPy columns, no per-row Python calls.
+    'data' is a DataFrame (or any mapping of column arrays) holding 'ttf', plus 'T'
+    and 'V' for the Arrhenius model. Returns a float64 array of shape
+    (n_rows, n_horizons).
+    """
+    if shape is None:
+        shape = 1.5 if model == 'weibull' else 1.0
+    t = np.atleast_1d(np.asarray(horizons, dtype=np.float64))
+
+    eta = _characteristic_life(data, model, shape, activation_energy, voltage_exponent,
+                               reference_temperature, reference_voltage)
+
+    # R(t) = exp(-(t / eta) ** beta), evaluated in place on one (n_rows, n_horizons) buffer
+    targets = np.outer(1.0 / eta, t)
+    if shape != 1.0:
+        np.power(targets, shape, out=targets)
+    np.negative(targets, out=targets)
+    np.exp(targets, out=targets)
+    targets *= 100
+    return targets
+
+
+def coerce_numeric(data):
+    """Convert every raw column that is not numeric yet; unparsable cells become NaN."""
     # Check if columns have the correct data type
-    columns_to_check = ['V', 'f', 'T', 'N', 'ttf']
-    for col in columns_to_check:
+    for col in RAW_COLUMNS:
         if not pd.api.types.is_numeric_dtype(data[col]):
             logger.warning("⚠️ Column {} is not numeric. Converting to numeric dtype.".format(col))
             data[col] = pd.to_numeric(data[col], errors='coerce')
+    return data
+
 
+def drop_incomplete_rows(data):
+    """Drop rows with any NaN value. Returns the remaining rows and the number dropped."""
     try:
         # Drop rows with any NaN values
         initial_row_count = len(data)
@@ -39,26 +110,60 @@ def preprocess_data(file_path):
     except Exception as e:
         logger.critical("⛔ Critical error when dropping NaN values: {}".format(e))
         raise e
+    return data, dropped_row_count
 
+
+def add_reliability_column(data, mission_time=DEFAULT_MISSION_TIME, reliability_model='exponential'):
     try:
         # Add a new column for the reliability
-        data['reliability'] = data.apply(calculate_reliability, axis=1)
+        data['reliability'] = compute_reliability_targets(data, mission_time, model=reliability_model)[:, 0]
         logger.info("ℹ️ Reliability column added successfully.")
     except Exception as e:
         logger.critical("⛔ Critical error when calculating reliability: {}".format(e))
         raise e
+    return data
+
 
+def clean_data(data, mission_time=DEFAULT_MISSION_TIME, reliability_model='exponential'):
+    """
+    Coerce the raw columns to numeric, drop NaN rows and add the 'reliability' target.
+    Works on a whole sheet or on a single chunk of it. Returns the cleaned DataFrame
+    and the number of dropped rows.
+    """
+    data = coerce_numeric(data)
+    data, dropped_row_count = drop_incomplete_rows(data)
+    data = add_reliability_column(data, mission_time, reliability_model)
+    return data, dropped_row_count
+
+
+def engineer_features(data, feature_spec=DEFAULT_FEATURE_SPEC, rows=None, dtype=np.float64, order='C'):
+    """Evaluate 'feature_spec' over the cleaned data into one feature matrix (see FeatureSpec.evaluate)."""
     try:
-        # Feature Engineering: Add new feature if possible, for now just square of 'N'
-        data['N_squared'] = data['N'] ** 2
-        logger.info("ℹ️ N_squared feature engineered successfully.")
+        X = feature_spec.evaluate(data, rows=rows, dtype=dtype, order=order)
+        logger.info("ℹ️ Features {} engineered successfully.".format(feature_spec.names))
+        return X
     except Exception as e:
-        logger.critical("⛔ Critical error in feature engineering N_squared: {}".format(e))
+        logger.critical("⛔ Critical error in feature engineering: {}".format(e))
         raise e
 
+
+def preprocess_data(file_path, mission_time=DEFAULT_MISSION_TIME, reliability_model='exponential',
+                    test_size=TEST_SIZE, random_state=RANDOM_STATE, feature_spec=DEFAULT_FEATURE_SPEC):
+    logger.info("ℹ️ Starting preprocessing of data.")
+
     try:
-        # Extract features and targets
-        X = data[['V', 'f', 'T', 'N', 'N_squared']].values
+        # Load the data
+        data = pd.read_excel(file_path)
+        logger.info("ℹ️ Data loaded successfully from {}".format(file_path))
+    except Exception as e:
+        logger.critical("⛔ Critical error in loading data: {}".format(e))
+        raise e
+
+    data, _ = clean_data(data, mission_time, reliability_model)
+    X = engineer_features(data, feature_spec)
+
+    try:
+        # Extract targets
         Y_reliability = data['reliability'].values
         logger.debug("🐛 Features and targets extracted.")
     except Exception as e:
@@ -76,10 +181,100 @@ def preprocess_data(file_path):
 
     try:
         # Split the data
-        X_train, X_test, y_train, y_test = train_test_split(X_scaled, Y_reliability, test_size=0.05, random_state=250)
+        X_train, X_test, y_train, y_test = train_test_split(X_scaled, Y_reliability, test_size=test_size, random_state=random_state)
         logger.info("ℹ️ Data split into train and test sets successfully.")
     except Exception as e:
         logger.critical("⛔ Critical error in data splitting: {}".format(e))
         raise e
 
     return X_train, X_test, y_train, y_test, scaler
+
+
+def scaler_state(scaler):
+    """Return the fitted StandardScaler statistics as a dict of NumPy arrays."""
+    return {
+        'mean': np.asarray(scaler.mean_, dtype=np.float64),
+        'var': np.asarray(scaler.var_, dtype=np.float64),
+        'scale': np.asarray(scaler.scale_, dtype=np.float64),
+        'n_samples_seen': np.asarray(scaler.n_samples_seen_, dtype=np.int64),
+    }
+
+
+def restore_scaler(state):
+    """Rebuild a fitted StandardScaler from the dict produced by scaler_state."""
+    scaler = StandardScaler()
+    scaler.mean_ = np.asarray(state['mean'], dtype=np.float64)
+    scaler.var_ = np.asarray(state['var'], dtype=np.float64)
+    scaler.scale_ = np.asarray(state['scale'], dtype=np.float64)
+    n_samples_seen = np.asarray(state['n_samples_seen'], dtype=np.int64)
+    # A NumPy scalar (not a Python int) keeps partial_fit working on the restored scaler
+    scaler.n_samples_seen_ = n_samples_seen[()] if n_samples_seen.ndim == 0 else n_samples_seen
+    scaler.n_features_in_ = scaler.mean_.shape[0]
+    return scaler
+
+
+def _group_ids(keys):
+    # Hash-based group-by over the rows of 'keys': every distinct row gets one group id
+    frame = pd.DataFrame(keys)
+    return frame.groupby(list(frame.columns), sort=False).ngroup().to_numpy()
+
+
+def _weighted_group_median(y, group_ids, w, n_groups):
+    # Sort by group, then y; the median is where a group's cumulative weight reaches half its
+    # total, averaged with the next value when it lands exactly on the half (as for even counts)
+    order = np.lexsort((y, group_ids))
+    y_sorted = y[order].astype(np.float64)
+    cumulative = np.cumsum(w[order])
+    totals = np.bincount(group_ids, weights=w, minlength=n_groups)
+    half = np.cumsum(totals) - totals / 2
+    lower = np.searchsorted(cumulative, half, side='left')
+    upper = np.minimum(lower + 1, len(y) - 1)
+    on_half = np.isclose(cumulative[lower], half, rtol=1e-12, atol=0.0)
+    return np.where(on_half, 0.5 * (y_sorted[lower] + y_sorted[upper]), y_sorted[lower])
+
+
+def aggregate_operating_points(X, y, quantize=None, reduce='mean', sample_weight=None):
+    """
+    Collapse repeated operating points into one weighted row per group.
+
+    Rows of X are grouped when they are identical or, with 'quantize' (a scalar or one
+    step per column, in the units of X; a step of 0 keeps that column exact), when they
+    fall into the same quantization cell.
+    Returns (X_groups, y_groups, weights): the group mean of X, the 'mean' or 'median'
+    of y per group (weighted by 'sample_weight' if given) and the group sizes (sums of
+    'sample_weight' when the rows are already weighted), to be used as sample_weight.
+    """
+    X = np.asarray(X)
+    y = np.asarray(y)
+    if len(X) == 0:
+        return X.copy(), y.copy(), np.zeros(0, dtype=np.float64)
+
+    try:
+        keys = X
+        if quantize is not None:
+            steps = np.broadcast_to(np.asarray(quantize, dtype=np.float64), (X.shape[1],))
+            quantized = steps > 0
+            keys = np.array(X, dtype=np.float64)
+            keys[:, quantized] = np.floor(keys[:, quantized] / steps[quantized])
+        group_ids = _group_ids(keys)
+        n_groups = group_ids.max() + 1
+        w = np.ones(len(X)) if sample_weight is None else np.asarray(sample_weight, dtype=np.float64)
+        counts = np.bincount(group_ids, weights=w, minlength=n_groups)
+
+        X_groups = np.empty((n_groups, X.shape[1]), dtype=X.dtype)
+        for j in range(X.shape[1]):
+            X_groups[:, j] = np.bincount(group_ids, weights=X[:, j] * w, minlength=n_groups) / counts
+
+        if reduce == 'mean':
+            y_groups = np.bincount(group_ids, weights=y * w, minlength=n_groups) / counts
+        elif reduce == 'median':
+            y_groups = _weighted_group_median(y, group_ids, w, n_groups)
+        else:
+            raise ValueError("Unknown target reduction '{}', expected 'mean' or 'median'".format(reduce))
+        logger.info("ℹ️ Aggregated {} rows into {} operating points ({:.1%} of the original size).".format(
+            len(X), n_groups, n_groups / len(X)))
+    except Exception as e:
+        logger.critical("⛔ Critical error in operating-point aggregation: {}".format(e))
+        raise e
+
+    return X_groups, y_groups.astype(y.dtype, copy=False), counts
@@ -0,0 +1,263 @@
+# shards.py
+# This file contains the out-of-core sharded dataset format.
+# Cleaned rows are written as fixed-size .npy shards of unscaled feature columns plus the
+# reliability target, next to a manifest.json holding the column names, dtypes, row counts,
+# per-shard min/max statistics and the incrementally fitted scaler state. Readers open shards
+# lazily and skip every shard whose min/max range cannot match a (T, V, f, ...) range filter.
+# For those statistics to be selective, shards never span input files and the rows of a file
+# are sorted on a cluster column (T by default) in windows of a few shards before being cut.
+
+import json
+import os
+import zlib
+import numpy as np
+from sklearn.preprocessing import StandardScaler
+from app_logging import logger
+from data.features import DEFAULT_FEATURE_SPEC, FeatureSpec
+from data.parallel_ingest import expand_inputs
+from data.preprocessing import (clean_data, engineer_features, scaler_state, restore_scaler,
+                                DEFAULT_MISSION_TIME, TEST_SIZE, RANDOM_STATE)
+from data.streaming import iter_chunks, DEFAULT_CHUNKSIZE
+
+MANIFEST_FILE = 'manifest.json'
+MANIFEST_VERSION = 1
+DEFAULT_ROWS_PER_SHARD = 250_000
+DEFAULT_SORT_COLUMN = 'T'
+# Shards worth of rows sorted together: bounds the writer's memory per partition
+DEFAULT_SORT_SHARDS = 4
+TARGET_COLUMN = 'reliability'
+
+
+class _ShardWriter:
+    """
+    Buffers rows of one partition and flushes them as fixed-size shards. With a 'sort_column',
+    up to 'sort_shards' shards of rows are buffered and sorted on it before being cut, so every
+    shard covers a narrow range of that column.
+    """
+
+    def __init__(self, output_dir, partition, rows_per_shard, n_columns, dtype, columns, shards,
+                 sort_column=None, sort_shards=DEFAULT_SORT_SHARDS):
+        self.output_dir = output_dir
+        self.partition = partition
+        self.rows_per_shard = rows_per_shard
+        self.dtype = dtype
+        self.columns = columns
+        self.shards = shards
+        self._sort_index = columns.index(sort_column) if sort_column is not None else None
+        self._capacity = rows_per_shard * (sort_shards if sort_column is not None else 1)
+        self._buffer = np.empty((self._capacity, n_columns), dtype=dtype)
+        self._filled = 0
+
+    def append(self, block):
+        while len(block):
+            take = min(len(block), self._capacity - self._filled)
+            self._buffer[self._filled:self._filled + take] = block[:take]
+            self._filled += take
+            block = block[take:]
+            if self._filled == self._capacity:
+                self.flush()
+
+    def flush(self):
+        if self._filled == 0:
+            return
+        rows = self._buffer[:self._filled]
+        if self._sort_index is not None:
+            rows = rows[np.argsort(rows[:, self._sort_index], kind='stable')]
+        for start in range(0, len(rows), self.rows_per_shard):
+            self._write(rows[start:start + self.rows_per_shard])
+        self._filled = 0
+
+    def _write(self, rows):
+        file_name = '{}-{:05d}.npy'.format(self.partition, len(self.shards))
+        np.save(os.path.join(self.output_dir, file_name), rows)
+        self.shards.append({
+            'file': file_name,
+            'rows': int(len(rows)),
+            'min': dict(zip(self.columns, rows.min(axis=0).astype(float).tolist())),
+            'max': dict(zip(self.columns, rows.max(axis=0).astype(float).tolist())),
+        })
+
+
+def write_sharded_dataset(inputs, output_dir, rows_per_shard=DEFAULT_ROWS_PER_SHARD, chunksize=DEFAULT_CHUNKSIZE,
+                          mission_time=DEFAULT_MISSION_TIME, reliability_model='exponential', test_size=TEST_SIZE,
+                          random_state=RANDOM_STATE, feature_spec=DEFAULT_FEATURE_SPEC, dtype=np.float32, append=False,
+                          sort_column=DEFAULT_SORT_COLUMN, sort_shards=DEFAULT_SORT_SHARDS):
+    """
+    Clean one or more CSV/xlsx files chunk by chunk and write them as a sharded dataset.
+
+    Rows are assigned to the 'train' or 'test' partition with a seeded generator and
+    appended to fixed-size shards; the scaler is updated with partial_fit on the way.
+    Shards never span input files, and rows are sorted on 'sort_column' (None keeps the
+    file order) in windows of 'sort_shards' shards, so range filters on it skip shards.
+    With append=True the new rows are added to an existing dataset and its scaler keeps
+    accumulating. Returns the ShardedDataset.
+    """
+    os.makedirs(output_dir, exist_ok=True)
+    manifest_path = os.path.join(output_dir, MANIFEST_FILE)
+    columns = feature_spec.names + [TARGET_COLUMN]
+    if sort_column is not None and sort_column not in columns:
+        raise ValueError("Cannot sort shards on unknown column '{}'".format(sort_column))
+
+    if append and os.path.exists(manifest_path):
+        with open(manifest_path, encoding='utf-8') as f:
+            manifest = json.load(f)
+        if manifest['columns'] != columns:
+            raise ValueError("Cannot append {} to a dataset with columns {}".format(columns, manifest['columns']))
+        scaler = restore_scaler(manifest['scaler'])
+        rows_per_shard = manifest['rows_per_shard']
+        dtype = np.dtype(manifest['dtypes'][columns[0]])
+        # Every append run draws a different train/test sequence
+        random_state = [random_state, sum(len(shards) for shards in manifest['partitions'].values())]
+    else:
+        manifest = {
+            'version': MANIFEST_VERSION,
+            'columns': columns,
+            'dtypes': {name: np.dtype(dtype).name for name in columns},
+            'feature_spec': feature_spec.to_dict(),
+            'target': TARGET_COLUMN,
+            'rows_per_shard': rows_per_shard,
+            'partitions': {'train': [], 'test': []},
+        }
+        scaler = StandardScaler()
+
+    rng = np.random.default_rng(random_state)
+    writers = {partition: _ShardWriter(output_dir, partition, rows_per_shard, len(columns), dtype, columns, shards,
+                                       sort_column, sort_shards)
+               for partition, shards in manifest['partitions'].items()}
+
+    files = expand_inputs(inputs)
+    logger.info("ℹ️ Writing {} files into sharded dataset {}.".format(len(files), output_dir))
+    try:
+        for file_path in files:
+            for chunk in iter_chunks(file_path, chunksize):
+                chunk, _ = clean_data(chunk, mission_time, reliability_model)
+                if chunk.empty:
+                    continue
+                block = np.empty((len(chunk), len(columns)), dtype=np.float64)
+                block[:, :-1] = engineer_features(chunk, feature_spec)
+                block[:, -1] = chunk[TARGET_COLUMN].to_numpy(dtype=np.float64)
+                scaler.partial_fit(block[:, :-1])
+
+                is_test = rng.random(len(block)) < test_size
+                writers['train'].append(block[~is_test])
+                writers['test'].append(block[is_test])
+            # Close the file's last shards so their min/max ranges stay within one file
+            for writer in writers.values():
+                writer.flush()
+    except Exception as e:
+        logger.critical("⛔ Critical error while writing shards: {}".format(e))
+        raise e
+
+    manifest['scaler'] = {name: value.tolist() for name, value in scaler_state(scaler).items()}
+    manifest['total_rows'] = {partition: sum(shard['rows'] for shard in shards)
+                              for partition, shards in manifest['partitions'].items()}
+    # Write the manifest last (and atomically) so readers never see shards it does not describe
+    with open(manifest_path + '.tmp', 'w', encoding='utf-8') as f:
+        json.dump(manifest, f, indent=1)
+    os.replace(manifest_path + '.tmp', manifest_path)
+    logger.info("ℹ️ Sharded dataset written: {}".format(manifest['total_rows']))
+    return ShardedDataset(output_dir)
+
+
+class ShardedDataset:
+    """Lazy reader of a dataset written by write_sharded_dataset."""
+
+    def __init__(self, path):
+        self.path = path
+        with open(os.path.join(path, MANIFEST_FILE), encoding='utf-8') as f:
+            self.manifest = json.load(f)
+        self.columns = self.manifest['columns']
+        self.feature_spec = FeatureSpec.from_dict(self.manifest['feature_spec'])
+        self.scaler = restore_scaler(self.manifest['scaler'])
+        self._mean = self.scaler.mean_.astype(np.float32)
+        self._scale = self.scaler.scale_.astype(np.float32)
+
+    @property
+    def feature_names(self):
+        return self.feature_spec.names
+
+    @property
+    def n_features(self):
+        return len(self.feature_names)
+
+    def shards(self, partition='train', filters=None):
+        """
+        Return the manifest entries of the shards that can contain rows matching 'filters',
+        a dict of column -> (low, high) with None for an open bound.
+        """
+        filters = filters or {}
+        unknown = [name for name in filters if name not in self.columns]
+        if unknown:
+            raise ValueError("Cannot filter on unknown columns {}".format(unknown))
+        selected = []
+        for shard in self.manifest['partitions'][partition]:
+            if all((low is None or shard['max'][name] >= low) and (high is None or shard['min'][name] <= high)
+                   for name, (low, high) in filters.items()):
+                selected.append(shard)
+        return selected
+
+    def _filter_mask(self, rows, filters):
+        mask = np.ones(len(rows), dtype=bool)
+        for name, (low, high) in filters.items():
+            values = rows[:, self.columns.index(name)]
+            if low is not None:
+                mask &= values >= low
+            if high is not None:
+                mask &= values <= high
+        return mask
+
+    def validation_mask(self, shard, validation_split, seed=0):
+        """
+        Seeded per-row validation assignment of a shard (True = validation). It depends only on
+        the shard file and 'seed', so every reader with the same split sees the same rows.
+        """
+        rng = np.random.default_rng([seed, zlib.crc32(shard['file'].encode('utf-8'))])
+        return rng.random(shard['rows']) < validation_split
+
+    def read_shard(self, shard, filters=None, scaled=True, row_mask=None):
+        """
+        Load one shard, keep the rows matching 'filters' (and 'row_mask', one flag per stored
+        row, if given) and return (X, y) as float32.
+        """
+        rows = np.load(os.path.join(self.path, shard['file']), mmap_mode='r')
+        if filters or row_mask is not None:
+            mask = self._filter_mask(rows, filters) if filters else np.ones(len(rows), dtype=bool)
+            if row_mask is not None:
+                mask &= row_mask
+            rows = rows[mask]
+        X = np.array(rows[:, :-1], dtype=np.float32)
+        y = np.array(rows[:, -1], dtype=np.float32)
+        if scaled:
+            X -= self._mean
+            X /= self._scale
+        return X, y
+
+    def iter_shards(self, partition='train', filters=None, scaled=True, shuffle=False, seed=None):
+        """Yield (X, y) per matching shard, reading one shard at a time."""
+        selected = self.shards(partition, filters)
+        if shuffle:
+            selected = [selected[i] for i in np.random.default_rng(seed).permutation(len(selected))]
+        for shard in selected:
+            X, y = self.read_shard(shard, filters, scaled)
+            if len(X):
+                yield X, y
+
+    def count_rows(self, partition='train', filters=None):
+        if not filters:
+            return sum(shard['rows'] for shard in self.shards(partition))
+        return sum(len(y) for _, y in self.iter_shards(partition, filters, scaled=False))
+
+    def count_split_rows(self, partition='train', filters=None, validation_split=0.0, seed=0):
+        """(training rows, validation rows) of the matching rows under validation_mask."""
+        n_train = n_val = 0
+        for shard in self.shards(partition, filters):
+            held_out = self.validation_mask(shard, validation_split, seed)
+            if filters:
+                rows = np.load(os.path.join(self.path, shard['file']), mmap_mode='r')
+                matching = self._filter_mask(rows, filters)
+                n_val += int((held_out & matching).sum())
+                n_train += int((~held_out & matching).sum())
+            else:
+                n_val += int(held_out.sum())
+                n_train += len(held_out) - int(held_out.sum())
+        return n_train, n_val
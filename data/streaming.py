@@ -0,0 +1,171 @@
+# streaming.py
+# This file contains the chunked, streaming variant of the preprocessing pipeline.
+# The input is read in bounded chunks, each chunk is cleaned and split on its own, the scaler
+# statistics are updated incrementally and the partitions are appended to .npy files on disk,
+# so memory use does not grow with the size of the input file.
+
+import itertools
+import os
+import shutil
+import numpy as np
+import pandas as pd
+from numpy.lib.format import open_memmap, write_array_header_1_0, dtype_to_descr
+from sklearn.preprocessing import StandardScaler
+from app_logging import logger
+from data.features import DEFAULT_FEATURE_SPEC
+from data.preprocessing import (clean_data, engineer_features, scaler_state, restore_scaler,
+                                DEFAULT_MISSION_TIME, TEST_SIZE, RANDOM_STATE)
+
+DEFAULT_CHUNKSIZE = 100_000
+
+PARTITIONS = ('X_train', 'X_test', 'y_train', 'y_test')
+SCALER_FILE = 'scaler.npz'
+
+
+def iter_chunks(file_path, chunksize=DEFAULT_CHUNKSIZE):
+    """Yield the rows of a CSV or xlsx file as DataFrames of at most 'chunksize' rows."""
+    extension = os.path.splitext(file_path)[1].lower()
+    if extension in ('.csv', '.txt'):
+        yield from pd.read_csv(file_path, chunksize=chunksize)
+    elif extension in ('.xlsx', '.xlsm'):
+        yield from _iter_excel_chunks(file_path, chunksize)
+    else:
+        raise ValueError("Unsupported file type '{}' for streaming ingestion.".format(extension))
+
+
+def _iter_excel_chunks(file_path, chunksize):
+    # openpyxl's read-only mode iterates rows lazily instead of loading the whole sheet
+    from openpyxl import load_workbook
+
+    workbook = load_workbook(file_path, read_only=True, data_only=True)
+    try:
+        rows = workbook.active.iter_rows(values_only=True)
+        header = next(rows, None)
+        if header is None:
+            return
+        while True:
+            block = list(itertools.islice(rows, chunksize))
+            if not block:
+                break
+            yield pd.DataFrame.from_records(block, columns=header)
+    finally:
+        workbook.close()
+
+
+class _NpyAppender:
+    """Append float64 rows to a raw file and turn it into a .npy file when closed."""
+
+    def __init__(self, path, n_columns=None):
+        self.path = path
+        self.n_columns = n_columns
+        self.rows = 0
+        self._raw_path = path + '.part'
+        self._raw = open(self._raw_path, 'wb')
+
+    def append(self, block):
+        block = np.ascontiguousarray(block, dtype=np.float64)
+        self._raw.write(block.tobytes())
+        self.rows += len(block)
+
+    def close(self):
+        self._raw.close()
+        shape = (self.rows,) if self.n_columns is None else (self.rows, self.n_columns)
+        header = {'descr': dtype_to_descr(np.dtype(np.float64)), 'fortran_order': False, 'shape': shape}
+        with open(self.path, 'wb') as out, open(self._raw_path, 'rb') as raw:
+            write_array_header_1_0(out, header)
+            shutil.copyfileobj(raw, out, 16 * 1024 * 1024)
+        os.remove(self._raw_path)
+
+    def discard(self):
+        self._raw.close()
+        if os.path.exists(self._raw_path):
+            os.remove(self._raw_path)
+
+
+def _scale_in_place(path, scaler, chunksize):
+    # Second pass over the memory-mapped partition, one block at a time
+    X = open_memmap(path, mode='r+')
+    for start in range(0, X.shape[0], chunksize):
+        X[start:start + chunksize] = scaler.transform(X[start:start + chunksize])
+    X.flush()
+    del X
+
+
+def stream_preprocess_data(file_path, output_dir, chunksize=DEFAULT_CHUNKSIZE, mission_time=DEFAULT_MISSION_TIME,
+                           reliability_model='exponential', test_size=TEST_SIZE, random_state=RANDOM_STATE,
+                           feature_spec=DEFAULT_FEATURE_SPEC):
+    """
+    Streaming counterpart of preprocess_data for inputs that do not fit in memory.
+
+    Each chunk goes through clean_data, updates the scaler with partial_fit and is split
+    row by row into train/test with a seeded generator. The partitions are written to
+    'output_dir' as .npy files and scaled in place once the final scaler statistics are
+    known. Returns the same (X_train, X_test, y_train, y_test, scaler) tuple as
+    preprocess_data, with memory-mapped arrays.
+    """
+    logger.info("ℹ️ Starting streaming preprocessing of {} (chunksize={}).".format(file_path, chunksize))
+    os.makedirs(output_dir, exist_ok=True)
+
+    rng = np.random.default_rng(random_state)
+    scaler = StandardScaler()
+    n_features = len(feature_spec.names)
+    writers = {
+        'X_train': _NpyAppender(os.path.join(output_dir, 'X_train.npy'), n_features),
+        'X_test': _NpyAppender(os.path.join(output_dir, 'X_test.npy'), n_features),
+        'y_train': _NpyAppender(os.path.join(output_dir, 'y_train.npy')),
+        'y_test': _NpyAppender(os.path.join(output_dir, 'y_test.npy')),
+    }
+    total_rows = 0
+    dropped_rows = 0
+
+    try:
+        for chunk_index, chunk in enumerate(iter_chunks(file_path, chunksize)):
+            total_rows += len(chunk)
+            chunk, dropped = clean_data(chunk, mission_time, reliability_model)
+            dropped_rows += dropped
+            if chunk.empty:
+                continue
+
+            X = engineer_features(chunk, feature_spec)
+            y = chunk['reliability'].to_numpy(dtype=np.float64)
+            scaler.partial_fit(X)
+
+            is_test = rng.random(len(X)) < test_size
+            writers['X_train'].append(X[~is_test])
+            writers['X_test'].append(X[is_test])
+            writers['y_train'].append(y[~is_test])
+            writers['y_test'].append(y[is_test])
+            logger.debug("🐛 Chunk {} processed ({} rows kept).".format(chunk_index, len(X)))
+    except Exception as e:
+        for writer in writers.values():
+            writer.discard()
+        logger.critical("⛔ Critical error in streaming preprocessing: {}".format(e))
+        raise e
+
+    for writer in writers.values():
+        writer.close()
+
+    if writers['X_train'].rows + writers['X_test'].rows == 0:
+        logger.critical("⛔ No valid rows left after cleaning {}".format(file_path))
+        raise ValueError("No valid rows left after cleaning {}".format(file_path))
+
+    try:
+        for name in ('X_train', 'X_test'):
+            _scale_in_place(writers[name].path, scaler, chunksize)
+        np.savez(os.path.join(output_dir, SCALER_FILE), **scaler_state(scaler))
+        logger.info("ℹ️ Input data normalized successfully.")
+    except Exception as e:
+        logger.critical("⛔ Critical error in input normalization: {}".format(e))
+        raise e
+
+    logger.info("ℹ️ Streaming preprocessing finished: {} rows read, {} dropped, {} train / {} test.".format(
+        total_rows, dropped_rows, writers['X_train'].rows, writers['X_test'].rows))
+    return load_partitions(output_dir)
+
+
+def load_partitions(output_dir):
+    """Open the partitions written by stream_preprocess_data as memory-mapped arrays."""
+    arrays = [np.load(os.path.join(output_dir, name + '.npy'), mmap_mode='r') for name in PARTITIONS]
+    with np.load(os.path.join(output_dir, SCALER_FILE)) as state:
+        scaler = restore_scaler(state)
+    return (*arrays, scaler)
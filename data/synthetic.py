@@ -0,0 +1,105 @@
+# synthetic.py
+# This file generates synthetic V/f/T/N/ttf measurement tables for benchmarks and reproductions.
+# Values follow the ranges of our measurement sheets and ttf follows an Arrhenius/voltage/frequency
+# acceleration law with lognormal scatter, so the reliability targets behave like real data. NaN
+# cells and non-numeric junk (the kind Excel exports contain) can be injected at given rates.
+
+import os
+import numpy as np
+import pandas as pd
+from app_logging import logger
+from data.preprocessing import RAW_COLUMNS, BOLTZMANN_EV
+
+# Junk strings found in exported measurement sheets
+NON_NUMERIC_VALUES = np.array(['n/a', '#VALUE!', '--', 'error', ''], dtype=object)
+
+# Active-core counts seen in the campaigns and how often they occur
+CORE_COUNTS = np.array([3, 5, 17, 65, 333], dtype=np.int64)
+CORE_COUNT_P = np.array([0.6, 0.25, 0.08, 0.05, 0.02])
+
+# Excel's sheet limit minus the header row
+XLSX_MAX_ROWS = 1_048_575
+
+
+def _operating_points(rng, rows):
+    # Same column order as the real workbooks: N, f, V, T (then ttf)
+    return pd.DataFrame({
+        'N': rng.choice(CORE_COUNTS, size=rows, p=CORE_COUNT_P),
+        'f': rng.uniform(1.3e7, 1.96e9, rows),
+        'V': rng.uniform(0.82, 1.26, rows),
+        'T': rng.uniform(-35.0, 126.0, rows),
+    })
+
+
+def _time_to_failure(rng, points, activation_energy=0.7, voltage_exponent=3.0, scatter=0.8, median_ttf=8e8):
+    temperature_k = points['T'].to_numpy() + 273.15
+    log_ttf = (activation_energy / (BOLTZMANN_EV * temperature_k)
+               - voltage_exponent * np.log(points['V'].to_numpy())
+               - np.log(points['f'].to_numpy() / 1e9)
+               - 0.5 * np.log(points['N'].to_numpy() / 3.0))
+    # Normalize so the median of a typical campaign sits at 'median_ttf'
+    # (reference point: T = 60 C, V = 1 V, f = 700 MHz, N = 3)
+    reference = activation_energy / (BOLTZMANN_EV * (60 + 273.15)) - np.log(0.7)
+    return median_ttf * np.exp(log_ttf - reference + rng.normal(0.0, scatter, len(points)))
+
+
+def _contaminate(rng, frame, nan_rate, non_numeric_rate):
+    for col in RAW_COLUMNS:
+        if nan_rate > 0:
+            frame.loc[rng.random(len(frame)) < nan_rate, col] = np.nan
+        if non_numeric_rate > 0:
+            mask = rng.random(len(frame)) < non_numeric_rate
+            if mask.any():
+                values = frame[col].to_numpy(dtype=object)
+                values[mask] = rng.choice(NON_NUMERIC_VALUES, size=int(mask.sum()))
+                frame[col] = values
+    return frame
+
+
+def generate_dataset(rows, nan_rate=0.0, non_numeric_rate=0.0, operating_points=None, seed=0):
+    """
+    Return a DataFrame with the raw N, f, V, T, ttf columns of a measurement sheet.
+
+    'nan_rate' and 'non_numeric_rate' are per-cell probabilities of an empty cell or a
+    junk string. With 'operating_points', rows are drawn from that many distinct
+    (N, f, V, T) points, each measured repeatedly with its own ttf scatter.
+    """
+    rng = np.random.default_rng(seed)
+    if operating_points:
+        points = _operating_points(rng, operating_points)
+        points = points.iloc[rng.integers(0, operating_points, rows)].reset_index(drop=True)
+    else:
+        points = _operating_points(rng, rows)
+    points['ttf'] = _time_to_failure(rng, points)
+    return _contaminate(rng, points, nan_rate, non_numeric_rate)
+
+
+def iter_dataset_chunks(rows, chunksize=1_000_000, seed=0, **kwargs):
+    """Yield generate_dataset frames of at most 'chunksize' rows, 'rows' in total."""
+    for index, start in enumerate(range(0, rows, chunksize)):
+        yield generate_dataset(min(chunksize, rows - start), seed=[seed, index], **kwargs)
+
+
+def write_dataset(file_path, rows, chunksize=1_000_000, seed=0, **kwargs):
+    """Write a synthetic dataset to CSV (any size, chunk by chunk) or xlsx (up to the sheet limit)."""
+    extension = os.path.splitext(file_path)[1].lower()
+    logger.info("ℹ️ Writing {} synthetic rows to {}".format(rows, file_path))
+    if extension == '.csv':
+        for index, chunk in enumerate(iter_dataset_chunks(rows, chunksize, seed, **kwargs)):
+            chunk.to_csv(file_path, mode='w' if index == 0 else 'a', header=index == 0, index=False)
+    elif extension == '.xlsx':
+        if rows > XLSX_MAX_ROWS:
+            raise ValueError("An xlsx sheet holds at most {} rows, use .csv for {}".format(XLSX_MAX_ROWS, rows))
+        from openpyxl import Workbook
+
+        workbook = Workbook(write_only=True)
+        sheet = workbook.create_sheet()
+        for index, chunk in enumerate(iter_dataset_chunks(rows, chunksize, seed, **kwargs)):
+            if index == 0:
+                sheet.append(list(chunk.columns))
+            for row in chunk.itertuples(index=False):
+                sheet.append([None if isinstance(v, float) and np.isnan(v) else v for v in row])
+        workbook.save(file_path)
+    else:
+        raise ValueError("Unsupported file type '{}' for synthetic data.".format(extension))
+    return file_path
@@ -2,18 +2,31 @@
 # This file creates the main window for the GUI.
 
 from customtkinter import *
-from tkinter import filedialog, messagebox, PhotoImage
+from tkinter import filedialog, messagebox, PhotoImage, ttk
 from PIL import Image, ImageTk
 from app_logging import logger
 from gui.visualization_panel import VisualizationPanel
 from model.neural_network import NeuralNetworkModel
-from data.preprocessing import preprocess_data
+from model.artifact import ARTIFACT_EXTENSION
+from model.metrics import default_metrics_dir
+from model.training_jobs import TrainingJobManager, RUNNING, PAUSED
+from model.sweep import run_sweep, halving_rungs
+from model.quantization import export_quantized_variants, QUANTIZATION_MODES
+from model.incremental import incremental_update, DEFAULT_FINE_TUNE_EPOCHS
+from model.cross_validation import cross_validate, DEFAULT_FOLDS
+from model.pareto import pareto_frontier
+from model.sensitivity import sobol_sensitivity
+from model.partial_dependence import partial_dependence
+from model.lookup_grid import raw_test_columns
+from model.operating_point import OPERATING_COLUMNS
+from data.cache import cached_compact_dataset
+from data.dataset import CompactDataset
+from data.parallel_ingest import ingest_files
 from docx import Document
 
-# Global list of feature names for use in plotting
-feature_names = ['N', 'f', 'V', 'T']
-
 class MainWindow(CTk):
+    JOB_POLL_INTERVAL_MS = 100
+
     def __init__(self):
         super().__init__()
         logger.info("Starting MainWindow initialization")
@@ -49,12 +62,39 @@ class MainWindow(CTk):
         self.download_analysis_button = CTkButton(self.visualization_tab, text='Download Analysis', command=self.visualization_panel.download_analysis)
         self.download_analysis_button.grid(row=2, column=0, pady=10, padx=10)
 
+        self.pareto_button = CTkButton(self.visualization_tab, text='Pareto Front', command=self.start_pareto_front)
+        self.pareto_button.grid(row=2, column=1, pady=10, padx=10)
+
+        self.export_pareto_button = CTkButton(self.visualization_tab, text='Export Pareto Front',
+                                              command=self.visualization_panel.export_pareto_front)
+        self.export_pareto_button.grid(row=3, column=0, pady=10, padx=10)
+
+        self.sensitivity_button = CTkButton(self.visualization_tab, text='Sensitivity Analysis',
+                                            command=self.start_sensitivity_analysis)
+        self.sensitivity_button.grid(row=3, column=1, pady=10, padx=10)
+
+        # Partial dependence of one feature ('All' plots every feature) or of a feature pair;
+        # the menus list the raw inputs of the current model once one is trained or loaded
+        self.pdp_feature_menu = CTkOptionMenu(self.visualization_tab, values=['All'] + list(OPERATING_COLUMNS))
+        self.pdp_feature_menu.grid(row=4, column=0, pady=10, padx=10)
+        self.pdp_pair_menu = CTkOptionMenu(self.visualization_tab, values=['None'] + list(OPERATING_COLUMNS))
+        self.pdp_pair_menu.grid(row=4, column=1, pady=10, padx=10)
+        self.ice_checkbox = CTkCheckBox(self.visualization_tab, text='ICE curves')
+        self.ice_checkbox.grid(row=5, column=0, pady=10, padx=10)
+        self.pdp_button = CTkButton(self.visualization_tab, text='Partial Dependence', command=self.start_partial_dependence)
+        self.pdp_button.grid(row=5, column=1, pady=10, padx=10)
+
         # Create widgets in the 'Main' tab
         self.create_main_tab_widgets()
 
         # Placeholder for data and model
         self.data = None
         self.model = None
+        self.ensemble = None
+
+        # Training runs in a background worker; its progress events are polled from the Tk loop
+        self.training_jobs = TrainingJobManager()
+        self.after(self.JOB_POLL_INTERVAL_MS, self.poll_training_jobs)
                 
         logger.info("MainWindow initialized successfully.")
 
@@ -105,6 +145,11 @@ class MainWindow(CTk):
                                            corner_radius=10)
         self.upload_button.grid(row=1, column=0, columnspan=3, pady=10, padx=10)
 
+        # Button to upload every data file of a folder (one workbook per board / chamber run)
+        self.upload_folder_button = CTkButton(self.main_tab, text='Upload Folder', command=self.upload_folder,
+                                              corner_radius=10)
+        self.upload_folder_button.grid(row=1, column=4, pady=10, padx=10)
+
         # Label to show the file info
         self.file_info_label = CTkLabel(self.main_tab, text='No file selected', text_color="white")
         self.file_info_label.grid(row=2, column=0, columnspan=3, pady=10, padx=10)
@@ -131,6 +176,32 @@ class MainWindow(CTk):
         self.load_model_button = CTkButton(self.main_tab, text='Load Model', command=self.load_model)
         self.load_model_button.grid(row=10, column=4, pady=10, padx=10)
 
+        # Pause/resume and cancel the running training job
+        self.pause_button = CTkButton(self.main_tab, text='Pause Training', state='disabled', command=self.toggle_pause)
+        self.pause_button.grid(row=12, column=4, pady=10, padx=10)
+
+        self.cancel_button = CTkButton(self.main_tab, text='Cancel Training', state='disabled', command=self.cancel_training)
+        self.cancel_button.grid(row=14, column=4, pady=10, padx=10)
+
+        # Successive-halving search over the slider ranges, run as a background job
+        self.sweep_button = CTkButton(self.main_tab, text='Hyperparameter Sweep', state='disabled', command=self.start_sweep)
+        self.sweep_button.grid(row=16, column=4, pady=10, padx=10)
+
+        # Quantized TFLite variants for the Ultra96 board, with an accuracy/latency/size report
+        self.export_button = CTkButton(self.main_tab, text='Export for Edge', command=self.export_quantized)
+        self.export_button.grid(row=18, column=4, pady=10, padx=10)
+
+        # Warm-start the current model on new telemetry files instead of retraining from scratch
+        self.update_model_button = CTkButton(self.main_tab, text='Update Model with New Data', command=self.update_model)
+        self.update_model_button.grid(row=20, column=4, pady=10, padx=10)
+
+        self.compare_retrain_checkbox = CTkCheckBox(self.main_tab, text='Compare with full retrain')
+        self.compare_retrain_checkbox.grid(row=21, column=4, pady=10, padx=10)
+
+        # k-fold cross-validation with the slider parameters; the fold models are kept as an ensemble
+        self.cross_validate_button = CTkButton(self.main_tab, text='Cross-Validate', command=self.start_cross_validation)
+        self.cross_validate_button.grid(row=22, column=4, pady=10, padx=10)
+
         # Create the sliders with entry boxes in the 'Main' tab
         self.create_sliders_in_main_tab()
 
@@ -157,6 +228,9 @@ class MainWindow(CTk):
             {'row': 15, 'label_text': 'Batch Size:', 'from_': 16, 'to': 128, 'default_value': 77, 'number_of_steps': 113}
         ]
 
+        # Kept for the hyperparameter sweep, which searches the same ranges
+        self.slider_params = slider_params
+
         # Create the sliders with entry boxes
         self.sliders = {}
         for params in slider_params:
@@ -176,6 +250,10 @@ class MainWindow(CTk):
             label, entry, slider = self.create_slider_with_entry(params)
             self.sliders[params['label_text']] = {'label': label, 'entry': entry, 'slider': slider}
 
+        # Train on one weighted row per repeated (V, f, T, N) operating point
+        self.aggregate_checkbox = CTkCheckBox(self.main_tab, text='Aggregate duplicate operating points')
+        self.aggregate_checkbox.grid(row=17, column=0, columnspan=3, pady=10, padx=10)
+
     def create_slider_with_entry(self, params):
         # Label for the slider
         slider_label = CTkLabel(self.main_tab, text=params['label_text'])
@@ -213,27 +291,49 @@ class MainWindow(CTk):
         return slider_label, slider_value_entry, slider
 
     def upload_data(self):
-        file_path = filedialog.askopenfilename(
+        file_paths = filedialog.askopenfilenames(
             title='Select Dataset',
-            filetypes=[('Excel Files', '*.xlsx'), ('All Files', '*.*')]
+            filetypes=[('Excel Files', '*.xlsx'), ('CSV Files', '*.csv'), ('All Files', '*.*')]
         )
-        print(f"File path chosen: {file_path}")  # Debug print
-        if file_path:
-            try:
-                # Update the file info label with the selected file
-                self.file_info_label.configure(text=f'Selected: {file_path}')
-                logger.info(f"ℹ️ File path chosen: {file_path}")  # Replace print with logging
-
-                # Preprocess the data
-                self.data = preprocess_data(file_path)
-                logger.info("ℹ️ Data preprocessed successfully.")
-                print("Data preprocessed successfully.")  # Debug print
-                # Enable the train button
-                self.train_button.configure(state='normal')
-            except Exception as e:
-                messagebox.showerror('Error', f'An error occurred while loading the data: {e}')
-                logger.critical(f"⛔ An error occurred while loading the data: {e}")  # Replace messagebox with logging
-                print(f"An error occurred: {e}")  # Debug print
+        print(f"File paths chosen: {file_paths}")  # Debug print
+        if file_paths:
+            self.load_data(list(file_paths))
+
+    def upload_folder(self):
+        directory = filedialog.askdirectory(title='Select Dataset Folder')
+        if directory:
+            self.load_data(directory)
+
+    def load_data(self, inputs):
+        # A single file goes through the preprocessing cache, several files through the process pool;
+        # either way it runs as a background job so the window stays responsive
+        if isinstance(inputs, list) and len(inputs) == 1:
+            logger.info(f"ℹ️ File path chosen: {inputs[0]}")
+        else:
+            logger.info(f"ℹ️ Data files chosen: {inputs}")
+
+        def run(callbacks):
+            # Runs in the worker thread: no Tk calls in here
+            if isinstance(inputs, list) and len(inputs) == 1:
+                return cached_compact_dataset(inputs[0]), f'Selected: {inputs[0]}'
+            data, report = ingest_files(inputs)
+            dataset = CompactDataset.from_arrays(*data)
+            del data
+            kept = sum(stats['kept'] for stats in report)
+            dropped = sum(stats['dropped'] for stats in report)
+            return dataset, f'Selected: {len(report)} files, {kept} rows ({dropped} dropped)'
+
+        self.training_jobs.submit('Data loading', run, epochs=1, unit='dataset', on_complete=self.on_data_loaded)
+        self.update_job_status()
+
+    def on_data_loaded(self, job):
+        self.data, text = job.result
+        self.file_info_label.configure(text=text)
+        logger.info("ℹ️ Data preprocessed successfully.")
+        self.progress_label.configure(text='Data loaded.')
+        # Enable the train and sweep buttons
+        self.train_button.configure(state='normal')
+        self.sweep_button.configure(state='normal')
     
     
     def train_model(self):
@@ -245,54 +345,362 @@ class MainWindow(CTk):
             epochs = int(float(self.sliders['Epochs:']['entry'].get()))
             batch_size = int(self.sliders['Batch Size:']['entry'].get())
 
-            if self.data:
-                # Unpack preprocessed data
-                X_train, X_test, y_train, y_test, _ = self.data
-                self.model = NeuralNetworkModel(input_shape=(X_train.shape[1],), dense1_units=dense1_units, dense2_units=dense2_units, learning_rate=learning_rate)
-
-                # Train the model
-                history = self.model.train(X_train, y_train, validation_split, epochs, batch_size)
-
-                # Make predictions
-                predictions = self.model.predict(X_test)
-
-                # Plot results using the visualization panel
-                self.visualization_panel.plot_loss(history)
-                self.visualization_panel.plot_predictions(y_test, predictions)
-                self.visualization_panel.plot_parameter_impact(X_test, y_test, predictions, feature_names)
-
-                # Evaluate the model
-                r2, mse = self.model.evaluate(X_test, y_test)
-                r2_score_percent = r2 * 100
-
-                # Show evaluation results
-                logger.info(f"ℹ️ R^2 Score: {r2_score_percent:.4f}%\nMSE: {mse:.4f}")
-                messagebox.showinfo('Model Evaluation', f'R^2 Score: {r2_score_percent:.4f}%\nMSE: {mse:.4f}')
-
-                # Update progress label
-                self.progress_label.configure(text='Training completed.')
+            if self.data is not None:
+                # The CompactDataset holds the scaled float32 features; splits are views
+                dataset = self.data
+                aggregate = bool(self.aggregate_checkbox.get())
+
+                def run_training(callbacks):
+                    # Runs in the worker thread: no Tk calls in here
+                    train_dataset = dataset.aggregate_training_rows() if aggregate else dataset
+                    if aggregate:
+                        logger.info(f"ℹ️ Training on {train_dataset.n_train} aggregated rows instead of {dataset.n_train}.")
+                    # Throughput counts the rows actually trained on, known only after aggregation
+                    callbacks[0].job.samples_per_epoch = int(train_dataset.n_train * (1 - validation_split))
+                    model = NeuralNetworkModel(input_shape=(train_dataset.n_features,), dense1_units=dense1_units, dense2_units=dense2_units, learning_rate=learning_rate)
+                    history = model.train_on_dataset(train_dataset, validation_split=validation_split, epochs=epochs,
+                                                     batch_size=batch_size, callbacks=callbacks,
+                                                     metrics_dir=default_metrics_dir())
+                    predictions = model.predict(train_dataset.X_test)
+                    r2, mse = model.evaluate_predictions(train_dataset.y_test, predictions)
+                    return {'model': model, 'history': history, 'dataset': train_dataset, 'predictions': predictions,
+                            'r2': r2, 'mse': mse}
+
+                name = f"{dense1_units}-{dense2_units}, lr={learning_rate}, {epochs} epochs"
+                self.training_jobs.submit(name, run_training, epochs=epochs)
+                self.update_job_status()
             else:
                 # Warn if no data is loaded
                 messagebox.showwarning('Warning', 'Please upload data before training.')
                 logger.warning("⚠️ Please upload data before training.")
-        
-        
+
+    def poll_training_jobs(self):
+        for kind, job in self.training_jobs.poll():
+            if kind == 'completed':
+                (job.on_complete or self.on_training_completed)(job)
+            elif kind == 'failed':
+                messagebox.showerror('Error', f'Training failed: {job.error}' if job.unit == 'epoch'
+                                     else f'{job.name} failed: {job.error}')
+            elif kind == 'cancelled':
+                logger.warning(f"⚠️ Training job {job.job_id} cancelled after {job.epoch} epochs.")
+                self.progress_label.configure(text='Training cancelled.')
+        self.update_job_status()
+        self.after(self.JOB_POLL_INTERVAL_MS, self.poll_training_jobs)
+
+    def update_job_status(self):
+        job = self.training_jobs.active_job()
+        queued = len(self.training_jobs.queued_jobs())
+        if job is None:
+            if queued == 0:
+                self.pause_button.configure(state='disabled', text='Pause Training')
+                self.cancel_button.configure(state='disabled')
+            return
+        status = 'Paused' if job.state == PAUSED else 'Training'
+        text = f"{status}: {job.unit} {job.epoch}" + (f"/{job.epochs}" if job.epochs else "")
+        if 'loss' in job.logs:
+            text += f", loss {job.logs['loss']:.5f}"
+        if job.unit == 'epoch':
+            text += f"\n{job.epochs_per_sec:.1f} epochs/s, {job.samples_per_sec:,.0f} samples/s"
+        if queued:
+            text += f"\n{queued} job(s) queued"
+        self.progress_label.configure(text=text)
+        self.pause_button.configure(state='normal' if job.unit == 'epoch' else 'disabled',
+                                    text='Resume Training' if job.state == PAUSED else 'Pause Training')
+        self.cancel_button.configure(state='normal')
+
+    def on_training_completed(self, job):
+        result = job.result
+        self.model = result['model']
+        self.update_pdp_menus()
+
+        # Plot results using the visualization panel
+        self.visualization_panel.plot_dataset_results(result['history'], result['dataset'], result['predictions'])
+
+        # Show evaluation results
+        r2_score_percent = result['r2'] * 100
+        mse = result['mse']
+        logger.info(f"ℹ️ R^2 Score: {r2_score_percent:.4f}%\nMSE: {mse:.4f}")
+        self.progress_label.configure(text='Training completed.')
+        messagebox.showinfo('Model Evaluation', f'{job.name}\nR^2 Score: {r2_score_percent:.4f}%\nMSE: {mse:.4f}')
+
+    SWEEP_PARAMETERS = {'Dense Layer 1 Units:': 'dense1_units', 'Dense Layer 2 Units:': 'dense2_units',
+                        'Learning Rate:': 'learning_rate', 'Validation Split:': 'validation_split',
+                        'Epochs:': 'epochs', 'Batch Size:': 'batch_size'}
+
+    def start_sweep(self, n_trials=27):
+        if self.data is None:
+            messagebox.showwarning('Warning', 'Please upload data before training.')
+            logger.warning("⚠️ Please upload data before training.")
+            return
+        space = {self.SWEEP_PARAMETERS[params['label_text']]: (params['from_'], params['to'])
+                 for params in self.slider_params}
+        dataset = self.data
+
+        def run(callbacks):
+            # The sweep trains in its own process pool, so the job can be cancelled but not paused
+            job = callbacks[0].job
+
+            def progress(done, total):
+                job.epoch = done
+
+            return run_sweep(dataset, space, method='halving', n_trials=n_trials, progress=progress,
+                             should_stop=lambda: job.cancel_requested)
+
+        job = self.training_jobs.submit(f"Hyperparameter sweep ({n_trials} configurations)", run, unit='trial',
+                                        on_complete=lambda job: self.show_sweep_results(job.result))
+        job.epochs = sum(n for n, _ in halving_rungs(n_trials, space['epochs'][0], space['epochs'][1]))
+        self.update_job_status()
+
+    def show_sweep_results(self, table):
+        window = CTkToplevel(self)
+        window.title('Hyperparameter Sweep Results')
+        columns = list(table.columns)
+        tree = ttk.Treeview(window, columns=columns, show='headings', height=20)
+        descending = {}
+
+        def fill(frame):
+            tree.delete(*tree.get_children())
+            for row in frame.itertuples(index=False):
+                tree.insert('', 'end', values=[f"{v:.6g}" if isinstance(v, float) else v for v in row])
+
+        def sort_by(column):
+            # Clicking a heading sorts by it, clicking again reverses the order
+            descending[column] = not descending.get(column, column in ('r2',))
+            fill(table.sort_values(column, ascending=not descending[column], kind='stable'))
+
+        for column in columns:
+            tree.heading(column, text=column, command=lambda c=column: sort_by(c))
+            tree.column(column, width=90, anchor='e')
+        tree.pack(fill='both', expand=True, padx=10, pady=10)
+        fill(table)
+        logger.info(f"ℹ️ Sweep results shown, best R^2: {table['r2'].max():.4f}")
+
+    def update_model(self):
+        if self.model is None or self.data is None:
+            messagebox.showwarning('Warning', 'Please upload the earlier data and train or load a model first.')
+            logger.warning("⚠️ Please upload the earlier data and train or load a model first.")
+            return
+        file_paths = filedialog.askopenfilenames(
+            title='Select New Telemetry',
+            filetypes=[('Excel Files', '*.xlsx'), ('CSV Files', '*.csv'), ('All Files', '*.*')]
+        )
+        if not file_paths:
+            return
+        model, dataset = self.model, self.data
+        compare = bool(self.compare_retrain_checkbox.get())
+        validation_split = float(self.sliders['Validation Split:']['entry'].get())
+        batch_size = int(self.sliders['Batch Size:']['entry'].get())
+        full_epochs = int(float(self.sliders['Epochs:']['entry'].get()))
+
+        def run(callbacks):
+            return incremental_update(model, dataset, list(file_paths), compare=compare, full_epochs=full_epochs,
+                                      callbacks=callbacks, validation_split=validation_split, batch_size=batch_size)
+
+        self.training_jobs.submit(f"Incremental update ({len(file_paths)} files)", run,
+                                  epochs=None if compare else DEFAULT_FINE_TUNE_EPOCHS,
+                                  on_complete=self.on_incremental_update_completed)
+        self.update_job_status()
+
+    def on_incremental_update_completed(self, job):
+        # The model was fine-tuned in place; the merged dataset replaces the old one
+        self.data, report = job.result
+        incremental = report['incremental']
+        lines = [f"Incremental: R^2 {incremental['r2'] * 100:.4f}%, MSE {incremental['mse']:.4f}, "
+                 f"{incremental['epochs_run']} epochs in {incremental['seconds']:.1f} s "
+                 f"({incremental['new_train_rows']} new + {incremental['replay_rows']} replayed rows)"]
+        if 'full' in report:
+            full = report['full']
+            lines.append(f"Full retrain: R^2 {full['r2'] * 100:.4f}%, MSE {full['mse']:.4f}, "
+                         f"{full['epochs_run']} epochs in {full['seconds']:.1f} s")
+            lines.append(f"Speed-up: x{report['speedup']:.1f}")
+        logger.info("ℹ️ " + " | ".join(lines))
+        self.progress_label.configure(text='Model updated.')
+        messagebox.showinfo('Incremental Update', '\n'.join(lines))
+
+    def start_cross_validation(self, k=DEFAULT_FOLDS):
+        if self.data is None:
+            messagebox.showwarning('Warning', 'Please upload data before training.')
+            logger.warning("⚠️ Please upload data before training.")
+            return
+        dataset = self.data
+        params = dict(dense1_units=int(self.sliders['Dense Layer 1 Units:']['entry'].get()),
+                      dense2_units=int(self.sliders['Dense Layer 2 Units:']['entry'].get()),
+                      learning_rate=float(self.sliders['Learning Rate:']['entry'].get()),
+                      validation_split=float(self.sliders['Validation Split:']['entry'].get()),
+                      epochs=int(float(self.sliders['Epochs:']['entry'].get())),
+                      batch_size=int(self.sliders['Batch Size:']['entry'].get()))
+
+        def run(callbacks):
+            job = callbacks[0].job
+
+            def progress(done, total):
+                job.epoch = done
+
+            return cross_validate(dataset, k, progress=progress, should_stop=lambda: job.cancel_requested, **params)
+
+        self.training_jobs.submit(f"{k}-fold cross-validation", run, epochs=k, unit='fold',
+                                  on_complete=self.on_cross_validation_completed)
+        self.update_job_status()
+
+    def on_cross_validation_completed(self, job):
+        result = job.result
+        self.ensemble = result.ensemble
+        self.progress_label.configure(text='Cross-validation completed.')
+        messagebox.showinfo('Cross-Validation', result.folds[['fold', 'r2', 'mse', 'epochs_run']].to_string(index=False)
+                            + '\n\n' + result.summary_text())
+
+    def start_pareto_front(self):
+        if self.model is None:
+            messagebox.showwarning('Warning', 'Please train or load a model before computing the Pareto front.')
+            logger.warning("⚠️ Please train or load a model before computing the Pareto front.")
+            return
+        model = self.model
+
+        def run(callbacks):
+            # Scores the default V/f/T/N grid; runs in the worker thread
+            return pareto_frontier(model)
+
+        self.training_jobs.submit('Pareto front', run, epochs=1, unit='frontier',
+                                  on_complete=self.on_pareto_front_completed)
+        self.update_job_status()
+
+    def on_pareto_front_completed(self, job):
+        frontier, scored = job.result
+        self.visualization_panel.plot_pareto_front(frontier, scored, performance_label='f [Hz]')
+        self.progress_label.configure(text=f'Pareto front: {len(frontier)} of {len(scored):,} operating points.')
+
+    def start_sensitivity_analysis(self):
+        if self.model is None:
+            messagebox.showwarning('Warning', 'Please train or load a model before the sensitivity analysis.')
+            logger.warning("⚠️ Please train or load a model before the sensitivity analysis.")
+            return
+        model = self.model
+
+        def run(callbacks):
+            return sobol_sensitivity(model)
+
+        self.training_jobs.submit('Sensitivity analysis', run, epochs=1, unit='analysis',
+                                  on_complete=self.on_sensitivity_completed)
+        self.update_job_status()
+
+    def on_sensitivity_completed(self, job):
+        result = job.result
+        self.visualization_panel.plot_sensitivity(result)
+        self.progress_label.configure(text='Sensitivity analysis completed; included in the analysis report.')
+        messagebox.showinfo('Sensitivity Analysis', result.summary_text())
+
+    def start_partial_dependence(self):
+        if self.model is None or self.data is None:
+            messagebox.showwarning('Warning', 'Please upload data and train or load a model before partial dependence.')
+            logger.warning("⚠️ Please upload data and train or load a model before partial dependence.")
+            return
+        feature, pair = self.pdp_feature_menu.get(), self.pdp_pair_menu.get()
+        if feature == 'All':
+            requests = [name for name in self.model.feature_spec.base]
+        elif pair in ('None', feature):
+            requests = [feature]
+        else:
+            requests = [(feature, pair)]
+        ice = bool(self.ice_checkbox.get()) and pair in ('None', feature)
+        model, background = self.model, raw_test_columns(self.data)
+
+        def run(callbacks):
+            return [partial_dependence(model, background, features, ice=ice) for features in requests]
+
+        self.training_jobs.submit('Partial dependence', run, epochs=len(requests), unit='curve',
+                                  on_complete=self.on_partial_dependence_completed)
+        self.update_job_status()
+
+    def update_pdp_menus(self):
+        # Offer the raw inputs of the current model; keep the selection if the model still has it
+        base = list(self.model.feature_spec.base)
+        for menu, default in ((self.pdp_feature_menu, 'All'), (self.pdp_pair_menu, 'None')):
+            values = [default] + base
+            menu.configure(values=values)
+            if menu.get() not in values:
+                menu.set(default)
+
+    def on_partial_dependence_completed(self, job):
+        self.visualization_panel.plot_partial_dependence(job.result)
+        self.progress_label.configure(text='Partial dependence plotted in the Analyze tab.')
+
+    def export_quantized(self):
+        if self.model is None or self.data is None:
+            messagebox.showwarning('Warning', 'Please upload data and train a model before exporting.')
+            logger.warning("⚠️ Please upload data and train a model before exporting.")
+            return
+        directory = filedialog.askdirectory(title='Select Directory for the Quantized Models')
+        if not directory:
+            return
+        model, dataset = self.model, self.data
+
+        def run(callbacks):
+            job = callbacks[0].job
+
+            def progress(done, total):
+                job.epoch = done
+
+            return export_quantized_variants(model, dataset, directory, progress=progress)
+
+        self.training_jobs.submit('Quantized export', run, epochs=len(QUANTIZATION_MODES), unit='variant',
+                                  on_complete=lambda job: self.show_quantization_report(job.result))
+        self.update_job_status()
+
+    def show_quantization_report(self, report):
+        lines = [f"{row.mode}: R^2 {row.r2 * 100:.2f}%, MSE {row.mse:.6f}, {row.size_bytes / 1024:.1f} KB, "
+                 f"{row.latency_batch1_us:.1f} us/sample" for row in report.itertuples()]
+        self.progress_label.configure(text='Quantized models exported.')
+        messagebox.showinfo('Quantized Export', '\n'.join(lines))
+
+    def toggle_pause(self):
+        job = self.training_jobs.active_job()
+        if job is None:
+            return
+        if job.state == RUNNING:
+            self.training_jobs.pause(job)
+        else:
+            self.training_jobs.resume(job)
+        self.update_job_status()
+
+    def cancel_training(self):
+        job = self.training_jobs.active_job()
+        if job is not None:
+            self.training_jobs.cancel(job)
+            self.progress_label.configure(text='Cancelling...')
+
     def save_model(self):
+        if self.model is None:
+            messagebox.showwarning('Warning', 'Please train or load a model before saving.')
+            logger.warning("⚠️ Please train or load a model before saving.")
+            return
         file_path = filedialog.asksaveasfilename(
             title='Save Model',
-            filetypes=[('H5 Files', '*.h5'), ('All Files', '*.*')],
-            defaultextension='.h5'
+            filetypes=[('Model Files', '*' + ARTIFACT_EXTENSION), ('All Files', '*.*')],
+            defaultextension=ARTIFACT_EXTENSION
         )
         if file_path:
-            self.model.save_model(file_path)
+            try:
+                self.model.save_model(file_path)
+                self.progress_label.configure(text='Model saved.')
+            except Exception as e:
+                messagebox.showerror('Error', f'An error occurred while saving the model: {e}')
 
     def load_model(self):
         file_path = filedialog.askopenfilename(
             title='Load Model',
-            filetypes=[('H5 Files', '*.h5'), ('All Files', '*.*')]
+            filetypes=[('Model Files', '*' + ARTIFACT_EXTENSION), ('All Files', '*.*')]
         )
         if file_path:
-            self.model = NeuralNetworkModel.load_model(file_path)
+            try:
+                self.model = NeuralNetworkModel.load_model(file_path)
+                self.update_pdp_menus()
+                evaluation = self.model.metadata.get('evaluation', {})
+                text = f"Model loaded ({', '.join(self.model.feature_spec.names)})"
+                if 'r2' in evaluation:
+                    text += f"\nR^2 at save time: {evaluation['r2'] * 100:.4f}%"
+                self.progress_label.configure(text=text)
+            except Exception as e:
+                messagebox.showerror('Error', f'An error occurred while loading the model: {e}')
     
 
 if __name__ == '__main__':
@@ -13,6 +13,14 @@ from docx import Document
 from scipy.stats import linregress
 
 
+# Units of the raw operating-point columns, for axis labels in original units
+FEATURE_UNITS = {'V': 'V', 'f': 'Hz', 'T': '°C', 'N': 'cores'}
+
+
+def feature_label(name):
+    return f"{name} [{FEATURE_UNITS[name]}]" if name in FEATURE_UNITS else name
+
+
 class VisualizationPanel(tk.Frame):
     def __init__(self, master):
         super().__init__(master)
@@ -44,6 +52,15 @@ class VisualizationPanel(tk.Frame):
         # Initialize variables to store figures and canvases
         self.figures = []
         self.canvases = []
+        # The latest figure of each kind ('loss', 'predictions', 'impact', ...), for the analysis report
+        self.figure_roles = {}
+
+        # Dataset and predictions behind the current plots, used by the exports
+        self.dataset = None
+        self.predictions = None
+        self.impact_feature_names = []
+        self.pareto_front = None
+        self.sensitivity = None
 
     #----------------new part : ---------------
     
@@ -61,30 +78,57 @@ class VisualizationPanel(tk.Frame):
     def save_analysis_to_doc(self, file_path):        # Create a new Document
         doc = Document()
         doc.add_heading('Graph Analysis', 0)
+        # Only the plots that were drawn get a section, numbered in report order
+        figure_number = 0
 
         # Analysis for the Training & Validation Loss plot
-        train_loss_data = self.figures[0].axes[0].lines[0].get_ydata()
-        val_loss_data = self.figures[0].axes[0].lines[1].get_ydata()
-        epochs = range(len(train_loss_data))  # Assuming epochs are along the x-axis
-        analysis_text = self.analyze_loss_graph(train_loss_data, val_loss_data, epochs)
-        doc.add_heading(f'Figure 1: Training & Validation Loss', level=1)
-        doc.add_paragraph(analysis_text)
+        if 'loss' in self.figure_roles:
+            figure_number += 1
+            lines = self.figure_roles['loss'].axes[0].lines
+            train_loss_data = lines[0].get_ydata()
+            val_loss_data = lines[1].get_ydata()
+            epochs = range(len(train_loss_data))  # Assuming epochs are along the x-axis
+            analysis_text = self.analyze_loss_graph(train_loss_data, val_loss_data, epochs)
+            doc.add_heading(f'Figure {figure_number}: Training & Validation Loss', level=1)
+            doc.add_paragraph(analysis_text)
 
         # Analysis for the Prediction Accuracy plot
-        predicted_reliability_data = self.figures[1].axes[0].collections[0].get_offsets().data[:, 1]
-        true_values_data = self.figures[1].axes[0].collections[0].get_offsets().data[:, 0]
-        analysis_text = self.analyze_prediction_accuracy(true_values_data, predicted_reliability_data)
-        doc.add_heading(f'Figure 2: Prediction Accuracy', level=1)
-        doc.add_paragraph(analysis_text)
-
-        # Analysis for the Impact of Features (N, V, f, T) plots
-        for i, feature_name in enumerate(['N', 'V', 'f', 'T']):
-            feature_data = self.figures[2].axes[i].collections[0].get_offsets().data[:, 0]
-            reliability_data = self.figures[2].axes[i].collections[0].get_offsets().data[:, 1]
-            analysis_text = self.analyze_feature_impact(feature_data, reliability_data, feature_name)
-            doc.add_heading(f'Figure 3: Impact of {feature_name}', level=1)
+        if 'predictions' in self.figure_roles:
+            figure_number += 1
+            offsets = self.figure_roles['predictions'].axes[0].collections[0].get_offsets().data
+            analysis_text = self.analyze_prediction_accuracy(offsets[:, 0], offsets[:, 1])
+            doc.add_heading(f'Figure {figure_number}: Prediction Accuracy', level=1)
             doc.add_paragraph(analysis_text)
 
+        # Analysis for the Impact of Features plots, in the order they were plotted
+        if 'impact' in self.figure_roles:
+            figure_number += 1
+            for i, feature_name in enumerate(self.impact_feature_names):
+                offsets = self.figure_roles['impact'].axes[i].collections[0].get_offsets().data
+                analysis_text = self.analyze_feature_impact(offsets[:, 0], offsets[:, 1], feature_name)
+                doc.add_heading(f'Figure {figure_number}: Impact of {feature_name}', level=1)
+                doc.add_paragraph(analysis_text)
+
+        # Global sensitivity analysis, if one was run for the current model
+        if self.sensitivity is not None:
+            doc.add_heading('Global Sensitivity Analysis (Sobol Indices)', level=1)
+            doc.add_paragraph(self.analyze_sensitivity(self.sensitivity))
+            table = doc.add_table(rows=1, cols=5)
+            table.style = 'Table Grid'
+            for cell, title in zip(table.rows[0].cells, ('Feature', 'First-order S1', 'S1 CI', 'Total-order ST', 'ST CI')):
+                cell.text = title
+            for row in self.sensitivity.table.itertuples():
+                cells = table.add_row().cells
+                cells[0].text = row.feature
+                cells[1].text = f"{row.S1:.3f}"
+                cells[2].text = f"[{row.S1_low:.3f}, {row.S1_high:.3f}]"
+                cells[3].text = f"{row.ST:.3f}"
+                cells[4].text = f"[{row.ST_low:.3f}, {row.ST_high:.3f}]"
+
+        if figure_number == 0 and self.sensitivity is None:
+            doc.add_paragraph('No results to analyze yet: train a model or run an analysis first.')
+            logger.warning("⚠️ Analysis document saved without results.")
+
         # Save the document
         doc.save(file_path)
                 
@@ -121,6 +165,7 @@ class VisualizationPanel(tk.Frame):
         # Store the figure and canvas
         self.figures.append(fig)
         self.canvases.append(canvas)
+        self.figure_roles['loss'] = fig
 
     def plot_predictions(self, y_test, predicted_reliability):
         fig = Figure(figsize=(6, 4), dpi=100)
@@ -143,13 +188,15 @@ class VisualizationPanel(tk.Frame):
         # Store the figure and canvas
         self.figures.append(fig)
         self.canvases.append(canvas)
+        self.figure_roles['predictions'] = fig
 
     def plot_parameter_impact(self, X_test, y_test, predicted_reliability, feature_names):
         # Determine the layout of the subplots
         num_features = len(feature_names)
         num_cols = 2
         num_rows = int(np.ceil(num_features / num_cols))
-        fig, axs = plt.subplots(num_rows, num_cols, figsize=(12, num_rows * 4))
+        fig, axs = plt.subplots(num_rows, num_cols, figsize=(12, num_rows * 4), squeeze=False)
+        self.impact_feature_names = list(feature_names)
 
         for i, feature_name in enumerate(feature_names):
             ax = axs[i // num_cols, i % num_cols]
@@ -161,6 +208,130 @@ class VisualizationPanel(tk.Frame):
             ax.legend()
             ax.grid(True)
 
+        # Hide the unused subplot when the number of features is odd
+        for ax in axs.flat[num_features:]:
+            ax.set_visible(False)
+
+        fig.tight_layout()
+
+        canvas = FigureCanvasTkAgg(fig, master=self.scrollable_frame)
+        canvas.draw()
+        widget = canvas.get_tk_widget()
+        widget.pack(fill=tk.BOTH, expand=True)
+
+        # Store the figure and canvas
+        self.figures.append(fig)
+        self.canvases.append(canvas)
+        self.figure_roles['impact'] = fig
+
+    # Scored candidates drawn behind the Pareto front; more only slow the canvas down
+    PARETO_BACKGROUND_POINTS = 20000
+
+    def plot_pareto_front(self, frontier, scored, performance_label='f'):
+        """Scatter the scored candidates (a sample of them) and draw their performance/reliability Pareto front."""
+        self.pareto_front = frontier
+        fig = Figure(figsize=(6, 4), dpi=100)
+        ax = fig.add_subplot(111)
+        if len(scored) > self.PARETO_BACKGROUND_POINTS:
+            scored = scored.sample(self.PARETO_BACKGROUND_POINTS, random_state=0)
+        ax.scatter(scored['performance'], scored['reliability'], s=4, color='lightgray', label='Candidates')
+        ax.step(frontier['performance'], frontier['reliability'], where='post', color='red', marker='o',
+                markersize=3, label='Pareto front')
+        ax.set_xlabel(f'Performance [{performance_label}]')
+        ax.set_ylabel('Predicted Reliability')
+        ax.set_title('Performance vs. Reliability Pareto Front')
+        ax.legend(loc='lower left')
+        ax.grid(True)
+        fig.tight_layout()
+
+        canvas = FigureCanvasTkAgg(fig, master=self.scrollable_frame)
+        canvas.draw()
+        widget = canvas.get_tk_widget()
+        widget.pack(fill=tk.BOTH, expand=True)
+
+        # Store the figure and canvas
+        self.figures.append(fig)
+        self.canvases.append(canvas)
+        self.figure_roles['pareto_front'] = fig
+
+    def export_pareto_front(self):
+        """Save the points of the last Pareto front to CSV (or Excel) through a file dialog."""
+        if self.pareto_front is None:
+            logger.warning("⚠️ No Pareto front to export.")
+            return None
+        file_path = filedialog.asksaveasfilename(
+            title='Export Pareto Front',
+            filetypes=[('CSV Files', '*.csv'), ('Excel Files', '*.xlsx')],
+            defaultextension='.csv'
+        )
+        if file_path:
+            if file_path.endswith('.xlsx'):
+                self.pareto_front.to_excel(file_path, index=False)
+            else:
+                self.pareto_front.to_csv(file_path, index=False)
+            logger.info(f"ℹ️ Pareto front with {len(self.pareto_front)} points exported to {file_path}")
+        return file_path
+
+    def plot_sensitivity(self, result):
+        """Bar chart of the first- and total-order Sobol indices with their confidence intervals."""
+        self.sensitivity = result
+        table = result.table
+        positions = np.arange(len(table))
+        fig = Figure(figsize=(6, 4), dpi=100)
+        ax = fig.add_subplot(111)
+        for offset, index, color in ((-0.2, 'S1', 'tab:blue'), (0.2, 'ST', 'tab:orange')):
+            errors = [table[index] - table[f'{index}_low'], table[f'{index}_high'] - table[index]]
+            ax.bar(positions + offset, table[index], width=0.4, yerr=np.clip(errors, 0, None), capsize=3,
+                   color=color, label='First-order (S1)' if index == 'S1' else 'Total-order (ST)')
+        ax.set_xticks(positions)
+        ax.set_xticklabels(table['feature'])
+        ax.set_ylabel('Sobol Index')
+        ax.set_title(f'Global Sensitivity of Reliability ({result.confidence:.0%} CI)')
+        ax.legend(loc='upper right')
+        ax.grid(True, axis='y')
+        fig.tight_layout()
+
+        canvas = FigureCanvasTkAgg(fig, master=self.scrollable_frame)
+        canvas.draw()
+        widget = canvas.get_tk_widget()
+        widget.pack(fill=tk.BOTH, expand=True)
+
+        # Store the figure and canvas
+        self.figures.append(fig)
+        self.canvases.append(canvas)
+        self.figure_roles['sensitivity'] = fig
+
+    # ICE curves drawn per plot; more only clutter it
+    MAX_ICE_CURVES = 100
+
+    def plot_partial_dependence(self, results):
+        """Draw PDP (and ICE) curves of single features side by side, or the PDP surface of a feature pair."""
+        if len(results) == 1 and results[0].is_pair:
+            result = results[0]
+            fig = Figure(figsize=(6, 4), dpi=100)
+            ax = fig.add_subplot(111)
+            contour = ax.contourf(result.grids[1], result.grids[0], result.average, levels=20, cmap='viridis')
+            fig.colorbar(contour, ax=ax, label='Predicted Reliability')
+            ax.set_xlabel(feature_label(result.features[1]))
+            ax.set_ylabel(feature_label(result.features[0]))
+            ax.set_title(f'Partial Dependence on {result.features[0]} and {result.features[1]}')
+        else:
+            num_cols = min(len(results), 2)
+            num_rows = int(np.ceil(len(results) / num_cols))
+            fig = Figure(figsize=(6 * num_cols, 4 * num_rows), dpi=100)
+            for i, result in enumerate(results):
+                ax = fig.add_subplot(num_rows, num_cols, i + 1)
+                grid = result.grids[0]
+                if result.individual is not None:
+                    for curve in result.individual[:self.MAX_ICE_CURVES]:
+                        ax.plot(grid, curve, color='gray', alpha=0.2, lw=0.8, label='_nolegend_')
+                ax.plot(grid, result.average, color='red', lw=2.5, marker='o', markersize=3, label='Partial dependence')
+                ax.set_xlabel(feature_label(result.features[0]))
+                ax.set_ylabel('Predicted Reliability')
+                ax.set_title(f'Partial Dependence on {result.features[0]}'
+                             + (' (with ICE curves)' if result.individual is not None else ''))
+                ax.legend(loc='best')
+                ax.grid(True)
         fig.tight_layout()
 
         canvas = FigureCanvasTkAgg(fig, master=self.scrollable_frame)
@@ -171,6 +342,15 @@ class VisualizationPanel(tk.Frame):
         # Store the figure and canvas
         self.figures.append(fig)
         self.canvases.append(canvas)
+        self.figure_roles['partial_dependence'] = fig
+
+    def plot_dataset_results(self, history, dataset, predicted_reliability):
+        """Draw the loss, prediction and impact plots straight from a CompactDataset, labelled by its feature spec."""
+        self.dataset = dataset
+        self.predictions = predicted_reliability
+        self.plot_loss(history)
+        self.plot_predictions(dataset.y_test, predicted_reliability)
+        self.plot_parameter_impact(dataset.X_test, dataset.y_test, predicted_reliability, dataset.feature_names)
 
     def clear_plots(self):
         logger.info("ℹ️ Clearing plots.")
@@ -179,6 +359,12 @@ class VisualizationPanel(tk.Frame):
             canvas.get_tk_widget().destroy()
         self.figures.clear()
         self.canvases.clear()
+        self.figure_roles.clear()
+        self.dataset = None
+        self.predictions = None
+        self.impact_feature_names = []
+        self.pareto_front = None
+        self.sensitivity = None
         logger.debug("🐛 Plots cleared from the visualization panel.")
 
 
@@ -194,6 +380,14 @@ class VisualizationPanel(tk.Frame):
                     x_data, y_data = line.get_data()
                     data[f'figure_{idx}_{label}_x'] = x_data
                     data[f'figure_{idx}_{label}_y'] = y_data
+
+        # Export the test split column by column (float32 views, no extra copy of the matrix)
+        if self.dataset is not None:
+            for name in self.dataset.feature_names:
+                data[f'test_{name}'] = self.dataset.column(name, split='test')
+            data['test_reliability'] = self.dataset.y_test
+            if self.predictions is not None:
+                data['predicted_reliability'] = self.predictions
         return data
 
     #----------------------Start new part: ----------------------
@@ -231,6 +425,22 @@ class VisualizationPanel(tk.Frame):
         )
         return analysis_text
 
+    def analyze_sensitivity(self, result):
+        # Rank the inputs by total-order index; ST - S1 is the share of variance from interactions
+        table = result.table.sort_values('ST', ascending=False)
+        top = table.iloc[0]
+        interactions = table[(table['ST'] - table['S1']) > 0.05]['feature'].tolist()
+        analysis_text = (
+            f"Sobol indices were estimated from {result.n_evaluations:,} model evaluations "
+            f"({result.n_samples:,} Saltelli base samples, {result.confidence:.0%} bootstrap confidence intervals). "
+            f"'{top['feature']}' is the most influential input, explaining {top['ST']:.0%} of the variance of the "
+            f"predicted reliability including interactions ({top['S1']:.0%} on its own). "
+            f"The inputs ranked by total-order index are: {', '.join(table['feature'])}. "
+            + (f"Interaction effects (ST - S1 > 0.05) are notable for {', '.join(interactions)}."
+               if interactions else "Interaction effects are small; the inputs act mostly additively.")
+        )
+        return analysis_text
+
     #------------------End new part  !  !  ! -------------------
 
     def save_graphs_for_matlab(self, file_path):
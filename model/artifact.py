@@ -0,0 +1,98 @@
+# artifact.py
+# This file defines the versioned model artifact written by NeuralNetworkModel.save_model.
+# One .npz file holds the layer weights next to a JSON header with the architecture, the fitted
+# scaler statistics, the feature spec (names and order) and the training metadata. Reading it
+# only needs NumPy, so inference code can load a model without importing or compiling Keras.
+# scikit-learn is imported lazily for the same reason: read_artifact never needs it.
+
+import json
+import os
+from datetime import datetime
+import numpy as np
+from app_logging import logger
+from data.features import FeatureSpec
+
+ARTIFACT_FORMAT = 'ultra_aim_pro.model'
+ARTIFACT_VERSION = 1
+ARTIFACT_EXTENSION = '.npz'
+HEADER_KEY = 'header'
+
+
+def read_artifact(file_path):
+    """Return (header, weights) of an artifact file, checking its format and version."""
+    try:
+        with np.load(file_path, allow_pickle=False) as archive:
+            header = json.loads(str(archive[HEADER_KEY]))
+            if header.get('format') != ARTIFACT_FORMAT:
+                raise ValueError(f"{file_path} is not a model artifact")
+            if header['version'] > ARTIFACT_VERSION:
+                raise ValueError(f"Model artifact version {header['version']} is newer than the supported "
+                                 f"version {ARTIFACT_VERSION}")
+            weights = [archive[f'weight_{i}'] for i in range(header['n_weights'])]
+    except Exception as e:
+        logger.critical(f"⛔ Critical error while loading the model artifact {file_path}: {e}")
+        raise e
+    return header, weights
+
+
+class ModelArtifact:
+    """
+    Everything needed to use a trained model on raw V/f/T/N inputs.
+
+    'architecture' is {'input_dim', 'layers': [{'units', 'activation'}, ...], 'learning_rate'}
+    and 'weights' the matching list of kernel/bias arrays (Keras get_weights order).
+    """
+
+    def __init__(self, architecture, weights, scaler, feature_spec, metadata=None):
+        self.architecture = architecture
+        self.weights = weights
+        self.scaler = scaler
+        self.feature_spec = feature_spec
+        self.metadata = metadata or {}
+
+    @property
+    def feature_names(self):
+        return self.feature_spec.names
+
+    def transform(self, columns):
+        """Evaluate the feature spec on raw columns (DataFrame or mapping) and scale them like the training data."""
+        features = self.feature_spec.evaluate(columns)
+        features -= self.scaler.mean_
+        features /= self.scaler.scale_
+        return features.astype(np.float32)
+
+    def save(self, file_path):
+        from data.preprocessing import scaler_state
+
+        header = {
+            'format': ARTIFACT_FORMAT,
+            'version': ARTIFACT_VERSION,
+            'created': datetime.now().isoformat(timespec='seconds'),
+            'architecture': self.architecture,
+            'feature_spec': self.feature_spec.to_dict(),
+            'scaler': {name: value.tolist() for name, value in scaler_state(self.scaler).items()},
+            'metadata': self.metadata,
+            'n_weights': len(self.weights),
+        }
+        arrays = {f'weight_{i}': np.asarray(w) for i, w in enumerate(self.weights)}
+        # The header is stored as a string array so the file loads with allow_pickle=False
+        arrays[HEADER_KEY] = np.array(json.dumps(header))
+        try:
+            # Write next to the target and rename, so a failed save never leaves half an artifact
+            with open(file_path + '.tmp', 'wb') as f:
+                np.savez(f, **arrays)
+            os.replace(file_path + '.tmp', file_path)
+            logger.info(f"ℹ️ Model artifact saved to {file_path}")
+        except Exception as e:
+            logger.critical(f"⛔ Critical error while saving the model artifact: {e}")
+            raise e
+
+    @classmethod
+    def load(cls, file_path):
+        from data.preprocessing import restore_scaler
+
+        header, weights = read_artifact(file_path)
+        metadata = dict(header['metadata'], created=header['created'], version=header['version'])
+        logger.info(f"ℹ️ Model artifact loaded from {file_path}")
+        return cls(header['architecture'], weights, restore_scaler(header['scaler']),
+                   FeatureSpec.from_dict(header['feature_spec']), metadata)
@@ -0,0 +1,143 @@
+# cross_validation.py
+# This file runs k-fold cross-validation of NeuralNetworkModel over every row of a dataset.
+# Folds train in parallel in a SharedArrayPool (the dataset is memory-mapped by all workers, not
+# copied to each), the per-fold R^2/MSE are summarized with t-based confidence intervals, and the
+# fold models can be kept as a NumpyEnsemble whose averaged prediction is one batched call.
+
+import time
+from concurrent.futures import FIRST_COMPLETED, wait
+import numpy as np
+import pandas as pd
+from scipy import stats
+from app_logging import logger
+from model.input_pipeline import make_dataset
+from model.numpy_runtime import NumpyEnsemble
+from model.process_pool import SharedArrayPool, cancel_callback, worker_arrays
+
+DEFAULT_FOLDS = 5
+CONFIDENCE = 0.95
+METRICS = ('r2', 'mse')
+# Rows per batch when predicting the held-out fold
+PREDICT_BATCH_ROWS = 8192
+
+
+def fold_indices(n_rows, k, seed):
+    """Return the k validation index arrays of a seeded shuffled k-fold split."""
+    return np.array_split(np.random.default_rng(seed).permutation(n_rows), k)
+
+
+def _train_fold(fold, k, seed, config, keep_model):
+    from sklearn.metrics import r2_score, mean_squared_error
+    from model.neural_network import NeuralNetworkModel
+
+    data = worker_arrays()
+    folds = fold_indices(len(data['targets']), k, seed)
+    # Training rows stay in shuffled order so the trailing validation split is a random sample
+    train_rows = np.concatenate([rows for i, rows in enumerate(folds) if i != fold])
+    val_rows = np.sort(folds[fold])
+    weights = data.get('weights')
+
+    start = time.perf_counter()
+    model = NeuralNetworkModel(input_shape=(data['features'].shape[1],), dense1_units=config['dense1_units'],
+                               dense2_units=config['dense2_units'], learning_rate=config['learning_rate'])
+    # Batches are gathered from the shared memory map by row index: the fold is never copied
+    history = model.train(data['features'], data['targets'], validation_split=config['validation_split'],
+                          epochs=config['epochs'], batch_size=config['batch_size'], patience=config['patience'],
+                          verbose=0, callbacks=[cancel_callback()], sample_weight=weights,
+                          use_input_pipeline=True, row_indices=train_rows)
+    y_val = data['targets'][val_rows]
+    val_data = make_dataset(data['features'], data['targets'], batch_size=PREDICT_BATCH_ROWS, shuffle=False,
+                            indices=val_rows)
+    predictions = model.model.predict(val_data, verbose=0).ravel()
+    return {
+        'fold': fold,
+        'n_train': len(train_rows),
+        'n_val': len(val_rows),
+        'epochs_run': len(history.history['loss']),
+        'r2': float(r2_score(y_val, predictions)),
+        'mse': float(mean_squared_error(y_val, predictions)),
+        'seconds': time.perf_counter() - start,
+        'architecture': model.architecture() if keep_model else None,
+        'weights': model.model.get_weights() if keep_model else None,
+    }
+
+
+def summarize(values, confidence=CONFIDENCE):
+    """Mean, sample std and two-sided t confidence interval of per-fold values."""
+    values = np.asarray(values, dtype=np.float64)
+    mean = float(values.mean())
+    if len(values) < 2:
+        return {'mean': mean, 'std': 0.0, 'ci_low': mean, 'ci_high': mean}
+    std = float(values.std(ddof=1))
+    half_width = stats.t.ppf(0.5 + confidence / 2, len(values) - 1) * std / np.sqrt(len(values))
+    return {'mean': mean, 'std': std, 'ci_low': mean - half_width, 'ci_high': mean + half_width}
+
+
+class CrossValidationResult:
+    """Per-fold table, metric summary with confidence intervals and the optional fold ensemble."""
+
+    def __init__(self, folds, summary, ensemble=None, confidence=CONFIDENCE):
+        self.folds = folds
+        self.summary = summary
+        self.ensemble = ensemble
+        self.confidence = confidence
+
+    def summary_text(self):
+        lines = []
+        for metric, s in self.summary.items():
+            lines.append(f"{metric}: {s['mean']:.6g} ± {s['std']:.3g} "
+                         f"({self.confidence:.0%} CI {s['ci_low']:.6g} .. {s['ci_high']:.6g})")
+        return '\n'.join(lines)
+
+
+def cross_validate(dataset, k=DEFAULT_FOLDS, dense1_units=64, dense2_units=32, learning_rate=0.001, epochs=1000,
+                   batch_size=77, validation_split=0.07, patience=100, keep_models=True, max_workers=None,
+                   threads_per_worker=None, seed=0, confidence=CONFIDENCE, progress=None, should_stop=None):
+    """
+    Train one model per fold over all rows (train and test) of a CompactDataset.
+
+    Each fold model early-stops on a validation split of its own training rows and is
+    scored on its held-out fold. Returns a CrossValidationResult; with keep_models=True
+    its 'ensemble' averages the k fold models. 'progress(done, k)' is called after every
+    fold and 'should_stop()' is polled to abort.
+    """
+    config = {'dense1_units': dense1_units, 'dense2_units': dense2_units, 'learning_rate': learning_rate,
+              'epochs': epochs, 'batch_size': batch_size, 'validation_split': validation_split, 'patience': patience}
+    logger.info(f"ℹ️ Starting {k}-fold cross-validation on {dataset.n_rows} rows with {config}.")
+
+    results = []
+    arrays = {'features': dataset.features, 'targets': dataset.targets, 'weights': dataset.weights}
+    with SharedArrayPool(arrays, k, max_workers, threads_per_worker) as pool:
+        pending = {pool.submit(_train_fold, fold, k, seed, config, keep_models): fold for fold in range(k)}
+        while pending:
+            if should_stop is not None and should_stop():
+                pool.cancel()
+                logger.warning("⚠️ Cross-validation stopped before all folds finished.")
+                break
+            done, _ = wait(pending, timeout=1.0, return_when=FIRST_COMPLETED)
+            for future in done:
+                fold = pending.pop(future)
+                try:
+                    result = future.result()
+                except Exception as e:
+                    logger.critical(f"⛔ Cross-validation fold {fold} failed: {e}")
+                    raise e
+                results.append(result)
+                logger.info(f"ℹ️ Fold {fold}: R^2={result['r2']:.4f}, MSE={result['mse']:.6f}, "
+                            f"{result['epochs_run']} epochs, {result['seconds']:.1f} s")
+                if progress is not None:
+                    progress(len(results), k)
+
+    results.sort(key=lambda result: result['fold'])
+    folds = pd.DataFrame([{name: value for name, value in result.items() if name not in ('architecture', 'weights')}
+                          for result in results])
+    summary = {metric: summarize(folds[metric], confidence) for metric in METRICS} if results else {}
+
+    ensemble = None
+    if keep_models and results:
+        ensemble = NumpyEnsemble(results[0]['architecture'], [result['weights'] for result in results],
+                                 dataset.scaler.mean_, dataset.scaler.scale_, dataset.feature_spec,
+                                 metadata={'cross_validation': {'k': k, 'seed': seed, **config}})
+    result = CrossValidationResult(folds, summary, ensemble, confidence)
+    logger.info("ℹ️ Cross-validation finished:\n" + result.summary_text())
+    return result
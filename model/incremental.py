@@ -0,0 +1,165 @@
+# incremental.py
+# This file implements warm-start training on new telemetry batches.
+# The new rows are folded into the existing scaler with partial_fit, the first layer of the model
+# is rewritten so its predictions are unchanged under the updated scaling, and the model is then
+# fine-tuned for a bounded number of epochs on the new rows plus a replay sample of the old
+# training rows (so it does not forget the old operating points). Optionally a full retrain on
+# all rows is run for comparison.
+
+import copy
+import time
+from datetime import datetime
+import numpy as np
+from sklearn.metrics import r2_score, mean_squared_error
+from sklearn.model_selection import train_test_split
+from app_logging import logger
+from data.dataset import CompactDataset, FEATURE_DTYPE
+from data.parallel_ingest import ingest_unscaled
+from data.preprocessing import scaler_state, restore_scaler, DEFAULT_MISSION_TIME, TEST_SIZE, RANDOM_STATE
+from model.neural_network import NeuralNetworkModel
+
+DEFAULT_FINE_TUNE_EPOCHS = 50
+DEFAULT_FINE_TUNE_PATIENCE = 10
+DEFAULT_REPLAY_RATIO = 1.0
+
+
+def rescale_rows(X, from_scaler, to_scaler):
+    """Convert rows scaled with 'from_scaler' into the units of 'to_scaler'."""
+    return ((X * from_scaler.scale_ + (from_scaler.mean_ - to_scaler.mean_)) / to_scaler.scale_).astype(FEATURE_DTYPE)
+
+
+def merge_new_rows(old_dataset, X_new, y_new, scaler, test_size=TEST_SIZE, random_state=RANDOM_STATE):
+    """
+    Return a CompactDataset with the old rows (rescaled to 'scaler') and the new unscaled
+    rows 'X_new' (scaled with it). The new rows get their own train/test split; the layout
+    is old train, new train | old test, new test.
+    """
+    X_new_train, X_new_test, y_new_train, y_new_test = train_test_split(
+        X_new, y_new, test_size=test_size, random_state=random_state)
+    parts = [rescale_rows(old_dataset.X_train, old_dataset.scaler, scaler), scaler.transform(X_new_train),
+             rescale_rows(old_dataset.X_test, old_dataset.scaler, scaler), scaler.transform(X_new_test)]
+    targets = [old_dataset.y_train, y_new_train, old_dataset.y_test, y_new_test]
+
+    features = np.empty((sum(len(part) for part in parts), old_dataset.n_features), dtype=FEATURE_DTYPE, order='F')
+    start = 0
+    for part in parts:
+        features[start:start + len(part)] = part
+        start += len(part)
+    targets = np.concatenate([np.asarray(part, dtype=FEATURE_DTYPE) for part in targets])
+    n_train = len(parts[0]) + len(parts[1])
+    return CompactDataset(features, targets, n_train, scaler, old_dataset.feature_spec)
+
+
+def _scores(model, dataset, n_old_test):
+    predictions = model.predict(dataset.X_test, verbose=0)
+    y_test = dataset.y_test
+    scores = {'r2': float(r2_score(y_test, predictions)), 'mse': float(mean_squared_error(y_test, predictions))}
+    # Old test rows show forgetting, new test rows show how well the new telemetry is learned
+    for name, part in (('old', slice(None, n_old_test)), ('new', slice(n_old_test, None))):
+        if len(y_test[part]) > 1:
+            scores[f'r2_{name}_test'] = float(r2_score(y_test[part], predictions[part]))
+            scores[f'mse_{name}_test'] = float(mean_squared_error(y_test[part], predictions[part]))
+    return scores
+
+
+def train_incremental(model, old_dataset, X_new, y_new, replay_ratio=DEFAULT_REPLAY_RATIO,
+                      epochs=DEFAULT_FINE_TUNE_EPOCHS, batch_size=77, validation_split=0.07,
+                      patience=DEFAULT_FINE_TUNE_PATIENCE, learning_rate=None, test_size=TEST_SIZE,
+                      random_state=RANDOM_STATE, seed=None, callbacks=None):
+    """
+    Fine-tune a trained NeuralNetworkModel on new unscaled feature rows.
+
+    'old_dataset' is the CompactDataset of the earlier data (in any scaling; it is converted
+    with its own scaler). 'replay_ratio' sets how many old training rows are replayed per
+    new training row. 'learning_rate' optionally overrides the fine-tuning learning rate.
+    Returns (merged dataset, history, report).
+    """
+    if model.scaler is None:
+        raise ValueError("The model has no scaler; train it with train_on_dataset or load a saved model.")
+    start = time.perf_counter()
+
+    # Rescaling and fine-tuning change the model in place: a failure restores it as it was
+    old_scaler = scaler_state(model.scaler)
+    old_weights = model.model.get_weights()
+    old_learning_rate = model.learning_rate
+    try:
+        scaler = copy.deepcopy(model.scaler)
+        scaler.partial_fit(X_new)
+        model.rescale_inputs(scaler)
+        dataset = merge_new_rows(old_dataset, X_new, y_new, scaler, test_size, random_state)
+
+        rng = np.random.default_rng(seed)
+        n_old_train = old_dataset.n_train
+        n_new_train = dataset.n_train - n_old_train
+        n_replay = min(n_old_train, int(round(replay_ratio * n_new_train)))
+        rows = np.concatenate([rng.choice(n_old_train, n_replay, replace=False), np.arange(n_old_train, dataset.n_train)])
+        # Shuffled so the trailing validation split mixes old and new rows
+        rng.shuffle(rows)
+        logger.info(f"ℹ️ Incremental training on {n_new_train} new rows plus {n_replay} replayed rows.")
+
+        if learning_rate is not None:
+            model.learning_rate = learning_rate
+            model._compile()
+        history = model.train(dataset.X_train[rows], dataset.y_train[rows], validation_split=validation_split,
+                              epochs=epochs, batch_size=batch_size, patience=patience, callbacks=callbacks)
+    except Exception as e:
+        model.scaler = restore_scaler(old_scaler)
+        model.model.set_weights(old_weights)
+        if model.learning_rate != old_learning_rate:
+            model.learning_rate = old_learning_rate
+            model._compile()
+        logger.critical(f"⛔ Critical error in incremental training, model restored: {e}")
+        raise e
+
+    report = {
+        'new_rows': len(X_new),
+        'new_train_rows': n_new_train,
+        'replay_rows': n_replay,
+        'epochs_run': len(history.history['loss']),
+        'seconds': time.perf_counter() - start,
+        **_scores(model, dataset, len(old_dataset.y_test)),
+    }
+    model.metadata.setdefault('incremental_updates', []).append(
+        dict(report, updated_at=datetime.now().isoformat(timespec='seconds')))
+    logger.info(f"ℹ️ Incremental training done in {report['seconds']:.1f} s, R^2={report['r2']:.4f}")
+    return dataset, history, report
+
+
+def full_retrain(model, dataset, n_old_test, epochs=1000, batch_size=77, validation_split=0.07, patience=100,
+                 callbacks=None):
+    """Train a fresh model with the same architecture on every training row of 'dataset' for comparison."""
+    start = time.perf_counter()
+    fresh = NeuralNetworkModel(input_shape=model.input_shape, dense1_units=model.dense1_units,
+                               dense2_units=model.dense2_units, learning_rate=model.learning_rate)
+    history = fresh.train_on_dataset(dataset, validation_split=validation_split, epochs=epochs, batch_size=batch_size,
+                                     patience=patience, callbacks=callbacks)
+    report = {
+        'train_rows': dataset.n_train,
+        'epochs_run': len(history.history['loss']),
+        'seconds': time.perf_counter() - start,
+        **_scores(fresh, dataset, n_old_test),
+    }
+    logger.info(f"ℹ️ Full retrain done in {report['seconds']:.1f} s, R^2={report['r2']:.4f}")
+    return fresh, report
+
+
+def incremental_update(model, old_dataset, inputs, compare=False, full_epochs=1000, mission_time=DEFAULT_MISSION_TIME,
+                       reliability_model='exponential', callbacks=None, **train_kwargs):
+    """
+    Clean the new file(s) in 'inputs' with the model's feature spec, fine-tune the model on
+    them (see train_incremental) and, with compare=True, also run a full retrain on all rows.
+    Returns (merged dataset, report) where report has 'incremental', optionally 'full' and
+    'speedup' (full retrain time / incremental time).
+    """
+    X_new, y_new, ingest_report = ingest_unscaled(inputs, mission_time=mission_time,
+                                                  reliability_model=reliability_model,
+                                                  feature_spec=model.feature_spec)
+    dataset, _, incremental = train_incremental(model, old_dataset, X_new, y_new, callbacks=callbacks, **train_kwargs)
+    report = {'files': ingest_report, 'incremental': incremental}
+    if compare:
+        _, full = full_retrain(model, dataset, len(old_dataset.y_test), epochs=full_epochs,
+                               batch_size=train_kwargs.get('batch_size', 77),
+                               validation_split=train_kwargs.get('validation_split', 0.07), callbacks=callbacks)
+        report['full'] = full
+        report['speedup'] = full['seconds'] / incremental['seconds']
+    return dataset, report
@@ -0,0 +1,152 @@
+# input_pipeline.py
+# This file builds the tf.data input pipeline used for training on large datasets.
+# Rows are never copied up front: the pipeline shuffles row indices, batches them and gathers
+# each batch from the (possibly memory-mapped) feature/target arrays, with prefetching so the
+# next batches are read while the current step runs.
+
+import numpy as np
+import tensorflow as tf
+from app_logging import logger
+
+DEFAULT_SHUFFLE_BUFFER = 100_000
+# Shards interleaved (and held in memory) at a time when streaming a sharded dataset
+DEFAULT_SHARD_CYCLE = 4
+
+
+def open_array(source):
+    """Return 'source' as an array; .npy paths are opened memory-mapped."""
+    if isinstance(source, str):
+        return np.load(source, mmap_mode='r')
+    return source
+
+
+def split_ranges(n_rows, validation_split):
+    """
+    Express a Keras-style validation split as index ranges: like model.fit's
+    validation_split, the validation rows are the last fraction of the data.
+    """
+    n_val = int(n_rows * validation_split)
+    return (0, n_rows - n_val), (n_rows - n_val, n_rows)
+
+
+def make_dataset(X, y, index_range=None, batch_size=77, shuffle=True, shuffle_buffer=DEFAULT_SHUFFLE_BUFFER,
+                 map_fn=None, num_parallel_calls=None, prefetch=tf.data.AUTOTUNE, seed=None, sample_weight=None,
+                 indices=None):
+    """
+    Build a batched tf.data.Dataset over rows [start, stop) of X/y, or over the row numbers
+    in 'indices' (e.g. a cross-validation fold) when given.
+
+    Batches are gathered from X and y (and sample_weight, if given) by index, so
+    memory-mapped arrays are only read one batch at a time; rows within a batch come in
+    sorted order. 'map_fn' is an optional transform applied per batch,
+    'num_parallel_calls' parallelizes the gather and map steps.
+    """
+    X = open_array(X)
+    y = open_array(y)
+    sample_weight = open_array(sample_weight) if sample_weight is not None else None
+    n_features = X.shape[1]
+
+    def gather(indices):
+        # Sorted indices turn the batch into mostly sequential reads from the memory map
+        indices = np.sort(indices)
+        if sample_weight is None:
+            return X[indices].astype(np.float32), y[indices].astype(np.float32)
+        return X[indices].astype(np.float32), y[indices].astype(np.float32), sample_weight[indices].astype(np.float32)
+
+    def tf_gather(indices):
+        n_outputs = 2 if sample_weight is None else 3
+        tensors = tf.numpy_function(gather, [indices], (tf.float32,) * n_outputs)
+        tensors[0].set_shape([None, n_features])
+        for tensor in tensors[1:]:
+            tensor.set_shape([None])
+        return tuple(tensors)
+
+    if indices is not None:
+        dataset = tf.data.Dataset.from_tensor_slices(np.asarray(indices, dtype=np.int64))
+        n_rows = len(indices)
+    else:
+        start, stop = index_range if index_range is not None else (0, len(X))
+        dataset = tf.data.Dataset.range(start, stop)
+        n_rows = stop - start
+    if shuffle:
+        dataset = dataset.shuffle(min(shuffle_buffer, max(n_rows, 1)), seed=seed, reshuffle_each_iteration=True)
+    dataset = dataset.batch(batch_size)
+    dataset = dataset.map(tf_gather, num_parallel_calls=num_parallel_calls)
+    if map_fn is not None:
+        dataset = dataset.map(map_fn, num_parallel_calls=num_parallel_calls)
+    if prefetch:
+        dataset = dataset.prefetch(prefetch)
+    return dataset
+
+
+def make_train_val_datasets(X, y, validation_split=0.07, batch_size=77, shuffle_buffer=DEFAULT_SHUFFLE_BUFFER,
+                            map_fn=None, num_parallel_calls=None, seed=None, sample_weight=None, indices=None):
+    """
+    Return (train_dataset, validation_dataset); the latter is None when validation_split is 0.
+    With 'indices', only those rows are used and the validation rows are their last fraction.
+    """
+    X = open_array(X)
+    y = open_array(y)
+    train_range, val_range = split_ranges(len(X) if indices is None else len(indices), validation_split)
+    logger.debug(f"🐛 Input pipeline ranges: train={train_range}, validation={val_range}")
+
+    def rows(index_range):
+        # Either a row range of X or the matching slice of 'indices'
+        if indices is None:
+            return {'index_range': index_range}
+        return {'indices': indices[index_range[0]:index_range[1]]}
+
+    train_dataset = make_dataset(X, y, batch_size=batch_size, shuffle=True, shuffle_buffer=shuffle_buffer,
+                                 map_fn=map_fn, num_parallel_calls=num_parallel_calls, seed=seed,
+                                 sample_weight=sample_weight, **rows(train_range))
+    validation_dataset = None
+    if val_range[1] > val_range[0]:
+        validation_dataset = make_dataset(X, y, batch_size=batch_size, shuffle=False,
+                                          map_fn=map_fn, num_parallel_calls=num_parallel_calls,
+                                          sample_weight=sample_weight, **rows(val_range))
+    return train_dataset, validation_dataset
+
+
+def make_shard_dataset(sharded, partition='train', filters=None, batch_size=77, shuffle=True, subset=None,
+                       validation_split=0.0, split_seed=0, cycle_length=DEFAULT_SHARD_CYCLE,
+                       shuffle_buffer=DEFAULT_SHUFFLE_BUFFER, prefetch=tf.data.AUTOTUNE, seed=None):
+    """
+    Stream scaled batches from a ShardedDataset, a few shards in memory at a time.
+
+    With shuffle=True the shards are visited in a new random order every epoch and
+    'cycle_length' of them are interleaved row by row into a shuffle buffer, so a batch
+    mixes rows of several shards even when the shards are sorted on a column.
+    'subset' ('train' or 'validation') keeps the rows of a seeded row-level
+    'validation_split' (see ShardedDataset.validation_mask); None keeps every row.
+    """
+    selected = sharded.shards(partition, filters)
+    rng = np.random.default_rng(seed)
+
+    def read(index):
+        shard = selected[int(index)]
+        row_mask = None
+        if subset is not None:
+            held_out = sharded.validation_mask(shard, validation_split, split_seed)
+            row_mask = held_out if subset == 'validation' else ~held_out
+        X, y = sharded.read_shard(shard, filters, row_mask=row_mask)
+        if shuffle:
+            permutation = rng.permutation(len(y))
+            X, y = X[permutation], y[permutation]
+        for start in range(0, len(y), batch_size):
+            yield X[start:start + batch_size], y[start:start + batch_size]
+
+    signature = (tf.TensorSpec(shape=(None, sharded.n_features), dtype=tf.float32),
+                 tf.TensorSpec(shape=(None,), dtype=tf.float32))
+
+    def shard_batches(index):
+        return tf.data.Dataset.from_generator(read, args=(index,), output_signature=signature)
+
+    indices = tf.data.Dataset.range(len(selected))
+    if shuffle and selected:
+        indices = indices.shuffle(len(selected), seed=seed, reshuffle_each_iteration=True)
+        dataset = indices.interleave(shard_batches, cycle_length=min(cycle_length, len(selected)), block_length=1)
+        dataset = dataset.unbatch().shuffle(shuffle_buffer, seed=seed, reshuffle_each_iteration=True)
+        dataset = dataset.batch(batch_size)
+    else:
+        dataset = indices.flat_map(shard_batches)
+    return dataset.prefetch(prefetch) if prefetch else dataset
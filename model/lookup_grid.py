@@ -0,0 +1,199 @@
+# lookup_grid.py
+# This file bakes a trained model into a dense V/f/T/N reliability grid for control loops.
+# The model is evaluated once over the full grid (in large batches, see scoring.py) and the
+# values are written to a memory-mapped .npy file with a JSON sidecar holding the axes and an
+# error report. ReliabilityGrid answers queries by multilinear interpolation: a single point
+# takes a few microseconds in plain Python, batches are interpolated with vectorized NumPy.
+
+import bisect
+import json
+import os
+import time
+from itertools import product
+import numpy as np
+from app_logging import logger
+from model.operating_point import DEFAULT_BOUNDS
+from model.scoring import DEFAULT_BATCH_ROWS, score_raw
+
+GRID_FORMAT = 'ultra_aim_pro.reliability_grid'
+
+# Points per continuous axis when no axis values are given; discrete bounds use their values
+DEFAULT_AXIS_POINTS = {'V': 23, 'f': 65, 'T': 33}
+
+
+def grid_paths(path):
+    """The (.npy values, .json sidecar) file pair of a grid stored under 'path' (extension optional)."""
+    root = os.path.splitext(path)[0]
+    return root + '.npy', root + '.json'
+
+
+def make_axes(columns, axes=None):
+    """
+    Axis values per column: 'axes' maps a column to explicit values or to a point count
+    over its DEFAULT_BOUNDS range; other columns get DEFAULT_AXIS_POINTS or their discrete values.
+    """
+    axes = axes or {}
+    result = {}
+    for name in columns:
+        spec = axes.get(name, DEFAULT_AXIS_POINTS.get(name))
+        bounds = DEFAULT_BOUNDS.get(name)
+        if bounds is None and (spec is None or isinstance(spec, int)):
+            raise ValueError(f"Grid axis '{name}' has no default range, pass its values in 'axes'")
+        if isinstance(spec, int) and isinstance(bounds, tuple):
+            values = np.linspace(bounds[0], bounds[1], spec)
+        elif spec is None or isinstance(spec, int):
+            values = np.asarray(bounds, dtype=np.float64)
+        else:
+            values = np.asarray(spec, dtype=np.float64)
+        values = np.unique(values)
+        if values.ndim != 1 or len(values) == 0:
+            raise ValueError(f"Grid axis '{name}' needs at least one value")
+        result[name] = values
+    return result
+
+
+class ReliabilityGrid:
+    """Memory-mapped reliability grid over the model's base columns with multilinear interpolation."""
+
+    def __init__(self, values, axes, metadata=None):
+        self.values = values
+        self.columns = list(axes)
+        self.axes = [np.asarray(axes[name], dtype=np.float64) for name in self.columns]
+        self.metadata = metadata or {}
+        # Plain-Python copies for the single-point path
+        self._axis_lists = [axis.tolist() for axis in self.axes]
+        self._strides = [stride // values.itemsize for stride in values.strides]
+        self._flat = values.reshape(-1)
+
+    @classmethod
+    def load(cls, path):
+        values_path, sidecar_path = grid_paths(path)
+        with open(sidecar_path, encoding='utf-8') as f:
+            sidecar = json.load(f)
+        if sidecar.get('format') != GRID_FORMAT:
+            raise ValueError(f"{sidecar_path} is not a reliability grid")
+        values = np.load(values_path, mmap_mode='r')
+        logger.info(f"ℹ️ Reliability grid {values.shape} loaded from {values_path}")
+        return cls(values, sidecar['axes'], sidecar.get('metadata'))
+
+    @property
+    def shape(self):
+        return self.values.shape
+
+    def query_point(self, *point):
+        """Interpolated reliability of one operating point, given in the order of self.columns."""
+        offset = 0
+        cells = []
+        for x, axis, stride in zip(point, self._axis_lists, self._strides):
+            n = len(axis)
+            if n == 1 or x <= axis[0]:
+                i, t = 0, 0.0
+            elif x >= axis[-1]:
+                i, t = n - 2, 1.0
+            else:
+                i = bisect.bisect_right(axis, x) - 1
+                t = (x - axis[i]) / (axis[i + 1] - axis[i])
+            offset += i * stride
+            cells.append((t, stride if n > 1 else 0))
+
+        # Accumulate the 2^d corners, one axis at a time
+        corners = [(offset, 1.0)]
+        for t, stride in cells:
+            corners = [(k + step, w * weight) for k, w in corners
+                       for step, weight in ((0, 1.0 - t), (stride, t)) if weight]
+        flat = self._flat
+        return float(sum(w * flat[k] for k, w in corners))
+
+    def query(self, columns):
+        """Interpolated reliability for a batch: a mapping or DataFrame of the grid columns."""
+        points = [np.asarray(columns[name], dtype=np.float64) for name in self.columns]
+        lower, weights = [], []
+        for x, axis in zip(points, self.axes):
+            if len(axis) == 1:
+                lower.append(np.zeros(x.shape, dtype=np.intp))
+                weights.append(np.zeros(x.shape))
+                continue
+            i = np.clip(np.searchsorted(axis, x, side='right') - 1, 0, len(axis) - 2)
+            lower.append(i)
+            weights.append(np.clip((x - axis[i]) / (axis[i + 1] - axis[i]), 0.0, 1.0))
+
+        result = np.zeros(points[0].shape)
+        for corner in product((0, 1), repeat=len(points)):
+            index = tuple(np.minimum(i + bit, len(axis) - 1) for i, bit, axis in zip(lower, corner, self.axes))
+            weight = np.ones(points[0].shape)
+            for t, bit in zip(weights, corner):
+                weight *= t if bit else 1.0 - t
+            result += weight * self.values[index]
+        return result
+
+    def out_of_range(self, columns):
+        """Boolean mask of points outside the grid on any axis (their queries are clamped to the edge)."""
+        mask = np.zeros(len(np.asarray(columns[self.columns[0]])), dtype=bool)
+        for name, axis in zip(self.columns, self.axes):
+            x = np.asarray(columns[name], dtype=np.float64)
+            mask |= (x < axis[0]) | (x > axis[-1])
+        return mask
+
+
+def interpolation_error(grid, model, columns, batch_rows=DEFAULT_BATCH_ROWS):
+    """Compare grid queries with the live model on raw 'columns'; points outside the grid are only counted."""
+    outside = grid.out_of_range(columns)
+    inside = {name: np.asarray(columns[name], dtype=np.float64)[~outside] for name in grid.columns}
+    report = {'n_points': int(len(outside)), 'n_outside_grid': int(outside.sum())}
+    if len(outside) > outside.sum():
+        error = np.abs(grid.query(inside) - score_raw(model, inside, batch_rows))
+        report.update(max_abs_error=float(error.max()), mean_abs_error=float(error.mean()),
+                      p99_abs_error=float(np.percentile(error, 99)))
+    return report
+
+
+def raw_test_columns(dataset):
+    """Unscaled base columns of the test split of a CompactDataset."""
+    n_base = len(dataset.feature_spec.base)
+    X = dataset.X_test[:, :n_base] * dataset.scaler.scale_[:n_base] + dataset.scaler.mean_[:n_base]
+    return {name: X[:, j] for j, name in enumerate(dataset.feature_spec.base)}
+
+
+def bake_lookup_grid(model, path, axes=None, dataset=None, batch_rows=DEFAULT_BATCH_ROWS):
+    """
+    Evaluate 'model' (NeuralNetworkModel with scaler and feature spec, or NumpyModel) over the
+    full grid of its base columns and store it under 'path' (<path>.npy + <path>.json).
+
+    'axes' configures the grid per column (see make_axes). With a CompactDataset 'dataset',
+    the worst-case interpolation error against the live model on its test split is stored
+    in the sidecar metadata. Returns the memory-mapped ReliabilityGrid.
+    """
+    columns = list(model.feature_spec.base)
+    axes = make_axes(columns, axes)
+    shape = tuple(len(axes[name]) for name in columns)
+    values_path, sidecar_path = grid_paths(path)
+    logger.info(f"ℹ️ Baking a {'x'.join(map(str, shape))} reliability grid to {values_path}")
+
+    start = time.perf_counter()
+    try:
+        os.makedirs(os.path.dirname(os.path.abspath(values_path)), exist_ok=True)
+        values = np.lib.format.open_memmap(values_path, mode='w+', dtype=np.float32, shape=shape)
+        flat = values.reshape(-1)
+        n_points = flat.size
+        for batch_start in range(0, n_points, batch_rows):
+            index = np.unravel_index(np.arange(batch_start, min(batch_start + batch_rows, n_points)), shape)
+            batch = {name: axes[name][i] for name, i in zip(columns, index)}
+            flat[batch_start:batch_start + len(index[0])] = score_raw(model, batch, batch_rows)
+        values.flush()
+        del values
+    except Exception as e:
+        logger.critical(f"⛔ Critical error while baking the reliability grid: {e}")
+        raise e
+    seconds = time.perf_counter() - start
+
+    metadata = {'n_points': int(np.prod(shape)), 'bake_seconds': seconds, 'model': getattr(model, 'metadata', {})}
+    grid = ReliabilityGrid(np.load(values_path, mmap_mode='r'), axes, metadata)
+    if dataset is not None:
+        metadata['test_error'] = interpolation_error(grid, model, raw_test_columns(dataset), batch_rows)
+        logger.info(f"ℹ️ Grid interpolation error on the test split: {metadata['test_error']}")
+
+    with open(sidecar_path, 'w', encoding='utf-8') as f:
+        json.dump({'format': GRID_FORMAT, 'axes': {name: axes[name].tolist() for name in columns},
+                   'metadata': metadata}, f, indent=2, default=str)
+    logger.info(f"ℹ️ Reliability grid with {metadata['n_points']:,} points baked in {seconds:.1f} s.")
+    return grid
@@ -0,0 +1,193 @@
+# metrics.py
+# This file records training metrics without blocking the training loop.
+# MetricsRecorder writes per-epoch (and optionally per-batch) loss, validation loss, step time
+# and samples/s into preallocated ring buffers. A background thread appends the new rows to a
+# compact columnar file set (one raw binary file per column) that read_metrics() loads back,
+# and query() returns the most recent rows straight from memory.
+
+import json
+import os
+import threading
+import time
+from datetime import datetime
+import numpy as np
+import pandas as pd
+from keras.callbacks import Callback
+from app_logging import logger, log_directory
+
+METRICS_FORMAT = 'ultra_aim_pro.metrics'
+SCHEMA_FILE = 'schema.json'
+
+# Column name -> dtype of every record kind
+COLUMNS = {
+    'epoch': {'epoch': np.int32, 'loss': np.float32, 'val_loss': np.float32, 'seconds': np.float32,
+              'samples_per_second': np.float32, 'timestamp': np.float64},
+    'batch': {'epoch': np.int32, 'batch': np.int32, 'loss': np.float32, 'seconds': np.float32,
+              'samples_per_second': np.float32},
+}
+
+DEFAULT_CAPACITY = {'epoch': 4096, 'batch': 65536}
+DEFAULT_FLUSH_INTERVAL = 2.0
+
+
+def default_metrics_dir():
+    """A new timestamped run directory under logs/metrics, named like the log files."""
+    return os.path.join(log_directory, 'metrics', datetime.now().strftime("metrics_%d%m%Y_%H%M%S"))
+
+
+class RingBuffer:
+    """Preallocated columnar buffer of the last 'capacity' rows; once full, appends overwrite the oldest row."""
+
+    def __init__(self, columns, capacity):
+        self.capacity = capacity
+        self.data = np.zeros(capacity, dtype=[(name, dtype) for name, dtype in columns.items()])
+        self.written = 0
+        self.flushed = 0
+        self.lost = 0
+        self._lock = threading.Lock()
+
+    def append(self, row):
+        with self._lock:
+            self.data[self.written % self.capacity] = row
+            self.written += 1
+
+    def _rows(self, start, stop):
+        return self.data[np.arange(start, stop) % self.capacity]
+
+    def take_unflushed(self):
+        """Rows appended since the last call; rows overwritten before they were taken are counted in 'lost'."""
+        with self._lock:
+            start = max(self.flushed, self.written - self.capacity)
+            self.lost += start - self.flushed
+            rows = self._rows(start, self.written)
+            self.flushed = self.written
+        return rows
+
+    def tail(self, n=None):
+        """The last 'n' rows (all buffered rows by default), oldest first."""
+        with self._lock:
+            available = min(self.written, self.capacity)
+            n = available if n is None else min(n, available)
+            return self._rows(self.written - n, self.written)
+
+
+def read_metrics(directory, kind='epoch'):
+    """Load every flushed row of 'kind' ('epoch' or 'batch') from a metrics directory as a DataFrame."""
+    with open(os.path.join(directory, SCHEMA_FILE), encoding='utf-8') as f:
+        schema = json.load(f)
+    if schema.get('format') != METRICS_FORMAT:
+        raise ValueError(f"{directory} is not a metrics directory")
+    columns = {}
+    for name, dtype in schema['columns'][kind].items():
+        file_path = os.path.join(directory, f"{kind}.{name}")
+        columns[name] = np.fromfile(file_path, dtype=dtype) if os.path.exists(file_path) else np.empty(0, dtype)
+    # A flush interrupted by a crash can leave some columns one row longer than others
+    n_rows = min(len(values) for values in columns.values())
+    return pd.DataFrame({name: values[:n_rows] for name, values in columns.items()})
+
+
+class MetricsRecorder(Callback):
+    """
+    Keras callback recording metrics into ring buffers. With a 'directory', a daemon
+    thread flushes new rows every 'flush_interval' seconds and once more when training
+    ends. 'samples_per_epoch' and 'batch_size' are only used for the samples/s figures;
+    per-batch rows are recorded only with record_batches=True.
+    """
+
+    def __init__(self, directory=None, record_batches=False, samples_per_epoch=None, batch_size=None,
+                 flush_interval=DEFAULT_FLUSH_INTERVAL, capacity=None):
+        super().__init__()
+        capacity = dict(DEFAULT_CAPACITY, **(capacity or {}))
+        self.directory = directory
+        self.record_batches = record_batches
+        self.samples_per_epoch = samples_per_epoch
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.buffers = {kind: RingBuffer(COLUMNS[kind], capacity[kind]) for kind in COLUMNS}
+        self._stop = threading.Event()
+        self._flusher = None
+        self._epoch = 0
+        self._epoch_start = None
+        self._batch_start = None
+        self._batch_rows = 0
+        if record_batches:
+            # Only hooked up on request: Keras skips batch callbacks nobody implements
+            self.on_train_batch_end = self._record_batch
+
+    def on_train_begin(self, logs=None):
+        if self.directory is not None:
+            os.makedirs(self.directory, exist_ok=True)
+            schema = {'format': METRICS_FORMAT,
+                      'columns': {kind: {name: np.dtype(dtype).str for name, dtype in columns.items()}
+                                  for kind, columns in COLUMNS.items()}}
+            with open(os.path.join(self.directory, SCHEMA_FILE), 'w', encoding='utf-8') as f:
+                json.dump(schema, f, indent=2)
+            self._stop.clear()
+            self._flusher = threading.Thread(target=self._flush_loop, name='metrics-flusher', daemon=True)
+            self._flusher.start()
+
+    def on_epoch_begin(self, epoch, logs=None):
+        self._epoch = epoch
+        self._epoch_start = self._batch_start = time.perf_counter()
+        self._batch_rows = 0
+
+    def _record_batch(self, batch, logs=None):
+        now = time.perf_counter()
+        seconds = now - self._batch_start
+        self._batch_start = now
+        # With steps_per_execution > 1 Keras reports once per execution, so count rows up to this batch
+        rows_done = (batch + 1) * self.batch_size if self.batch_size else 0
+        if self.samples_per_epoch:
+            rows_done = min(rows_done, self.samples_per_epoch)
+        rows, self._batch_rows = rows_done - self._batch_rows, rows_done
+        loss = (logs or {}).get('loss', np.nan)
+        self.buffers['batch'].append((self._epoch + 1, batch, loss, seconds,
+                                      rows / seconds if rows and seconds > 0 else np.nan))
+
+    def on_epoch_end(self, epoch, logs=None):
+        logs = logs or {}
+        seconds = time.perf_counter() - self._epoch_start
+        samples_per_second = self.samples_per_epoch / seconds if self.samples_per_epoch and seconds > 0 else np.nan
+        self.buffers['epoch'].append((epoch + 1, logs.get('loss', np.nan), logs.get('val_loss', np.nan),
+                                      seconds, samples_per_second, time.time()))
+
+    def on_train_end(self, logs=None):
+        if self._flusher is not None:
+            self._stop.set()
+            self._flusher.join()
+            self._flusher = None
+        lost = sum(buffer.lost for buffer in self.buffers.values())
+        if lost:
+            logger.warning(f"⚠️ {lost} metric rows were overwritten before they could be flushed; "
+                           "increase the ring buffer capacity or flush more often.")
+        logger.info(f"ℹ️ Recorded metrics of {self.buffers['epoch'].written} epochs"
+                    + (f" in {self.directory}" if self.directory is not None else "") + ".")
+
+    def _flush_loop(self):
+        while not self._stop.wait(self.flush_interval):
+            self.flush()
+        self.flush()
+
+    def flush(self):
+        """Append the rows recorded since the last flush to the column files."""
+        for kind, buffer in self.buffers.items():
+            rows = buffer.take_unflushed()
+            if len(rows) == 0:
+                continue
+            try:
+                for name in rows.dtype.names:
+                    with open(os.path.join(self.directory, f"{kind}.{name}"), 'ab') as f:
+                        np.ascontiguousarray(rows[name]).tofile(f)
+            except Exception as e:
+                logger.critical(f"⛔ Critical error when flushing {kind} metrics to {self.directory}: {e}")
+                raise e
+
+    def query(self, kind='epoch', last=None, columns=None):
+        """The last 'last' rows of 'kind' still held in memory (all of them by default), as a DataFrame."""
+        frame = pd.DataFrame(self.buffers[kind].tail(last))
+        return frame[list(columns)] if columns is not None else frame
+
+    def latest(self):
+        """The most recent epoch row as a dict, or None before the first epoch ended."""
+        rows = self.buffers['epoch'].tail(1)
+        return {name: rows[name][0].item() for name in rows.dtype.names} if len(rows) else None
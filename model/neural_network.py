@@ -1,63 +1,393 @@
 # neural_network.py
 # This file defines the neural network model and the training process.
 
+import platform
+from datetime import datetime
+import numpy as np
+import tensorflow as tf
 from tensorflow import keras
 from sklearn.metrics import r2_score, mean_squared_error
-from keras.callbacks import EarlyStopping, LambdaCallback
+from keras.callbacks import Callback, EarlyStopping
 from app_logging import logger
+from model.metrics import MetricsRecorder
+from model.input_pipeline import open_array, make_train_val_datasets, make_shard_dataset, DEFAULT_SHUFFLE_BUFFER
+from model.artifact import ModelArtifact
+
+# With predict(fast_path=True), batches up to this size run the cached forward function
+FAST_PATH_MAX_ROWS = 4096
+
+# Throughput mode defaults: large batches, several steps per XLA execution, short warmup
+THROUGHPUT_BATCH_SIZE = 4096
+THROUGHPUT_STEPS_PER_EXECUTION = 16
+THROUGHPUT_WARMUP_EPOCHS = 5
+LR_SCALING_RULES = ('linear', 'sqrt')
+MIXED_PRECISION_POLICIES = ('mixed_float16', 'mixed_bfloat16')
+
+
+def scale_learning_rate(learning_rate, base_batch_size, batch_size, rule='sqrt'):
+    """Scale a learning rate tuned at 'base_batch_size' to 'batch_size' (linear or square-root rule)."""
+    if rule not in LR_SCALING_RULES:
+        raise ValueError("Unknown learning-rate scaling rule '{}', expected one of {}".format(rule, LR_SCALING_RULES))
+    ratio = batch_size / base_batch_size
+    return learning_rate * (ratio if rule == 'linear' else np.sqrt(ratio))
+
+
+class LearningRateWarmup(Callback):
+    """Raise the learning rate linearly to 'target_learning_rate' over the first 'warmup_epochs' epochs."""
+
+    def __init__(self, target_learning_rate, warmup_epochs):
+        super().__init__()
+        self.target_learning_rate = target_learning_rate
+        self.warmup_epochs = warmup_epochs
+
+    def on_epoch_begin(self, epoch, logs=None):
+        fraction = min(1.0, (epoch + 1) / self.warmup_epochs) if self.warmup_epochs else 1.0
+        self.model.optimizer.learning_rate.assign(self.target_learning_rate * fraction)
+
 
 class NeuralNetworkModel:
-    def __init__(self, input_shape, dense1_units=64, dense2_units=32, learning_rate=0.001):
+    def __init__(self, input_shape, dense1_units=64, dense2_units=32, learning_rate=0.001, compile=True,
+                 throughput_mode=False, mixed_precision=None, throughput_batch_size=THROUGHPUT_BATCH_SIZE,
+                 steps_per_execution=THROUGHPUT_STEPS_PER_EXECUTION, warmup_epochs=THROUGHPUT_WARMUP_EPOCHS,
+                 lr_scaling='sqrt'):
+        """
+        With throughput_mode=True the model is compiled with XLA (jit_compile) and several
+        steps per execution, and train() uses at least 'throughput_batch_size' rows per batch
+        with the learning rate scaled by 'lr_scaling' and warmed up over 'warmup_epochs'.
+        'mixed_precision' ('mixed_float16' or 'mixed_bfloat16') computes the hidden layers in
+        half precision; the output layer and the weights stay float32.
+        """
         logger.info(f"ℹ️ Initializing NeuralNetworkModel with input shape {input_shape}, "
                     f"dense1_units={dense1_units}, dense2_units={dense2_units}, "
-                    f"learning_rate={learning_rate}")
+                    f"learning_rate={learning_rate}, throughput_mode={throughput_mode}, "
+                    f"mixed_precision={mixed_precision}")
+        if mixed_precision is not None and mixed_precision not in MIXED_PRECISION_POLICIES:
+            raise ValueError("Unknown mixed precision policy '{}', expected one of {}".format(
+                mixed_precision, MIXED_PRECISION_POLICIES))
+        self.input_shape = tuple(input_shape)
+        self.dense1_units = dense1_units
+        self.dense2_units = dense2_units
+        self.learning_rate = learning_rate
+        self.throughput_mode = throughput_mode
+        self.mixed_precision = mixed_precision
+        self.throughput_batch_size = throughput_batch_size
+        self.steps_per_execution = steps_per_execution
+        self.warmup_epochs = warmup_epochs
+        self.lr_scaling = lr_scaling
+
+        hidden_dtype = {'dtype': mixed_precision} if mixed_precision else {}
         self.model = keras.Sequential([
-            keras.layers.Dense(dense1_units, activation='relu', input_shape=input_shape),
-            keras.layers.Dense(dense2_units, activation='relu'),
-            keras.layers.Dense(1)  # One output: reliability
+            keras.layers.Dense(dense1_units, activation='relu', input_shape=input_shape, **hidden_dtype),
+            keras.layers.Dense(dense2_units, activation='relu', **hidden_dtype),
+            keras.layers.Dense(1, dtype='float32')  # One output: reliability
         ])
 
-        optimizer = keras.optimizers.Adam(learning_rate=learning_rate)
-        self.model.compile(loss='mean_squared_error', optimizer=optimizer)
-        logger.debug("🐛 Model compiled successfully with Adam optimizer and MSE loss.")
+        # Set by train_on_dataset / load_model so a saved model can be used on raw inputs
+        self.scaler = None
+        self.metrics = None
+        self.feature_spec = None
+        self.metadata = {}
 
-    def train(self, X_train, y_train, validation_split=0.07, epochs=1000, batch_size=77, min_delta=0.00001, patience=100):
-        logger.info("ℹ️ Training started with the following parameters: "
-                    f"validation_split={validation_split}, epochs={epochs}, "
-                    f"batch_size={batch_size}, min_delta={min_delta}, patience={patience}")
+        # Traced forward pass for predict_fast, built on first use
+        self._forward = None
 
-        # Log epoch beginning and end
-        epoch_callback = LambdaCallback(
-            on_epoch_begin=lambda epoch, logs: logger.debug(f"🐛 Starting epoch {epoch+1}"),
-            on_epoch_end=lambda epoch, logs: logger.debug(f"🐛 Finished epoch {epoch+1}")
-        )
+        self.compiled = False
+        if compile:
+            self._compile()
+
+    def _compile(self):
+        optimizer = keras.optimizers.Adam(learning_rate=self.learning_rate)
+        if self.mixed_precision == 'mixed_float16':
+            # float16 gradients underflow without loss scaling
+            optimizer = keras.mixed_precision.LossScaleOptimizer(optimizer)
+        if self.throughput_mode:
+            self.model.compile(loss='mean_squared_error', optimizer=optimizer, jit_compile=True,
+                               steps_per_execution=self.steps_per_execution)
+        else:
+            self.model.compile(loss='mean_squared_error', optimizer=optimizer)
+        self.compiled = True
+        logger.debug("🐛 Model compiled successfully with Adam optimizer and MSE loss.")
+
+    def _make_callbacks(self, min_delta, patience, monitor='val_loss', samples_per_epoch=None, batch_size=None,
+                        metrics_dir=None, record_batch_metrics=False):
+        # Epoch metrics go to an in-memory ring buffer (flushed in the background to 'metrics_dir')
+        self.metrics = MetricsRecorder(metrics_dir, record_batch_metrics, samples_per_epoch, batch_size)
 
         early_stopping = EarlyStopping(
+            monitor=monitor,
             min_delta=min_delta,
             patience=patience,
             restore_best_weights=True
         )
+        return [early_stopping, self.metrics]
+
+    def train(self, X_train, y_train, validation_split=0.07, epochs=1000, batch_size=77, min_delta=0.00001, patience=100,
+              use_input_pipeline=False, shuffle_buffer=DEFAULT_SHUFFLE_BUFFER, num_parallel_calls=None,
+              sample_weight=None, callbacks=None, verbose='auto', metrics_dir=None, record_batch_metrics=False,
+              row_indices=None):
+        """
+        Train the model. With use_input_pipeline=True, X_train/y_train may be memory-mapped
+        arrays or .npy paths: batches are streamed through a prefetching tf.data pipeline and
+        the validation split is taken as an index range instead of a copy; 'row_indices'
+        restricts it to those rows (the validation rows are their last fraction). 'sample_weight'
+        holds per-row weights, e.g. the group sizes of aggregated operating points.
+        Extra Keras 'callbacks' (e.g. job progress reporting) run after the default ones.
+        Loss, validation loss, step time and samples/s are kept in self.metrics (a
+        MetricsRecorder), flushed to 'metrics_dir' if given; per-batch rows only with
+        record_batch_metrics=True.
+        """
+        logger.info("ℹ️ Training started with the following parameters: "
+                    f"validation_split={validation_split}, epochs={epochs}, "
+                    f"batch_size={batch_size}, min_delta={min_delta}, patience={patience}, "
+                    f"use_input_pipeline={use_input_pipeline}")
+
+        if row_indices is not None and not use_input_pipeline:
+            raise ValueError("row_indices needs use_input_pipeline=True")
+        if not self.compiled:
+            self._compile()
+        warmup = []
+        if self.throughput_mode:
+            base_batch_size = batch_size
+            batch_size = max(batch_size, self.throughput_batch_size)
+            learning_rate = scale_learning_rate(self.learning_rate, base_batch_size, batch_size, self.lr_scaling)
+            warmup = [LearningRateWarmup(learning_rate, self.warmup_epochs)]
+            logger.info(f"ℹ️ Throughput mode: batch_size={batch_size}, learning_rate={learning_rate:.6g} "
+                        f"(warmup over {self.warmup_epochs} epochs), steps_per_execution={self.steps_per_execution}")
+        if use_input_pipeline:
+            # .npy paths are opened memory-mapped here so the row counts below are of the arrays
+            X_train, y_train = open_array(X_train), open_array(y_train)
+            sample_weight = open_array(sample_weight) if sample_weight is not None else None
+        n_rows = len(y_train) if row_indices is None else len(row_indices)
+        samples_per_epoch = int(n_rows * (1 - validation_split))
+        callbacks = warmup + self._make_callbacks(min_delta, patience, samples_per_epoch=samples_per_epoch,
+                                                  batch_size=batch_size, metrics_dir=metrics_dir,
+                                                  record_batch_metrics=record_batch_metrics) + list(callbacks or [])
+
+        if use_input_pipeline:
+            train_data, validation_data = make_train_val_datasets(
+                X_train, y_train, validation_split, batch_size,
+                shuffle_buffer=shuffle_buffer, num_parallel_calls=num_parallel_calls, sample_weight=sample_weight,
+                indices=row_indices
+            )
+            history = self.model.fit(
+                train_data,
+                validation_data=validation_data,
+                epochs=epochs,
+                callbacks=callbacks,
+                verbose=verbose
+            )
+        else:
+            history = self.model.fit(
+                X_train, y_train,
+                sample_weight=sample_weight,
+                validation_split=validation_split,
+                epochs=epochs,
+                batch_size=batch_size,
+                callbacks=callbacks,
+                verbose=verbose
+            )
+        self._record_training(history, validation_split=validation_split, batch_size=batch_size,
+                              n_train=n_rows, weighted=sample_weight is not None,
+                              throughput_mode=self.throughput_mode, mixed_precision=self.mixed_precision,
+                              metrics_dir=metrics_dir)
+        logger.info("ℹ️ Training completed.")
+        return history
+
+    def _record_training(self, history, **params):
+        losses = history.history
+        self.metadata['training'] = dict(
+            params,
+            epochs_run=len(losses.get('loss', [])),
+            final_loss=float(losses['loss'][-1]) if losses.get('loss') else None,
+            best_val_loss=float(min(losses['val_loss'])) if losses.get('val_loss') else None,
+            trained_at=datetime.now().isoformat(timespec='seconds'),
+        )
+
+    def train_on_dataset(self, dataset, **train_kwargs):
+        """Train on the training rows of a CompactDataset (a view, no copy is made), with its weights if any."""
+        self.scaler = dataset.scaler
+        self.feature_spec = dataset.feature_spec
+        return self.train(dataset.X_train, dataset.y_train, sample_weight=dataset.w_train, **train_kwargs)
+
+    def evaluate_on_dataset(self, dataset):
+        """Evaluate on the test rows of a CompactDataset."""
+        return self.evaluate(dataset.X_test, dataset.y_test)
+
+    def train_on_shards(self, sharded, filters=None, validation_split=0.07, epochs=1000, batch_size=77,
+                        min_delta=0.00001, patience=100, callbacks=None):
+        """
+        Train on the 'train' partition of a ShardedDataset, optionally restricted by range
+        'filters' (e.g. {'T': (80, None)}). Only a few shards are held in memory at a time;
+        batches interleave rows of several shards (see make_shard_dataset), and a seeded
+        'validation_split' of the matching rows, drawn row by row, is used for validation.
+        """
+        if not self.compiled:
+            self._compile()
+        self.scaler = sharded.scaler
+        self.feature_spec = sharded.feature_spec
+        logger.info(f"ℹ️ Training on shards of {sharded.path} with filters={filters}, "
+                    f"validation_split={validation_split}, epochs={epochs}, batch_size={batch_size}")
+        # Shards are sorted on a column when written, so whole shards would be a biased validation set
+        n_train, n_val = sharded.count_split_rows('train', filters, validation_split)
+        train_data = make_shard_dataset(sharded, 'train', filters, batch_size, shuffle=True, subset='train',
+                                        validation_split=validation_split)
+        validation_data = None
+        if n_val > 0:
+            validation_data = make_shard_dataset(sharded, 'train', filters, batch_size, shuffle=False,
+                                                 subset='validation', validation_split=validation_split)
 
         history = self.model.fit(
-            X_train, y_train,
-            validation_split=validation_split,
+            train_data,
+            validation_data=validation_data,
             epochs=epochs,
-            batch_size=batch_size,
-            callbacks=[early_stopping, epoch_callback]
+            callbacks=self._make_callbacks(min_delta, patience, 'val_loss' if validation_data is not None else 'loss',
+                                           samples_per_epoch=n_train, batch_size=batch_size)
+            + list(callbacks or [])
         )
+        self._record_training(history, validation_split=validation_split, batch_size=batch_size,
+                              n_train=n_train, n_validation=n_val, filters=filters)
         logger.info("ℹ️ Training completed.")
         return history
 
-    def predict(self, X_test):
+    def evaluate_on_shards(self, sharded, filters=None, partition='test'):
+        """Compute R^2 and MSE over the matching shards of a ShardedDataset, one shard at a time."""
+        logger.info(f"ℹ️ Evaluating the model on {partition} shards with filters={filters}.")
+        # Per-shard (count, mean, M2) merged with Chan's formula: the one-pass sum of squares
+        # cancels when the targets all sit close to 1
+        n = 0
+        mean = m2 = sse = 0.0
+        for X, y in sharded.iter_shards(partition, filters):
+            y = y.astype(np.float64)
+            sse += np.square(y - self.predict(X)).sum()
+            shard_mean = y.mean()
+            shard_m2 = np.square(y - shard_mean).sum()
+            total = n + len(y)
+            delta = shard_mean - mean
+            m2 += shard_m2 + delta ** 2 * n * len(y) / total
+            mean += delta * len(y) / total
+            n = total
+        if n == 0:
+            raise ValueError("No rows match the filters {}".format(filters))
+        sst = m2
+        r2 = float(1.0 - sse / sst) if sst > 0 else 0.0
+        mse = float(sse / n)
+        self.metadata['evaluation'] = {'r2': r2, 'mse': mse, 'n_test': n}
+        logger.info(f"ℹ️ Evaluation results - R^2: {r2:.4f}, MSE: {mse:.4f}")
+        return r2, mse
+
+    def _forward_function(self):
+        if self._forward is None:
+            model = self.model
+            # One trace for any batch size; reads the live variables, so retraining needs no rebuild
+            self._forward = tf.function(lambda x: model(x, training=False),
+                                        input_signature=[tf.TensorSpec([None, self.input_shape[0]], tf.float32)])
+        return self._forward
+
+    def predict_fast(self, X):
+        """
+        Low-latency prediction for single samples and small batches. Skips the per-call
+        overhead of keras.Model.predict (dataset, callbacks, progress bar) by calling a
+        cached traced forward pass. 'X' is one scaled sample (1-D) or a 2-D batch.
+        """
+        X = np.asarray(X, dtype=np.float32)
+        if X.ndim == 1:
+            X = X[np.newaxis, :]
+        return self._forward_function()(X).numpy().ravel()
+
+    def predict(self, X_test, verbose='auto', fast_path=False):
+        """
+        Predict reliability for scaled inputs with keras.Model.predict. With fast_path=True,
+        batches of up to FAST_PATH_MAX_ROWS rows go through predict_fast instead; that path
+        has no progress bar, so 'verbose' only applies to larger batches.
+        """
         logger.debug("🐛 Making predictions on the test set.")
-        predictions = self.model.predict(X_test).flatten()
+        if fast_path and len(X_test) <= FAST_PATH_MAX_ROWS:
+            return self.predict_fast(X_test)
+        predictions = self.model.predict(X_test, verbose=verbose).flatten()
         logger.debug("🐛 Predictions completed.")
         return predictions
 
-    def evaluate(self, X_test, y_test):
+    def evaluate(self, X_test, y_test, verbose='auto'):
         logger.info("ℹ️ Evaluating the model.")
-        predicted_reliability = self.predict(X_test)
+        return self.evaluate_predictions(y_test, self.predict(X_test, verbose))
+
+    def evaluate_predictions(self, y_test, predicted_reliability):
+        """R^2 and MSE of predictions already made on the test rows, recorded like evaluate()."""
         r2 = r2_score(y_test, predicted_reliability)
         mse = mean_squared_error(y_test, predicted_reliability)
+        self.metadata['evaluation'] = {'r2': float(r2), 'mse': float(mse), 'n_test': len(y_test)}
         logger.info(f"ℹ️ Evaluation results - R^2: {r2:.4f}, MSE: {mse:.4f}")
-        return r2, mse
\ No newline at end of file
+        return r2, mse
+
+    def rescale_inputs(self, new_scaler):
+        """
+        Switch the model to 'new_scaler' without changing its predictions on raw inputs:
+        the first Dense layer absorbs the change of mean and scale, i.e. with
+        x_old = (x_new * s1 + m1 - m0) / s0 the kernel rows are multiplied by s1 / s0 and
+        the bias gets ((m1 - m0) / s0) @ kernel.
+        """
+        old_mean, old_scale = self.scaler.mean_, self.scaler.scale_
+        first = self.model.layers[0]
+        kernel, bias = first.get_weights()
+        kernel64 = kernel.astype(np.float64)
+        new_bias = bias + ((new_scaler.mean_ - old_mean) / old_scale) @ kernel64
+        new_kernel = kernel64 * (new_scaler.scale_ / old_scale)[:, np.newaxis]
+        first.set_weights([new_kernel.astype(kernel.dtype), new_bias.astype(bias.dtype)])
+        self.scaler = new_scaler
+        logger.debug("🐛 First layer rescaled to the updated scaler statistics.")
+
+    def architecture(self):
+        """Describe the layer stack as stored in model artifacts and used by the NumPy runtime."""
+        return {
+            'input_dim': int(self.input_shape[0]),
+            'dense1_units': self.dense1_units,
+            'dense2_units': self.dense2_units,
+            'learning_rate': self.learning_rate,
+            'layers': [{'units': layer.units, 'activation': layer.get_config()['activation']}
+                       for layer in self.model.layers],
+        }
+
+    def to_artifact(self):
+        """Bundle weights, architecture, scaler, feature spec and metadata into a ModelArtifact."""
+        if self.scaler is None or self.feature_spec is None:
+            raise ValueError("The model has no scaler/feature spec; train it with train_on_dataset before saving.")
+        architecture = self.architecture()
+        metadata = dict(self.metadata, libraries={'numpy': np.__version__, 'tensorflow': tf.__version__},
+                        python=platform.python_version())
+        return ModelArtifact(architecture, self.model.get_weights(), self.scaler, self.feature_spec, metadata)
+
+    def save_model(self, file_path):
+        """Save the model as a single versioned artifact file (see model/artifact.py)."""
+        logger.info(f"ℹ️ Saving model to {file_path}")
+        self.to_artifact().save(file_path)
+
+    @classmethod
+    def from_artifact(cls, artifact, compile=False):
+        architecture = artifact.architecture
+        model = cls(input_shape=(architecture['input_dim'],), dense1_units=architecture['dense1_units'],
+                    dense2_units=architecture['dense2_units'], learning_rate=architecture['learning_rate'],
+                    compile=compile)
+        model.model.set_weights(artifact.weights)
+        model.scaler = artifact.scaler
+        model.feature_spec = artifact.feature_spec
+        model.metadata = dict(artifact.metadata)
+        return model
+
+    @classmethod
+    def load_model(cls, file_path, compile=False):
+        """
+        Load a model saved with save_model. It is not compiled (no optimizer is built)
+        unless compile=True; train() compiles it on first use.
+        """
+        return cls.from_artifact(ModelArtifact.load(file_path), compile)
+
+    def transform(self, columns):
+        """Evaluate the stored feature spec on raw columns and scale them like the training data."""
+        if self.scaler is None or self.feature_spec is None:
+            raise ValueError("The model has no scaler/feature spec to transform raw inputs with.")
+        return self.scaler.transform(self.feature_spec.evaluate(columns)).astype(np.float32)
+
+    def predict_raw(self, columns, verbose='auto', fast_path=False):
+        """Predict reliability from raw V/f/T/N columns using the stored feature spec and scaler."""
+        return self.predict(self.transform(columns), verbose, fast_path)
+
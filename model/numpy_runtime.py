@@ -0,0 +1,142 @@
+# numpy_runtime.py
+# This file is a TensorFlow-free inference runtime for model artifacts (see artifact.py).
+# It evaluates the Dense stack with plain NumPy matrix products and applies the stored scaler
+# and feature spec, so processes that only score operating points start in a fraction of a
+# second and never load TensorFlow. Results match NeuralNetworkModel.predict to float32 tolerance.
+
+import numpy as np
+from app_logging import logger
+from data.features import FeatureSpec
+from model.artifact import read_artifact
+
+
+def _relu(x):
+    return np.maximum(x, 0.0, out=x)
+
+
+def _sigmoid(x):
+    return np.reciprocal(1.0 + np.exp(-x, out=x), out=x)
+
+
+ACTIVATIONS = {
+    'linear': None,
+    'relu': _relu,
+    'sigmoid': _sigmoid,
+    'tanh': np.tanh,
+}
+
+
+class NumpyModel:
+    """Dense-stack forward pass over the weights of a model artifact, in float32."""
+
+    def __init__(self, architecture, weights, scaler_mean, scaler_scale, feature_spec, metadata=None):
+        layers = architecture['layers']
+        if len(weights) != 2 * len(layers):
+            raise ValueError(f"Expected {2 * len(layers)} weight arrays for {len(layers)} layers, got {len(weights)}")
+        unknown = [layer['activation'] for layer in layers if layer['activation'] not in ACTIVATIONS]
+        if unknown:
+            raise ValueError(f"Unsupported activations {unknown}, expected one of {list(ACTIVATIONS)}")
+
+        self.layers = [(np.ascontiguousarray(weights[2 * i], dtype=np.float32),
+                        np.asarray(weights[2 * i + 1], dtype=np.float32),
+                        ACTIVATIONS[layer['activation']])
+                       for i, layer in enumerate(layers)]
+        self.scaler_mean = np.asarray(scaler_mean, dtype=np.float64)
+        self.scaler_scale = np.asarray(scaler_scale, dtype=np.float64)
+        self.feature_spec = feature_spec
+        self.metadata = metadata or {}
+
+    @classmethod
+    def load(cls, file_path):
+        """Load a model artifact written by NeuralNetworkModel.save_model."""
+        header, weights = read_artifact(file_path)
+        logger.info(f"ℹ️ NumPy runtime loaded model artifact {file_path}")
+        return cls(header['architecture'], weights, header['scaler']['mean'], header['scaler']['scale'],
+                   FeatureSpec.from_dict(header['feature_spec']), header['metadata'])
+
+    @property
+    def feature_names(self):
+        return self.feature_spec.names
+
+    def predict(self, X):
+        """Predict reliability for scaled features: one sample (1-D) or a 2-D batch."""
+        X = np.asarray(X, dtype=np.float32)
+        if X.ndim == 1:
+            X = X[np.newaxis, :]
+        for kernel, bias, activation in self.layers:
+            X = X @ kernel
+            X += bias
+            if activation is not None:
+                X = activation(X)
+        return X.ravel()
+
+    def transform(self, columns):
+        """Evaluate the feature spec on raw columns and scale them like the training data."""
+        features = self.feature_spec.evaluate(columns)
+        features -= self.scaler_mean
+        features /= self.scaler_scale
+        return features.astype(np.float32)
+
+    def predict_raw(self, columns):
+        """Predict reliability from raw V/f/T/N columns (DataFrame or mapping of arrays)."""
+        return self.predict(self.transform(columns))
+
+
+class NumpyEnsemble:
+    """
+    Average of several models with the same architecture (e.g. the k fold models of a
+    cross-validation). The member weights are stacked along a leading axis, so one
+    batched matmul per layer evaluates every member at once.
+    """
+
+    def __init__(self, architecture, member_weights, scaler_mean, scaler_scale, feature_spec, metadata=None):
+        members = [NumpyModel(architecture, weights, scaler_mean, scaler_scale, feature_spec)
+                   for weights in member_weights]
+        if not members:
+            raise ValueError("An ensemble needs at least one member")
+        # (members, inputs, units) kernels and (members, 1, units) biases per layer
+        self.layers = [(np.stack([member.layers[i][0] for member in members]),
+                        np.stack([member.layers[i][1] for member in members])[:, np.newaxis, :],
+                        members[0].layers[i][2])
+                       for i in range(len(members[0].layers))]
+        self.architecture = architecture
+        self.scaler_mean = members[0].scaler_mean
+        self.scaler_scale = members[0].scaler_scale
+        self.feature_spec = feature_spec
+        self.metadata = metadata or {}
+
+    @property
+    def n_members(self):
+        return self.layers[0][0].shape[0]
+
+    @property
+    def feature_names(self):
+        return self.feature_spec.names
+
+    def predict_members(self, X):
+        """Return the (n_members, n_rows) predictions of every member for scaled features."""
+        X = np.asarray(X, dtype=np.float32)
+        if X.ndim == 1:
+            X = X[np.newaxis, :]
+        for kernel, bias, activation in self.layers:
+            # (n_rows, inputs) broadcasts against (members, inputs, units) on the first layer
+            X = np.matmul(X, kernel)
+            X += bias
+            if activation is not None:
+                X = activation(X)
+        return X[:, :, 0]
+
+    def predict(self, X, return_std=False):
+        """Averaged prediction for scaled features; with return_std=True also the spread between members."""
+        predictions = self.predict_members(X)
+        mean = predictions.mean(axis=0)
+        return (mean, predictions.std(axis=0)) if return_std else mean
+
+    def transform(self, columns):
+        features = self.feature_spec.evaluate(columns)
+        features -= self.scaler_mean
+        features /= self.scaler_scale
+        return features.astype(np.float32)
+
+    def predict_raw(self, columns, return_std=False):
+        return self.predict(self.transform(columns), return_std)
@@ -0,0 +1,171 @@
+# operating_point.py
+# This file picks operating points: the best performing V/f/T/N configuration whose predicted
+# reliability stays above a floor. Millions of random candidates inside the bounds are scored
+# in large vectorized batches (see scoring.py), then the search is refined in shrinking boxes
+# around the best feasible candidates. The result reports how many candidates were evaluated
+# per second.
+
+import time
+import numpy as np
+import pandas as pd
+from app_logging import logger
+from model.scoring import DEFAULT_BATCH_ROWS, score_raw
+
+OPERATING_COLUMNS = ('V', 'f', 'T', 'N')
+
+# Ranges of our measurement campaigns: (low, high) is a continuous range, a list the allowed values
+DEFAULT_BOUNDS = {
+    'V': (0.82, 1.26),
+    'f': (1.3e7, 1.96e9),
+    'T': (-35.0, 126.0),
+    'N': [3, 5, 17, 65, 333],
+}
+
+DEFAULT_CANDIDATES = 1_000_000
+DEFAULT_REFINE_CANDIDATES = 200_000
+
+
+def sample_candidates(bounds, n, rng):
+    """
+    Draw 'n' candidates from 'bounds' (column -> (low, high) range, list of allowed values
+    or a single fixed value) as a dict of arrays.
+    """
+    columns = {}
+    for name, values in bounds.items():
+        if isinstance(values, tuple):
+            low, high = values
+            columns[name] = rng.uniform(low, high, n)
+        elif isinstance(values, (list, np.ndarray)):
+            columns[name] = np.asarray(values, dtype=np.float64)[rng.integers(len(values), size=n)]
+        else:
+            columns[name] = np.full(n, float(values))
+    return columns
+
+
+def perturb_candidates(parents, bounds, n, radius, rng):
+    """
+    Draw 'n' candidates around randomly chosen 'parents': continuous columns move by up to
+    'radius' times their range (clipped to the bounds), discrete and fixed columns keep the
+    parent's value.
+    """
+    picks = rng.integers(len(next(iter(parents.values()))), size=n)
+    columns = {}
+    for name, values in bounds.items():
+        column = parents[name][picks]
+        if isinstance(values, tuple):
+            low, high = values
+            step = radius * (high - low)
+            column = np.clip(column + rng.uniform(-step, step, n), low, high)
+        columns[name] = column
+    return columns
+
+
+def _objective_values(objective, columns):
+    return np.asarray(columns[objective] if isinstance(objective, str) else objective(columns), dtype=np.float64)
+
+
+class OperatingPointResult:
+    """Best feasible operating point, the top feasible candidates and the search statistics."""
+
+    def __init__(self, best, top, reliability_floor, n_evaluated, n_feasible, seconds):
+        self.best = best
+        self.top = top
+        self.reliability_floor = reliability_floor
+        self.n_evaluated = n_evaluated
+        self.n_feasible = n_feasible
+        self.seconds = seconds
+
+    @property
+    def candidates_per_second(self):
+        return self.n_evaluated / self.seconds if self.seconds > 0 else float('inf')
+
+    def summary_text(self):
+        lines = [f"Evaluated {self.n_evaluated:,} candidates in {self.seconds:.2f} s "
+                 f"({self.candidates_per_second:,.0f} candidates/s), {self.n_feasible:,} met "
+                 f"reliability >= {self.reliability_floor}."]
+        if self.best is None:
+            lines.append("No candidate met the reliability floor.")
+        else:
+            lines.append("Best: " + ", ".join(f"{name}={value:.6g}" for name, value in self.best.items()))
+        return '\n'.join(lines)
+
+
+def optimize_operating_point(model, reliability_floor, bounds=None, objective='f', constraints=(),
+                             n_candidates=DEFAULT_CANDIDATES, refine_rounds=3,
+                             refine_candidates=DEFAULT_REFINE_CANDIDATES, shrink=0.25, top_k=32,
+                             batch_rows=DEFAULT_BATCH_ROWS, seed=0, progress=None):
+    """
+    Maximize 'objective' over the operating space subject to predicted reliability >= 'reliability_floor'.
+
+    'model' is a trained NeuralNetworkModel (with scaler and feature spec) or a NumpyModel /
+    NumpyEnsemble. 'bounds' overrides DEFAULT_BOUNDS per column: a (low, high) range, a list
+    of allowed values or a fixed value (e.g. the ambient temperature). 'objective' is a
+    column name (default: frequency) or a function of the candidate columns returning the
+    performance to maximize; 'constraints' are functions returning a boolean mask of allowed
+    candidates (e.g. a power budget on V**2 * f), applied before the model is called.
+
+    After the global search, 'refine_rounds' rounds sample 'refine_candidates' points around
+    the 'top_k' best feasible candidates in boxes shrinking by 'shrink' per round.
+    'progress(evaluated, total)' is called after every batch.
+    """
+    bounds = dict(DEFAULT_BOUNDS, **(bounds or {}))
+    missing = [name for name in model.feature_spec.base if name not in bounds]
+    if missing:
+        raise ValueError(f"No bounds for model input columns {missing}")
+    logger.info(f"ℹ️ Optimizing the operating point for reliability >= {reliability_floor} over {bounds}.")
+
+    rng = np.random.default_rng(seed)
+    total = n_candidates + refine_rounds * refine_candidates
+    top = None
+    n_generated = n_evaluated = n_feasible = 0
+    start = time.perf_counter()
+
+    def evaluate(columns):
+        nonlocal top, n_generated, n_evaluated, n_feasible
+        mask = np.ones(len(next(iter(columns.values()))), dtype=bool)
+        n_generated += len(mask)
+        for constraint in constraints:
+            mask &= np.asarray(constraint(columns), dtype=bool)
+        columns = {name: values[mask] for name, values in columns.items()}
+        reliability = score_raw(model, columns, batch_rows)
+        n_evaluated += len(reliability)
+        feasible = reliability >= reliability_floor
+        n_feasible += int(feasible.sum())
+        if feasible.any():
+            columns = {name: values[feasible] for name, values in columns.items()}
+            columns['reliability'] = reliability[feasible]
+            columns['objective'] = _objective_values(objective, columns)
+            if top is not None:
+                columns = {name: np.concatenate([top[name], columns[name]]) for name in columns}
+            # Best objective first, ties broken by higher reliability; refinement clipped to the
+            # bounds produces duplicates, which would crowd out distinct candidates
+            order = np.lexsort((-columns['reliability'], -columns['objective']))[:8 * top_k]
+            points = np.column_stack([columns[name][order] for name in bounds])
+            _, first = np.unique(points, axis=0, return_index=True)
+            keep = order[np.sort(first)][:top_k]
+            top = {name: values[keep] for name, values in columns.items()}
+        if progress is not None:
+            progress(n_generated, total)
+
+    try:
+        for batch_start in range(0, n_candidates, batch_rows):
+            evaluate(sample_candidates(bounds, min(batch_rows, n_candidates - batch_start), rng))
+        radius = 1.0
+        for _ in range(refine_rounds):
+            if top is None:
+                break
+            radius *= shrink
+            for batch_start in range(0, refine_candidates, batch_rows):
+                evaluate(perturb_candidates(top, bounds, min(batch_rows, refine_candidates - batch_start), radius, rng))
+    except Exception as e:
+        logger.critical(f"⛔ Critical error during operating point optimization: {e}")
+        raise e
+    seconds = time.perf_counter() - start
+
+    table = pd.DataFrame(top) if top is not None else pd.DataFrame(columns=list(bounds) + ['reliability', 'objective'])
+    best = {name: float(value) for name, value in table.iloc[0].items()} if len(table) else None
+    result = OperatingPointResult(best, table, reliability_floor, n_evaluated, n_feasible, seconds)
+    if best is None:
+        logger.warning(f"⚠️ No operating point reaches reliability {reliability_floor}.")
+    logger.info("ℹ️ " + result.summary_text())
+    return result
@@ -0,0 +1,59 @@
+# pareto.py
+# This file extracts the performance/reliability Pareto frontier of the operating space.
+# Candidates (measured rows or a generated V/f/T/N grid) are scored with the model in large
+# batches; the non-dominated points (no other point is both faster and more reliable) are
+# found with an O(n log n) skyline sweep: sort by performance, keep the points whose
+# reliability beats every faster point.
+
+import numpy as np
+import pandas as pd
+from app_logging import logger
+from model.lookup_grid import make_axes
+from model.scoring import DEFAULT_BATCH_ROWS, score_raw
+
+
+def pareto_indices(performance, reliability):
+    """
+    Indices of the non-dominated points when maximizing both objectives, ordered by
+    decreasing performance. Of several identical points only the first is returned.
+    """
+    performance = np.asarray(performance, dtype=np.float64)
+    reliability = np.asarray(reliability, dtype=np.float64)
+    # Fastest first; among equally fast points the most reliable first
+    order = np.lexsort((-reliability, -performance))
+    sorted_reliability = reliability[order]
+    best_so_far = np.maximum.accumulate(sorted_reliability)
+    previous_best = np.concatenate(([-np.inf], best_so_far[:-1]))
+    return order[sorted_reliability > previous_best]
+
+
+def grid_candidates(columns, axes=None):
+    """Every point of the grid over 'columns' (see lookup_grid.make_axes) as a dict of flat arrays."""
+    axes = make_axes(columns, axes)
+    mesh = np.meshgrid(*(axes[name] for name in columns), indexing='ij')
+    return {name: values.ravel() for name, values in zip(columns, mesh)}
+
+
+def pareto_frontier(model, candidates=None, performance='f', axes=None, batch_rows=DEFAULT_BATCH_ROWS):
+    """
+    Score 'candidates' (DataFrame or mapping of raw V/f/T/N columns; by default the grid of
+    make_axes(axes)) with 'model' and return (frontier, scored): the non-dominated rows
+    sorted by decreasing performance, and all scored candidates. Both DataFrames hold the
+    raw columns plus 'performance' and 'reliability'. 'performance' is a column name or a
+    function of the candidate columns (e.g. lambda c: c['f'] * c['N']).
+    """
+    try:
+        if candidates is None:
+            candidates = grid_candidates(list(model.feature_spec.base), axes)
+        columns = {name: np.asarray(candidates[name], dtype=np.float64) for name in model.feature_spec.base}
+        scored = pd.DataFrame(columns)
+        scored['performance'] = np.asarray(columns[performance] if isinstance(performance, str)
+                                           else performance(columns), dtype=np.float64)
+        scored['reliability'] = score_raw(model, columns, batch_rows)
+        frontier = scored.iloc[pareto_indices(scored['performance'].to_numpy(),
+                                              scored['reliability'].to_numpy())].reset_index(drop=True)
+    except Exception as e:
+        logger.critical(f"⛔ Critical error while computing the Pareto frontier: {e}")
+        raise e
+    logger.info(f"ℹ️ Pareto frontier: {len(frontier)} non-dominated points out of {len(scored):,} candidates.")
+    return frontier, scored
@@ -0,0 +1,86 @@
+# partial_dependence.py
+# This file computes partial-dependence (PDP) and individual conditional expectation (ICE) curves
+# of a trained model for one raw input or a pair of them. For a grid of G values and B background
+# rows, one (G x B)-row batch is built with the grid values substituted into every background row
+# and scored in a single vectorized model call; the PDP is the mean over the background rows and
+# the ICE curves are the rows themselves. Grids are in original (unscaled) units.
+
+import numpy as np
+from app_logging import logger
+from model.scoring import score_raw
+
+DEFAULT_GRID_POINTS = 20
+DEFAULT_BACKGROUND = 500
+# Percentile range of continuous grids, so a few extreme rows do not stretch the curve
+DEFAULT_PERCENTILES = (0.05, 0.95)
+
+
+def feature_grid(values, grid_points=DEFAULT_GRID_POINTS, percentiles=DEFAULT_PERCENTILES):
+    """Grid of a raw column: its distinct values if there are few (e.g. core counts), else evenly spaced."""
+    unique = np.unique(values)
+    if len(unique) <= grid_points:
+        return unique
+    low, high = np.percentile(values, [100 * percentiles[0], 100 * percentiles[1]])
+    return np.linspace(low, high, grid_points)
+
+
+class PartialDependence:
+    """
+    PDP of one feature (average shape (G,)) or a pair (shape (G1, G2)) over 'grids', with
+    the ICE curves as 'individual' (shape (B, G) or (B, G1, G2)) when requested.
+    """
+
+    def __init__(self, features, grids, average, individual=None):
+        self.features = features
+        self.grids = grids
+        self.average = average
+        self.individual = individual
+
+    @property
+    def is_pair(self):
+        return len(self.features) == 2
+
+
+def partial_dependence(model, background, features, grid_points=DEFAULT_GRID_POINTS, ice=False,
+                       percentiles=DEFAULT_PERCENTILES, max_background=DEFAULT_BACKGROUND, seed=0):
+    """
+    Partial dependence of predicted reliability on 'features' (a raw column name or a pair).
+
+    'model' is a NeuralNetworkModel (with scaler and feature spec), NumpyModel or
+    NumpyEnsemble; 'background' holds raw V/f/T/N rows (DataFrame or mapping), of which
+    at most 'max_background' are sampled. With ice=True the per-row curves are kept too.
+    """
+    features = (features,) if isinstance(features, str) else tuple(features)
+    base = list(model.feature_spec.base)
+    unknown = [name for name in features if name not in base]
+    if unknown or not 1 <= len(features) <= 2:
+        raise ValueError(f"Partial dependence needs one or two of {base}, got {list(features)}")
+
+    columns = {name: np.asarray(background[name], dtype=np.float64) for name in base}
+    n_rows = len(columns[base[0]])
+    if n_rows == 0:
+        raise ValueError("Partial dependence needs at least one background row, got an empty background")
+    if n_rows > max_background:
+        rows = np.random.default_rng(seed).choice(n_rows, max_background, replace=False)
+        columns = {name: values[rows] for name, values in columns.items()}
+        n_rows = max_background
+
+    grids = [feature_grid(columns[name], grid_points, percentiles) for name in features]
+    shape = tuple(len(grid) for grid in grids)
+    points = [mesh.ravel() for mesh in np.meshgrid(*grids, indexing='ij')]
+    n_points = len(points[0])
+
+    # Grid-major layout: rows [g * B, (g + 1) * B) are the background with grid point g substituted
+    batch = {name: np.tile(values, n_points) for name, values in columns.items()}
+    for name, values in zip(features, points):
+        batch[name] = np.repeat(values, n_rows)
+    try:
+        predictions = score_raw(model, batch, batch_rows=n_points * n_rows).reshape(n_points, n_rows)
+    except Exception as e:
+        logger.critical(f"⛔ Critical error while computing partial dependence of {features}: {e}")
+        raise e
+
+    average = predictions.mean(axis=1).reshape(shape)
+    individual = predictions.T.reshape((n_rows,) + shape) if ice else None
+    logger.info(f"ℹ️ Partial dependence of {features} from {n_points * n_rows:,} predictions.")
+    return PartialDependence(features, grids, average, individual)
@@ -0,0 +1,114 @@
+# process_pool.py
+# This file provides the process pool used to train several models in parallel.
+# The parent writes the dataset arrays once as .npy files; every spawned worker memory-maps them,
+# so all workers share the same pages instead of receiving pickled copies. Each worker limits
+# TensorFlow to its share of the cores so the pool never oversubscribes the machine.
+# Cancelling the pool writes a sentinel file next to the arrays; running tasks check it between
+# epochs (see cancel_callback) so a cancelled pool shuts down without finishing their training.
+
+import multiprocessing
+import os
+import tempfile
+from concurrent.futures import ProcessPoolExecutor
+import numpy as np
+from app_logging import logger
+
+# Memory-mapped arrays of the current worker process, set by _init_worker
+_WORKER_ARRAYS = {}
+# Sentinel file whose existence cancels the pool's tasks, set by _init_worker
+_CANCEL_PATH = None
+CANCEL_SENTINEL = 'cancel.flag'
+
+
+def worker_layout(n_tasks, max_workers=None, threads_per_worker=None):
+    """Split the cores between workers so the pool never runs more TF threads than there are cores."""
+    cores = os.cpu_count() or 1
+    if threads_per_worker is None:
+        workers = max_workers or min(n_tasks, cores)
+        threads_per_worker = max(1, cores // workers)
+    else:
+        workers = max_workers or max(1, cores // threads_per_worker)
+    return max(1, min(workers, n_tasks)), threads_per_worker
+
+
+def _init_worker(data_dir, threads):
+    global _CANCEL_PATH
+    _CANCEL_PATH = os.path.join(data_dir, CANCEL_SENTINEL)
+    # Must run before TensorFlow creates its thread pools
+    os.environ['TF_NUM_INTRAOP_THREADS'] = str(threads)
+    os.environ['TF_NUM_INTEROP_THREADS'] = '1'
+    os.environ.setdefault('TF_CPP_MIN_LOG_LEVEL', '2')
+    import tensorflow as tf
+    tf.config.threading.set_intra_op_parallelism_threads(threads)
+    tf.config.threading.set_inter_op_parallelism_threads(1)
+
+    for file_name in os.listdir(data_dir):
+        name, extension = os.path.splitext(file_name)
+        if extension == '.npy':
+            _WORKER_ARRAYS[name] = np.load(os.path.join(data_dir, file_name), mmap_mode='r')
+
+
+def worker_arrays():
+    """Inside a worker: the shared arrays by name (missing names were None in the parent)."""
+    return _WORKER_ARRAYS
+
+
+def cancel_requested():
+    """Inside a worker: whether the pool has been cancelled."""
+    return _CANCEL_PATH is not None and os.path.exists(_CANCEL_PATH)
+
+
+def cancel_callback():
+    """Inside a worker: Keras callback that stops training at the next epoch end once the pool is cancelled."""
+    from keras.callbacks import Callback
+
+    class StopOnCancel(Callback):
+        def on_epoch_end(self, epoch, logs=None):
+            if cancel_requested():
+                self.model.stop_training = True
+
+    return StopOnCancel()
+
+
+class SharedArrayPool:
+    """Spawned process pool whose workers memory-map the given dict of arrays (None values are skipped)."""
+
+    def __init__(self, arrays, n_tasks, max_workers=None, threads_per_worker=None):
+        self._tmp = tempfile.TemporaryDirectory(prefix='pool_')
+        self.cancelled = False
+        self._futures = []
+        for name, array in arrays.items():
+            if array is not None:
+                # Saved in its own memory order (F-order features stay F-order): no in-memory copy
+                np.save(os.path.join(self._tmp.name, name + '.npy'), array)
+        self.workers, self.threads = worker_layout(n_tasks, max_workers, threads_per_worker)
+        # TensorFlow is not fork-safe once initialized, so workers are always spawned
+        self.executor = ProcessPoolExecutor(self.workers, mp_context=multiprocessing.get_context('spawn'),
+                                            initializer=_init_worker, initargs=(self._tmp.name, self.threads))
+        logger.info(f"ℹ️ Process pool started with {self.workers} workers x {self.threads} TF threads.")
+
+    def submit(self, func, *args):
+        future = self.executor.submit(func, *args)
+        self._futures.append(future)
+        return future
+
+    def cancel(self):
+        """Drop the queued tasks and make the running ones stop at their next epoch end."""
+        if not self.cancelled:
+            open(os.path.join(self._tmp.name, CANCEL_SENTINEL), 'w').close()
+            self.cancelled = True
+            for future in self._futures:
+                future.cancel()
+            logger.warning("⚠️ Process pool cancelled, running tasks stop after their current epoch.")
+
+    def close(self, cancel=False):
+        if cancel:
+            self.cancel()
+        self.executor.shutdown(wait=True, cancel_futures=self.cancelled)
+        self._tmp.cleanup()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close(cancel=exc[0] is not None)
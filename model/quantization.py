@@ -0,0 +1,139 @@
+# quantization.py
+# This file exports post-training-quantized TensorFlow Lite variants of a trained model for the
+# Ultra96 edge board: float32 (reference), float16, dynamic-range int8 and full int8 calibrated
+# on a sample of the training rows. Each variant is scored on the held-out test split and timed,
+# so the deployable variant can be chosen from its R^2/MSE, latency and size.
+
+import json
+import os
+import time
+import numpy as np
+import pandas as pd
+import tensorflow as tf
+from sklearn.metrics import r2_score, mean_squared_error
+from app_logging import logger
+
+QUANTIZATION_MODES = ('float32', 'float16', 'dynamic_int8', 'full_int8')
+DEFAULT_CALIBRATION_ROWS = 1000
+REPORT_FILE = 'quantization_report.json'
+
+
+def convert_model(keras_model, mode, calibration_X=None):
+    """Convert a Keras model to a TFLite flatbuffer with the given quantization mode."""
+    if mode not in QUANTIZATION_MODES:
+        raise ValueError("Unknown quantization mode '{}', expected one of {}".format(mode, QUANTIZATION_MODES))
+    converter = tf.lite.TFLiteConverter.from_keras_model(keras_model)
+    if mode == 'float16':
+        converter.optimizations = [tf.lite.Optimize.DEFAULT]
+        converter.target_spec.supported_types = [tf.float16]
+    elif mode == 'dynamic_int8':
+        # Int8 weights, float activations: no calibration data needed
+        converter.optimizations = [tf.lite.Optimize.DEFAULT]
+    elif mode == 'full_int8':
+        if calibration_X is None:
+            raise ValueError("Full int8 quantization needs calibration rows")
+        calibration_X = np.asarray(calibration_X, dtype=np.float32)
+        converter.optimizations = [tf.lite.Optimize.DEFAULT]
+        converter.representative_dataset = lambda: ([row[np.newaxis, :]] for row in calibration_X)
+        converter.target_spec.supported_ops = [tf.lite.OpsSet.TFLITE_BUILTINS_INT8]
+        converter.inference_input_type = tf.int8
+        converter.inference_output_type = tf.int8
+    try:
+        return converter.convert()
+    except Exception as e:
+        logger.critical(f"⛔ Critical error while converting the model to {mode}: {e}")
+        raise e
+
+
+class TFLiteModel:
+    """Runs a TFLite flatbuffer; int8 inputs/outputs are (de)quantized transparently."""
+
+    def __init__(self, model_content):
+        self.interpreter = tf.lite.Interpreter(model_content=model_content)
+        self.interpreter.allocate_tensors()
+        self._input = self.interpreter.get_input_details()[0]
+        self._output = self.interpreter.get_output_details()[0]
+        self._batch_size = None
+
+    def predict(self, X):
+        X = np.asarray(X, dtype=np.float32)
+        if X.ndim == 1:
+            X = X[np.newaxis, :]
+        if self._batch_size != len(X):
+            # Resizing re-plans the tensors, so it only happens when the batch size changes
+            self.interpreter.resize_tensor_input(self._input['index'], X.shape)
+            self.interpreter.allocate_tensors()
+            self._input = self.interpreter.get_input_details()[0]
+            self._output = self.interpreter.get_output_details()[0]
+            self._batch_size = len(X)
+
+        scale, zero_point = self._input['quantization']
+        if self._input['dtype'] == np.int8:
+            X = np.clip(np.round(X / scale + zero_point), -128, 127).astype(np.int8)
+        self.interpreter.set_tensor(self._input['index'], X)
+        self.interpreter.invoke()
+        output = self.interpreter.get_tensor(self._output['index'])
+
+        scale, zero_point = self._output['quantization']
+        if self._output['dtype'] == np.int8:
+            output = (output.astype(np.float32) - zero_point) * scale
+        return output.ravel()
+
+
+def _median_latency(model, X, calls):
+    model.predict(X)
+    samples = np.empty(calls)
+    for i in range(calls):
+        start = time.perf_counter()
+        model.predict(X)
+        samples[i] = time.perf_counter() - start
+    return float(np.median(samples))
+
+
+def export_quantized_variants(model, dataset, output_dir, modes=QUANTIZATION_MODES,
+                              calibration_rows=DEFAULT_CALIBRATION_ROWS, latency_calls=200, seed=0, progress=None):
+    """
+    Write one .tflite file per mode for a trained NeuralNetworkModel and score each
+    variant on the test split of 'dataset' (a CompactDataset). Full int8 is calibrated on
+    'calibration_rows' random training rows. Returns a DataFrame with R^2, MSE, size,
+    batch-1 latency and batch throughput per variant; it is also saved as JSON.
+    'progress(done, total)' is called after every variant.
+    """
+    os.makedirs(output_dir, exist_ok=True)
+    rng = np.random.default_rng(seed)
+    calibration = dataset.X_train[np.sort(rng.choice(dataset.n_train, min(calibration_rows, dataset.n_train),
+                                                     replace=False))]
+    X_test, y_test = dataset.X_test, dataset.y_test
+    batch = X_test[:min(len(X_test), 4096)]
+
+    rows = []
+    for mode in modes:
+        logger.info(f"ℹ️ Exporting {mode} variant.")
+        content = convert_model(model.model, mode, calibration if mode == 'full_int8' else None)
+        file_path = os.path.join(output_dir, f"model_{mode}.tflite")
+        with open(file_path, 'wb') as f:
+            f.write(content)
+
+        variant = TFLiteModel(content)
+        predictions = variant.predict(X_test)
+        batch_latency = _median_latency(variant, batch, max(latency_calls // 10, 5))
+        rows.append({
+            'mode': mode,
+            'file': file_path,
+            'size_bytes': len(content),
+            'r2': float(r2_score(y_test, predictions)),
+            'mse': float(mean_squared_error(y_test, predictions)),
+            'latency_batch1_us': _median_latency(variant, X_test[:1], latency_calls) * 1e6,
+            'throughput_rows_per_s': len(batch) / batch_latency,
+        })
+        logger.info(f"ℹ️ {mode}: R^2={rows[-1]['r2']:.4f}, MSE={rows[-1]['mse']:.6f}, {len(content)} bytes")
+        if progress is not None:
+            progress(len(rows), len(modes))
+
+    report = pd.DataFrame(rows)
+    reference = model.metadata.get('evaluation', {})
+    with open(os.path.join(output_dir, REPORT_FILE), 'w', encoding='utf-8') as f:
+        json.dump({'keras_evaluation': reference, 'n_test': len(y_test), 'calibration_rows': len(calibration),
+                   'variants': rows}, f, indent=2)
+    logger.info(f"ℹ️ Quantization report written to {output_dir}")
+    return report
@@ -0,0 +1,37 @@
+# scoring.py
+# This file scores large candidate sets of raw operating points with a trained model.
+# Candidates are evaluated in fixed-size batches: each batch is transformed with the model's
+# feature spec and scaler and run through one forward call, so millions of points cost a few
+# large matrix products instead of millions of small ones. Works with NeuralNetworkModel
+# (via its predict_fast path) and with the NumPy runtime's NumpyModel / NumpyEnsemble.
+
+import numpy as np
+
+# Rows per forward call: large enough to amortize the call, small enough to stay in cache-friendly memory
+DEFAULT_BATCH_ROWS = 262_144
+
+
+def _forward(model):
+    # NeuralNetworkModel.predict would go through keras.Model.predict for large batches
+    return model.predict_fast if hasattr(model, 'predict_fast') else model.predict
+
+
+def score_features(model, X, batch_rows=DEFAULT_BATCH_ROWS):
+    """Predict reliability for an already scaled (n_rows, n_features) matrix in batches."""
+    forward = _forward(model)
+    out = np.empty(len(X), dtype=np.float32)
+    for start in range(0, len(X), batch_rows):
+        out[start:start + batch_rows] = forward(X[start:start + batch_rows])
+    return out
+
+
+def score_raw(model, columns, batch_rows=DEFAULT_BATCH_ROWS):
+    """Predict reliability for raw columns (DataFrame or mapping of equally long arrays, e.g. V/f/T/N) in batches."""
+    forward = _forward(model)
+    columns = {name: np.asarray(columns[name]) for name in columns}
+    n_rows = len(next(iter(columns.values())))
+    out = np.empty(n_rows, dtype=np.float32)
+    for start in range(0, n_rows, batch_rows):
+        batch = {name: values[start:start + batch_rows] for name, values in columns.items()}
+        out[start:start + batch_rows] = forward(model.transform(batch))
+    return out
@@ -0,0 +1,128 @@
+# sensitivity.py
+# This file computes global (Sobol) sensitivity indices of a trained model over the operating space.
+# Saltelli sampling builds the A, B and AB_i matrices of raw V/f/T/N inputs; all n * (d + 2) rows
+# are scored in large batches (see scoring.py). First-order indices use the Saltelli (2010)
+# estimator, total-order indices the Jansen estimator. Both are means of per-row terms, so the
+# bootstrap confidence intervals reweight those terms with Poisson weights in a few matrix products.
+
+import time
+import numpy as np
+import pandas as pd
+from app_logging import logger
+from model.operating_point import DEFAULT_BOUNDS, sample_candidates
+from model.scoring import DEFAULT_BATCH_ROWS, score_raw
+
+# Base samples: the model is evaluated n * (d + 2) times, ~1.5M for the four V/f/T/N inputs
+DEFAULT_SAMPLES = 2 ** 18
+DEFAULT_BOOTSTRAP = 200
+CONFIDENCE = 0.95
+
+# Bootstrap resamples weighted per matrix product (weights block: chunk x n_samples float64)
+BOOTSTRAP_CHUNK = 16
+
+
+def saltelli_columns(bounds, n, rng):
+    """
+    Raw input columns of the stacked Saltelli design [A; B; AB_1; ...; AB_d], where AB_i
+    is A with its i-th column taken from B. Columns with a fixed value are not varied.
+    """
+    A = sample_candidates(bounds, n, rng)
+    B = sample_candidates(bounds, n, rng)
+    names = list(bounds)
+    blocks = [A, B] + [{name: B[name] if name == varied else A[name] for name in names} for varied in names]
+    return {name: np.concatenate([block[name] for block in blocks]) for name in names}
+
+
+def sobol_indices(f_A, f_B, f_AB):
+    """
+    First- and total-order indices from model outputs f(A), f(B) (shape (..., n)) and
+    f(AB_i) (shape (..., d, n)); leading axes are e.g. bootstrap resamples.
+    """
+    variance = np.concatenate([f_A, f_B], axis=-1).var(axis=-1)[..., np.newaxis]
+    first = np.mean(f_B[..., np.newaxis, :] * (f_AB - f_A[..., np.newaxis, :]), axis=-1) / variance
+    total = 0.5 * np.mean(np.square(f_A[..., np.newaxis, :] - f_AB), axis=-1) / variance
+    return first, total
+
+
+def bootstrap_indices(f_A, f_B, f_AB, n_bootstrap, rng):
+    """
+    Poisson-bootstrap replicates of sobol_indices: every resample weights the per-row terms
+    of the estimators with Poisson(1) counts, so a chunk of resamples is one matrix product.
+    Returns (first, total) of shape (n_bootstrap, d).
+    """
+    d, n = f_AB.shape
+    terms = np.column_stack([(f_B * (f_AB - f_A)).T, (0.5 * np.square(f_A - f_AB)).T,
+                             f_A, f_B, np.square(f_A), np.square(f_B)])
+    first = np.empty((n_bootstrap, d))
+    total = np.empty((n_bootstrap, d))
+    for start in range(0, n_bootstrap, BOOTSTRAP_CHUNK):
+        weights = rng.poisson(1.0, (min(BOOTSTRAP_CHUNK, n_bootstrap - start), n)).astype(np.float64)
+        means = (weights @ terms) / weights.sum(axis=1)[:, np.newaxis]
+        mean = 0.5 * (means[:, 2 * d] + means[:, 2 * d + 1])
+        variance = (0.5 * (means[:, 2 * d + 2] + means[:, 2 * d + 3]) - mean ** 2)[:, np.newaxis]
+        first[start:start + len(weights)] = means[:, :d] / variance
+        total[start:start + len(weights)] = means[:, d:2 * d] / variance
+    return first, total
+
+
+class SensitivityResult:
+    """Sobol indices per input with bootstrap confidence intervals and the evaluation statistics."""
+
+    def __init__(self, table, n_samples, n_evaluations, seconds, confidence=CONFIDENCE):
+        self.table = table
+        self.n_samples = n_samples
+        self.n_evaluations = n_evaluations
+        self.seconds = seconds
+        self.confidence = confidence
+
+    def summary_text(self):
+        lines = [f"{self.n_evaluations:,} model evaluations in {self.seconds:.2f} s "
+                 f"({self.n_evaluations / max(self.seconds, 1e-9):,.0f}/s)"]
+        for row in self.table.itertuples():
+            lines.append(f"{row.feature}: S1 {row.S1:.3f} [{row.S1_low:.3f}, {row.S1_high:.3f}], "
+                         f"ST {row.ST:.3f} [{row.ST_low:.3f}, {row.ST_high:.3f}]")
+        return '\n'.join(lines)
+
+
+def sobol_sensitivity(model, bounds=None, n_samples=DEFAULT_SAMPLES, n_bootstrap=DEFAULT_BOOTSTRAP,
+                      confidence=CONFIDENCE, batch_rows=DEFAULT_BATCH_ROWS, seed=0):
+    """
+    Sobol sensitivity of predicted reliability to each raw input of 'model' (NeuralNetworkModel
+    with scaler and feature spec, NumpyModel or NumpyEnsemble).
+
+    Inputs are drawn uniformly from 'bounds' (DEFAULT_BOUNDS overridden per column; a list
+    samples discrete values, a single value fixes the input and gives it zero indices).
+    Returns a SensitivityResult whose table has S1/ST and their 'confidence' bootstrap
+    intervals per input.
+    """
+    bounds = dict(DEFAULT_BOUNDS, **(bounds or {}))
+    bounds = {name: bounds[name] for name in model.feature_spec.base}
+    names = list(bounds)
+    d = len(names)
+    logger.info(f"ℹ️ Sobol sensitivity analysis with {n_samples:,} base samples over {bounds}.")
+
+    rng = np.random.default_rng(seed)
+    start = time.perf_counter()
+    try:
+        outputs = score_raw(model, saltelli_columns(bounds, n_samples, rng), batch_rows).astype(np.float64)
+        f_A, f_B = outputs[:n_samples], outputs[n_samples:2 * n_samples]
+        f_AB = outputs[2 * n_samples:].reshape(d, n_samples)
+        first, total = sobol_indices(f_A, f_B, f_AB)
+
+        boot_first, boot_total = bootstrap_indices(f_A, f_B, f_AB, n_bootstrap, rng)
+    except Exception as e:
+        logger.critical(f"⛔ Critical error during the sensitivity analysis: {e}")
+        raise e
+    seconds = time.perf_counter() - start
+
+    tail = 50 * (1 - confidence)
+    table = pd.DataFrame({
+        'feature': names,
+        'S1': first, 'S1_low': np.percentile(boot_first, tail, axis=0),
+        'S1_high': np.percentile(boot_first, 100 - tail, axis=0),
+        'ST': total, 'ST_low': np.percentile(boot_total, tail, axis=0),
+        'ST_high': np.percentile(boot_total, 100 - tail, axis=0),
+    })
+    result = SensitivityResult(table, n_samples, len(outputs), seconds, confidence)
+    logger.info("ℹ️ Sensitivity analysis finished:\n" + result.summary_text())
+    return result
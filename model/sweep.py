@@ -0,0 +1,232 @@
+# sweep.py
+# This file runs hyperparameter sweeps over the Main-tab training parameters.
+# Configurations come from a grid, random sampling or successive halving and are trained in
+# parallel in a SharedArrayPool (see process_pool.py). Poor trials are stopped early: by a
+# median rule in grid/random search and by the rungs of successive halving.
+
+import math
+import time
+from concurrent.futures import FIRST_COMPLETED, wait
+from itertools import product
+import numpy as np
+import pandas as pd
+from app_logging import logger
+from model.process_pool import SharedArrayPool, cancel_callback, cancel_requested, worker_arrays
+
+PARAMETERS = ('dense1_units', 'dense2_units', 'learning_rate', 'validation_split', 'epochs', 'batch_size')
+INTEGER_PARAMETERS = ('dense1_units', 'dense2_units', 'epochs', 'batch_size')
+LOG_SCALE_PARAMETERS = ('learning_rate',)
+
+# Same ranges as the sliders of the Main tab
+DEFAULT_SEARCH_SPACE = {
+    'dense1_units': (16, 128),
+    'dense2_units': (16, 128),
+    'learning_rate': (0.0001, 0.01),
+    'validation_split': (0.01, 0.2),
+    'epochs': (100, 2000),
+    'batch_size': (16, 128),
+}
+
+# Fixed values for parameters missing from a search space (the slider defaults)
+DEFAULT_CONFIG = {'dense1_units': 64, 'dense2_units': 32, 'learning_rate': 0.001,
+                  'validation_split': 0.07, 'epochs': 1000, 'batch_size': 77}
+
+SWEEP_METHODS = ('grid', 'random', 'halving')
+
+
+def _cast(name, value):
+    return int(round(value)) if name in INTEGER_PARAMETERS else float(value)
+
+
+def grid_configs(space, grid_points=3):
+    """
+    Return the grid of configurations of 'space' (parameter -> list of values or
+    (low, high) range). Ranges are replaced by 'grid_points' evenly spaced values,
+    geometrically spaced for the learning rate.
+    """
+    axes = []
+    for name in PARAMETERS:
+        values = space.get(name, [DEFAULT_CONFIG[name]])
+        if isinstance(values, tuple):
+            low, high = values
+            spacing = np.geomspace if name in LOG_SCALE_PARAMETERS else np.linspace
+            values = spacing(low, high, grid_points)
+        axes.append(list(dict.fromkeys(_cast(name, value) for value in values)))
+    return [dict(zip(PARAMETERS, values)) for values in product(*axes)]
+
+
+def random_configs(space, n_trials, seed=None):
+    """Sample 'n_trials' configurations: uniform in ranges (log-uniform for the learning rate), choice from lists."""
+    rng = np.random.default_rng(seed)
+    configs = []
+    for _ in range(n_trials):
+        config = {}
+        for name in PARAMETERS:
+            values = space.get(name, [DEFAULT_CONFIG[name]])
+            if isinstance(values, tuple):
+                low, high = values
+                if name in LOG_SCALE_PARAMETERS:
+                    value = math.exp(rng.uniform(math.log(low), math.log(high)))
+                else:
+                    value = rng.uniform(low, high)
+            else:
+                value = values[rng.integers(len(values))]
+            config[name] = _cast(name, value)
+        configs.append(config)
+    return configs
+
+
+def halving_rungs(n_trials, min_epochs, max_epochs, eta=3):
+    """Return [(n_configs, epochs), ...] for successive halving down to a single configuration."""
+    rungs = []
+    n_configs, epochs = n_trials, min_epochs
+    while True:
+        rungs.append((n_configs, min(epochs, max_epochs)))
+        if n_configs <= 1 or epochs >= max_epochs:
+            return rungs
+        n_configs = max(1, n_configs // eta)
+        epochs *= eta
+
+
+def _run_trial(trial, config, epochs, patience, prune_epoch, prune_threshold):
+    from keras.callbacks import Callback
+    from model.neural_network import NeuralNetworkModel
+
+    class MedianStopping(Callback):
+        # Stop a trial whose validation loss at 'prune_epoch' is worse than the median of earlier trials
+        pruned = False
+
+        def on_epoch_end(self, epoch, logs=None):
+            if epoch + 1 == prune_epoch and logs.get('val_loss', np.inf) > prune_threshold:
+                self.pruned = True
+                self.model.stop_training = True
+
+    data = worker_arrays()
+    start = time.perf_counter()
+    model = NeuralNetworkModel(input_shape=(data['X_train'].shape[1],), dense1_units=config['dense1_units'],
+                               dense2_units=config['dense2_units'], learning_rate=config['learning_rate'])
+    callbacks = [MedianStopping()] if prune_threshold is not None else []
+    callbacks.append(cancel_callback())
+    history = model.train(np.asarray(data['X_train']), np.asarray(data['y_train']),
+                          validation_split=config['validation_split'], epochs=epochs,
+                          batch_size=config['batch_size'], patience=patience, callbacks=callbacks, verbose=0,
+                          sample_weight=np.asarray(data['w_train']) if 'w_train' in data else None)
+    r2, mse = model.evaluate(data['X_test'], data['y_test'], verbose=0)
+
+    val_losses = history.history.get('val_loss', history.history['loss'])
+    epochs_run = len(val_losses)
+    if prune_threshold is not None and callbacks[0].pruned:
+        status = 'pruned'
+    elif cancel_requested():
+        status = 'cancelled'
+    elif epochs_run < epochs:
+        status = 'early_stopped'
+    else:
+        status = 'completed'
+    return {
+        'trial': trial, **config, 'epochs': epochs, 'epochs_run': epochs_run,
+        'val_loss': float(np.min(val_losses)),
+        'val_loss_at_prune_epoch': float(val_losses[prune_epoch - 1]) if prune_epoch and epochs_run >= prune_epoch else None,
+        'r2': float(r2), 'mse': float(mse), 'wall_time': time.perf_counter() - start, 'status': status,
+    }
+
+
+def _run_trials(pool, trials, patience, prune_epoch, results, progress, should_stop, total):
+    """Run (trial, config, epochs) tuples on the pool; returns the results of this batch."""
+    pending = {}
+    queue = list(trials)
+    batch = []
+
+    def threshold():
+        # Median stopping only starts once a few trials reached the check epoch
+        values = [r['val_loss_at_prune_epoch'] for r in results if r['val_loss_at_prune_epoch'] is not None]
+        return float(np.median(values)) if prune_epoch and len(values) >= 3 else None
+
+    while queue or pending:
+        if should_stop is not None and should_stop():
+            pool.cancel()
+            logger.warning("⚠️ Sweep stopped before all trials finished.")
+            break
+        # Keep at most one trial per worker in flight so later trials see an up-to-date threshold
+        while queue and len(pending) < pool.workers:
+            trial, config, epochs = queue.pop(0)
+            pending[pool.submit(_run_trial, trial, config, epochs, patience, prune_epoch, threshold())] = trial
+        done, _ = wait(pending, timeout=1.0, return_when=FIRST_COMPLETED)
+        for future in done:
+            trial = pending.pop(future)
+            try:
+                result = future.result()
+            except Exception as e:
+                logger.critical(f"⛔ Sweep trial {trial} failed: {e}")
+                raise e
+            results.append(result)
+            batch.append(result)
+            logger.info(f"ℹ️ Trial {trial}: R^2={result['r2']:.4f}, MSE={result['mse']:.6f}, "
+                        f"{result['epochs_run']} epochs, {result['wall_time']:.1f} s ({result['status']})")
+            if progress is not None:
+                progress(len(results), total)
+    return batch
+
+
+def run_sweep(dataset, space=None, method='random', n_trials=20, grid_points=3, max_workers=None,
+              threads_per_worker=None, patience=100, prune_epoch=None, min_epochs=None, eta=3, seed=None,
+              progress=None, should_stop=None):
+    """
+    Train one model per configuration of 'space' on a CompactDataset and return a DataFrame
+    with one row per trial (parameters, epochs run, validation loss, test R^2/MSE, wall
+    time, status), sorted by R^2.
+
+    'method' is 'grid', 'random' (n_trials samples) or 'halving': successive halving
+    starts n_trials random configurations at 'min_epochs' and keeps the best 1/eta by
+    validation loss for eta times more epochs, up to the top of the epochs range.
+    'prune_epoch' enables median stopping in grid/random search. 'progress(done, total)'
+    is called after every trial and 'should_stop()' is polled to abort the sweep.
+    """
+    space = DEFAULT_SEARCH_SPACE if space is None else space
+    if method not in SWEEP_METHODS:
+        raise ValueError("Unknown sweep method '{}', expected one of {}".format(method, SWEEP_METHODS))
+
+    if method == 'grid':
+        configs = grid_configs(space, grid_points)
+    else:
+        configs = random_configs(space, n_trials, seed)
+
+    if method == 'halving':
+        epochs_range = space.get('epochs', [DEFAULT_CONFIG['epochs']])
+        max_epochs = max(epochs_range)
+        rungs = halving_rungs(len(configs), min_epochs or min(epochs_range), max_epochs, eta)
+        total = sum(n for n, _ in rungs)
+    else:
+        rungs = None
+        total = len(configs)
+
+    logger.info(f"ℹ️ Starting {method} sweep with {total} trials on {dataset.n_train} training rows.")
+    results = []
+    arrays = {'X_train': dataset.X_train, 'y_train': dataset.y_train, 'X_test': dataset.X_test,
+              'y_test': dataset.y_test, 'w_train': dataset.w_train}
+    pool = SharedArrayPool(arrays, len(configs), max_workers, threads_per_worker)
+    stopped = False
+    try:
+        if rungs is None:
+            trials = [(trial, config, config['epochs']) for trial, config in enumerate(configs)]
+            _run_trials(pool, trials, patience, prune_epoch, results, progress, should_stop, total)
+        else:
+            survivors = list(enumerate(configs))
+            for rung, (n_configs, epochs) in enumerate(rungs):
+                trials = [(trial, config, epochs) for trial, config in survivors[:n_configs]]
+                batch = _run_trials(pool, trials, patience, None, results, progress, should_stop, total)
+                for result in batch:
+                    result['rung'] = rung
+                if should_stop is not None and should_stop():
+                    break
+                batch.sort(key=lambda result: result['val_loss'])
+                survivors = [(result['trial'], {name: result[name] for name in PARAMETERS}) for result in batch]
+        stopped = should_stop is not None and should_stop()
+    finally:
+        pool.close(cancel=stopped)
+
+    table = pd.DataFrame(results)
+    if not table.empty:
+        table = table.drop(columns='val_loss_at_prune_epoch').sort_values('r2', ascending=False, ignore_index=True)
+    logger.info(f"ℹ️ Sweep finished with {len(table)} trials.")
+    return table
@@ -0,0 +1,176 @@
+# training_jobs.py
+# This file runs training jobs in a background worker thread so the GUI stays responsive.
+# Jobs are queued and run one at a time; every epoch the worker puts a progress event
+# (loss, epochs/sec, samples/sec) on an event queue that the Tk loop drains with after().
+# Running jobs can be paused, resumed and cancelled between batches.
+
+import queue
+import threading
+import time
+from keras.callbacks import Callback
+from app_logging import logger
+
+QUEUED = 'queued'
+RUNNING = 'running'
+PAUSED = 'paused'
+COMPLETED = 'completed'
+CANCELLED = 'cancelled'
+FAILED = 'failed'
+
+FINISHED_STATES = (COMPLETED, CANCELLED, FAILED)
+
+
+class TrainingJob:
+    """
+    One unit of background work. 'target' is called in the worker thread as
+    target(callbacks) and must pass the callbacks on to model.fit; its return value
+    becomes job.result. 'samples_per_epoch' is only used for the throughput figures.
+    'unit' names what 'epoch'/'epochs' count (e.g. 'trial' for a hyperparameter sweep).
+    'on_complete' is an optional handler the GUI calls with the job once it completed.
+    """
+
+    def __init__(self, job_id, name, target, epochs=None, samples_per_epoch=None, unit='epoch', on_complete=None):
+        self.job_id = job_id
+        self.name = name
+        self.target = target
+        self.unit = unit
+        self.on_complete = on_complete
+        self.epochs = epochs
+        self.samples_per_epoch = samples_per_epoch
+        self.state = QUEUED
+        self.result = None
+        self.error = None
+        self.epoch = 0
+        self.logs = {}
+        self.epochs_per_sec = 0.0
+        self.samples_per_sec = 0.0
+        self._cancel = threading.Event()
+        self._resume = threading.Event()
+        self._resume.set()
+
+    @property
+    def cancel_requested(self):
+        return self._cancel.is_set()
+
+    def __repr__(self):
+        return f"TrainingJob({self.job_id}, {self.name!r}, state={self.state}, epoch={self.epoch})"
+
+
+class JobProgressCallback(Callback):
+    """Keras callback reporting epoch progress of a job and honouring pause/cancel."""
+
+    def __init__(self, job, events):
+        super().__init__()
+        self.job = job
+        self.events = events
+        self._start = None
+        self._paused_time = 0.0
+
+    def on_train_begin(self, logs=None):
+        self._start = time.perf_counter()
+        self._paused_time = 0.0
+
+    def on_train_batch_end(self, batch, logs=None):
+        if not self.job._resume.is_set():
+            paused_at = time.perf_counter()
+            # Wake up regularly so a cancel request also ends a pause
+            while not self.job._resume.wait(0.1):
+                if self.job.cancel_requested:
+                    break
+            self._paused_time += time.perf_counter() - paused_at
+        if self.job.cancel_requested:
+            self.model.stop_training = True
+
+    def on_epoch_end(self, epoch, logs=None):
+        job = self.job
+        elapsed = max(time.perf_counter() - self._start - self._paused_time, 1e-9)
+        job.epoch = epoch + 1
+        job.logs = {name: float(value) for name, value in (logs or {}).items()}
+        job.epochs_per_sec = job.epoch / elapsed
+        job.samples_per_sec = job.epochs_per_sec * job.samples_per_epoch if job.samples_per_epoch else 0.0
+        self.events.put(('epoch', job))
+        if job.cancel_requested:
+            self.model.stop_training = True
+
+
+class TrainingJobManager:
+    """
+    Queue of TrainingJobs run by a single daemon worker thread.
+
+    Events are (kind, job) tuples with kind in 'started', 'epoch', 'completed',
+    'cancelled' and 'failed'; call poll() from the GUI thread to drain them.
+    """
+
+    def __init__(self):
+        self.jobs = []
+        self.events = queue.Queue()
+        self._pending = queue.Queue()
+        self._lock = threading.Lock()
+        self._next_id = 1
+        self._worker = threading.Thread(target=self._run, name='training-worker', daemon=True)
+        self._worker.start()
+
+    def submit(self, name, target, epochs=None, samples_per_epoch=None, unit='epoch', on_complete=None):
+        with self._lock:
+            job = TrainingJob(self._next_id, name, target, epochs, samples_per_epoch, unit, on_complete)
+            self._next_id += 1
+            self.jobs.append(job)
+        self._pending.put(job)
+        logger.info(f"ℹ️ Training job {job.job_id} '{name}' queued.")
+        return job
+
+    def pause(self, job):
+        if job.state == RUNNING:
+            job._resume.clear()
+            job.state = PAUSED
+            logger.info(f"ℹ️ Training job {job.job_id} paused.")
+
+    def resume(self, job):
+        if job.state == PAUSED:
+            job.state = RUNNING
+            job._resume.set()
+            logger.info(f"ℹ️ Training job {job.job_id} resumed.")
+
+    def cancel(self, job):
+        if job.state in FINISHED_STATES:
+            return
+        job._cancel.set()
+        job._resume.set()
+        logger.info(f"ℹ️ Cancellation of training job {job.job_id} requested.")
+
+    def active_job(self):
+        """Return the running or paused job, if any."""
+        return next((job for job in self.jobs if job.state in (RUNNING, PAUSED)), None)
+
+    def queued_jobs(self):
+        return [job for job in self.jobs if job.state == QUEUED and not job.cancel_requested]
+
+    def poll(self):
+        """Return every event produced since the last call without blocking."""
+        events = []
+        while True:
+            try:
+                events.append(self.events.get_nowait())
+            except queue.Empty:
+                return events
+
+    def _run(self):
+        while True:
+            job = self._pending.get()
+            if job.cancel_requested:
+                job.state = CANCELLED
+                self.events.put(('cancelled', job))
+                continue
+
+            job.state = RUNNING
+            self.events.put(('started', job))
+            logger.info(f"ℹ️ Training job {job.job_id} '{job.name}' started.")
+            try:
+                job.result = job.target([JobProgressCallback(job, self.events)])
+                job.state = CANCELLED if job.cancel_requested else COMPLETED
+            except Exception as e:
+                job.error = e
+                job.state = FAILED
+                logger.critical(f"⛔ Training job {job.job_id} failed: {e}")
+            self.events.put((job.state, job))
+            logger.info(f"ℹ️ Training job {job.job_id} finished with state '{job.state}'.")
@@ -0,0 +1,39 @@
+# test_incremental.py
+# This file tests that a failed incremental update leaves the model unchanged.
+
+import numpy as np
+import pytest
+from keras.callbacks import Callback
+from sklearn.preprocessing import StandardScaler
+from data.dataset import CompactDataset
+from data.features import DEFAULT_FEATURE_SPEC
+from model.incremental import train_incremental
+from model.neural_network import NeuralNetworkModel
+
+
+class FailingCallback(Callback):
+    def on_train_batch_end(self, batch, logs=None):
+        raise RuntimeError("interrupted")
+
+
+def test_failed_update_restores_scaler_and_weights():
+    rng = np.random.default_rng(0)
+    n_features = len(DEFAULT_FEATURE_SPEC.names)
+    X = rng.normal(size=(300, n_features))
+    scaler = StandardScaler().fit(X)
+    X_scaled = scaler.transform(X)
+    dataset = CompactDataset.from_arrays(X_scaled[:250], X_scaled[250:], X[:250, 0], X[250:, 0], scaler)
+    model = NeuralNetworkModel((n_features,), dense1_units=8, dense2_units=4)
+    model.scaler = dataset.scaler
+    weights = model.model.get_weights()
+
+    X_new = rng.normal(loc=3.0, size=(100, n_features))
+    with pytest.raises(RuntimeError):
+        train_incremental(model, dataset, X_new, X_new[:, 0], epochs=1, learning_rate=0.01,
+                          callbacks=[FailingCallback()])
+
+    np.testing.assert_array_equal(model.scaler.mean_, scaler.mean_)
+    assert model.scaler.n_samples_seen_ == 300
+    for restored, original in zip(model.model.get_weights(), weights):
+        np.testing.assert_array_equal(restored, original)
+    assert model.learning_rate == 0.001
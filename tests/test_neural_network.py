@@ -0,0 +1,46 @@
+# test_neural_network.py
+# This file tests training of the neural network model from memory-mapped .npy inputs.
+
+import numpy as np
+from model.neural_network import NeuralNetworkModel
+
+
+def test_train_from_npy_paths_records_row_counts(tmp_path):
+    rng = np.random.default_rng(0)
+    X = rng.normal(size=(200, 4)).astype(np.float32)
+    y = X.sum(axis=1).astype(np.float32)
+    X_path, y_path = str(tmp_path / 'X.npy'), str(tmp_path / 'y.npy')
+    np.save(X_path, X)
+    np.save(y_path, y)
+
+    model = NeuralNetworkModel((4,), dense1_units=8, dense2_units=4)
+    model.train(X_path, y_path, validation_split=0.1, epochs=2, batch_size=32,
+                use_input_pipeline=True, verbose=0)
+
+    assert model.metrics.samples_per_epoch == 180
+    assert model.metadata['training']['n_train'] == 200
+    assert model.metadata['training']['epochs_run'] == 2
+
+
+def test_fast_path_is_opt_in_and_predictions_are_reused():
+    X = np.random.default_rng(1).normal(size=(64, 4)).astype(np.float32)
+    y = X.sum(axis=1)
+    model = NeuralNetworkModel((4,), dense1_units=8, dense2_units=4)
+
+    predictions = model.predict(X, verbose=0)
+    np.testing.assert_allclose(model.predict(X, fast_path=True), predictions, rtol=1e-5, atol=1e-6)
+    assert model.evaluate_predictions(y, predictions) == model.evaluate(X, y, verbose=0)
+
+
+def test_train_on_row_indices_uses_only_those_rows():
+    rng = np.random.default_rng(2)
+    X = np.asfortranarray(rng.normal(size=(200, 4)).astype(np.float32))
+    y = X.sum(axis=1).astype(np.float32)
+    rows = np.sort(rng.choice(200, size=120, replace=False))
+
+    model = NeuralNetworkModel((4,), dense1_units=8, dense2_units=4)
+    model.train(X, y, validation_split=0.25, epochs=1, batch_size=32, use_input_pipeline=True,
+                row_indices=rows, verbose=0)
+
+    assert model.metrics.samples_per_epoch == 90
+    assert model.metadata['training']['n_train'] == 120
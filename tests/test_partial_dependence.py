@@ -0,0 +1,18 @@
+# test_partial_dependence.py
+# This file tests the input validation of the partial-dependence computation.
+
+import numpy as np
+import pytest
+from data.features import DEFAULT_FEATURE_SPEC
+from model.partial_dependence import partial_dependence
+
+
+class ConstantModel:
+    # Minimal stand-in: partial_dependence only needs the feature spec before scoring
+    feature_spec = DEFAULT_FEATURE_SPEC
+
+
+def test_empty_background_raises_a_clear_error():
+    background = {name: np.zeros(0) for name in DEFAULT_FEATURE_SPEC.base}
+    with pytest.raises(ValueError, match='at least one background row'):
+        partial_dependence(ConstantModel(), background, 'T')
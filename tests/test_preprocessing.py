@@ -0,0 +1,40 @@
+# test_preprocessing.py
+# This file tests the operating-point aggregation of the preprocessing module.
+
+import numpy as np
+import pandas as pd
+from data.preprocessing import aggregate_operating_points
+
+
+def make_rows(seed=0, rows=500, points=20):
+    rng = np.random.default_rng(seed)
+    X = rng.integers(0, points, size=(rows, 1)).astype(np.float64)
+    y = rng.normal(size=rows)
+    return X, y
+
+
+def test_median_matches_pandas_without_weights():
+    X, y = make_rows()
+    X_groups, y_groups, _ = aggregate_operating_points(X, y, reduce='median')
+    expected = pd.Series(y).groupby(X[:, 0]).median()
+    np.testing.assert_allclose(y_groups, expected.loc[X_groups[:, 0]].to_numpy())
+
+
+def test_weighted_median_equals_median_of_repeated_rows():
+    X, y = make_rows(seed=1)
+    weights = np.random.default_rng(2).integers(1, 5, len(y)).astype(np.float64)
+    X_groups, y_groups, counts = aggregate_operating_points(X, y, reduce='median', sample_weight=weights)
+
+    # Integer weights are the same as repeating each row that many times
+    repeats = weights.astype(int)
+    X_repeated, y_repeated = np.repeat(X, repeats, axis=0), np.repeat(y, repeats)
+    expected = pd.Series(y_repeated).groupby(X_repeated[:, 0]).median()
+    np.testing.assert_allclose(y_groups, expected.loc[X_groups[:, 0]].to_numpy())
+    np.testing.assert_allclose(counts, pd.Series(weights).groupby(X[:, 0]).sum().loc[X_groups[:, 0]].to_numpy())
+
+
+def test_weighted_median_follows_the_heavy_row():
+    X = np.zeros((3, 1))
+    y = np.array([1.0, 2.0, 10.0])
+    _, y_groups, _ = aggregate_operating_points(X, y, reduce='median', sample_weight=np.array([1.0, 1.0, 5.0]))
+    assert y_groups[0] == 10.0
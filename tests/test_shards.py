@@ -0,0 +1,33 @@
+# test_shards.py
+# This file tests that the min/max manifest of a sharded dataset lets range filters skip shards.
+
+import numpy as np
+from data.shards import write_sharded_dataset
+from data.synthetic import write_dataset
+
+
+def test_range_filter_skips_shards(tmp_path):
+    csv_path = str(tmp_path / 'measurements.csv')
+    write_dataset(csv_path, 20_000, seed=1)
+    sharded = write_sharded_dataset(csv_path, str(tmp_path / 'shards'), rows_per_shard=1000, chunksize=4000)
+
+    filters = {'T': (100.0, None)}
+    all_shards = sharded.shards('train')
+    selected = sharded.shards('train', filters)
+    assert 0 < len(selected) <= len(all_shards) // 2
+
+    # The skipped shards hold no matching rows
+    T = sharded.columns.index('T')
+    matching = sum(int((np.load(str(tmp_path / 'shards' / shard['file']))[:, T] >= 100.0).sum())
+                   for shard in all_shards)
+    assert sharded.count_rows('train', filters) == matching
+
+
+def test_shards_do_not_span_input_files(tmp_path):
+    for index in range(2):
+        write_dataset(str(tmp_path / f'file{index}.csv'), 3000, seed=index)
+    sharded = write_sharded_dataset([str(tmp_path / 'file0.csv'), str(tmp_path / 'file1.csv')],
+                                    str(tmp_path / 'shards'), rows_per_shard=10_000, sort_column=None)
+    # Each file fits in one shard per partition, so nothing is mixed across files
+    assert len(sharded.shards('train')) == 2
+    assert len(sharded.shards('test')) == 2
@@ -0,0 +1,71 @@
+# test_visualization_panel.py
+# This file tests the analysis report of the visualization panel without a display.
+
+import numpy as np
+import pandas as pd
+from docx import Document
+import gui.visualization_panel as visualization_panel
+from gui.visualization_panel import VisualizationPanel
+from model.sensitivity import SensitivityResult
+
+
+class FakeCanvas:
+    # Stands in for FigureCanvasTkAgg, which needs a Tk display
+    def __init__(self, figure, master=None):
+        self.figure = figure
+
+    def draw(self):
+        pass
+
+    def get_tk_widget(self):
+        return self
+
+    def pack(self, **kwargs):
+        pass
+
+
+def make_panel(monkeypatch):
+    monkeypatch.setattr(visualization_panel, 'FigureCanvasTkAgg', FakeCanvas)
+    panel = object.__new__(VisualizationPanel)
+    panel.scrollable_frame = None
+    panel.figures = []
+    panel.canvases = []
+    panel.figure_roles = {}
+    panel.dataset = None
+    panel.predictions = None
+    panel.impact_feature_names = []
+    panel.pareto_front = None
+    panel.sensitivity = None
+    return panel
+
+
+def test_report_with_only_sensitivity_results(monkeypatch, tmp_path):
+    panel = make_panel(monkeypatch)
+    table = pd.DataFrame({'feature': ['V', 'f', 'T', 'N'],
+                          'S1': [0.5, 0.2, 0.1, 0.0], 'S1_low': [0.45, 0.15, 0.05, 0.0], 'S1_high': [0.55, 0.25, 0.15, 0.01],
+                          'ST': [0.6, 0.3, 0.1, 0.0], 'ST_low': [0.55, 0.25, 0.05, 0.0], 'ST_high': [0.65, 0.35, 0.15, 0.01]})
+    panel.plot_sensitivity(SensitivityResult(table, n_samples=1024, n_evaluations=6144, seconds=0.1))
+    frontier = pd.DataFrame({'performance': [2.0, 1.0], 'reliability': [0.8, 0.9]})
+    panel.plot_pareto_front(frontier, frontier)
+
+    path = tmp_path / 'analysis.docx'
+    panel.save_analysis_to_doc(str(path))
+
+    doc = Document(str(path))
+    headings = [p.text for p in doc.paragraphs if p.style.name.startswith('Heading')]
+    assert headings == ['Global Sensitivity Analysis (Sobol Indices)']
+    assert [cell.text for cell in doc.tables[0].columns[0].cells] == ['Feature', 'V', 'f', 'T', 'N']
+
+
+def test_report_sections_follow_the_drawn_plots(monkeypatch, tmp_path):
+    panel = make_panel(monkeypatch)
+    history = type('History', (), {'history': {'loss': [1.0, 0.5, 0.2], 'val_loss': [1.1, 0.6, 0.3]}})()
+    panel.plot_loss(history)
+    y = np.linspace(0.5, 1.0, 20)
+    panel.plot_predictions(y, y + 0.01)
+
+    path = tmp_path / 'analysis.docx'
+    panel.save_analysis_to_doc(str(path))
+
+    headings = [p.text for p in Document(str(path)).paragraphs if p.style.name.startswith('Heading')]
+    assert headings == ['Figure 1: Training & Validation Loss', 'Figure 2: Prediction Accuracy']